@@ -0,0 +1,235 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from scrapers.archive import iter_json_files
+from scrapers.models import Movie, chain_from_path
+from scrapers.query_index import normalize
+from rich.console import Console
+import argparse, importlib.util, json, os, time, pandas
+
+console = Console()
+
+# Columnas de texto: como categorías ocupan poco y agrupan rápido
+CATEGORY_COLUMNS = (
+    "chain", "city", "cinema", "day", "title", "movie", "dimension", "format", "language", "source",
+)
+COLUMNS = CATEGORY_COLUMNS + ("time", "minutes")
+
+# Sin pyarrow la caché se guarda con pickle, que también conserva las categorías
+PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+
+def read_rows(root: Path, paths: List[Path]) -> Dict[str, list]:
+    # Una fila por función, acumulada por columnas
+    columns: Dict[str, list] = {name: [] for name in COLUMNS}
+    for path in paths:
+        try:
+            with path.open(encoding="utf-8") as f:
+                movie_data = json.load(f)
+            movie = Movie.from_dict(movie_data)
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"No se pudo leer {path}: {e}")
+            continue
+        extra = {
+            "chain": chain_from_path(root, path),
+            # Sin id común se agrupa por título
+            "movie": movie_data.get("movie_id") or movie.title,
+            "source": path.relative_to(root).as_posix(),
+        }
+        for row in movie.showtime_rows():
+            row.update(extra)
+            for name in COLUMNS:
+                columns[name].append(row[name])
+    return columns
+
+
+def to_frame(columns: Dict[str, list]) -> pandas.DataFrame:
+    frame = pandas.DataFrame(columns, columns=list(COLUMNS))
+    frame["minutes"] = frame["minutes"].astype("Int16")
+    for name in CATEGORY_COLUMNS:
+        frame[name] = frame[name].astype("category")
+    return frame
+
+
+class ShowtimeFrameCache:
+    """
+    Guarda en disco la tabla de funciones junto con la fecha de modificación de
+    cada JSON, para volver a leer solo los archivos que cambiaron.
+    """
+
+    def __init__(self, root: Path = Path("data"), folder: Optional[Path] = None):
+        self.root = Path(root)
+        self.folder = Path(folder) if folder else self.root / ".cache" / "analytics"
+
+    @property
+    def frame_path(self) -> Path:
+        return self.folder / ("showtimes.parquet" if PARQUET else "showtimes.pkl")
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.folder / "manifest.json"
+
+    def _read(self) -> Tuple[Optional[pandas.DataFrame], Dict[str, list]]:
+        try:
+            with self.manifest_path.open(encoding="utf-8") as f:
+                files = json.load(f)["files"]
+            if PARQUET:
+                frame = pandas.read_parquet(self.frame_path)
+            else:
+                frame = pandas.read_pickle(self.frame_path)
+        except (OSError, ValueError, KeyError):
+            return None, {}
+        return frame, files
+
+    def _write(self, frame: pandas.DataFrame, files: Dict[str, list]):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.frame_path.with_suffix(f".{os.getpid()}.tmp")
+        if PARQUET:
+            frame.to_parquet(tmp_path, index=False)
+        else:
+            frame.to_pickle(tmp_path)
+        os.replace(tmp_path, self.frame_path)
+        # El manifiesto va al final: si falta, la tabla se reconstruye entera
+        tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": files}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def load(self) -> Tuple[pandas.DataFrame, int]:
+        # Devuelve la tabla al día y cuántos archivos se volvieron a leer
+        frame, known = self._read()
+        files: Dict[str, list] = {}
+        changed: List[Path] = []
+        for path in iter_json_files(self.root):
+            stat = path.stat()
+            key = path.relative_to(self.root).as_posix()
+            files[key] = [stat.st_mtime_ns, stat.st_size]
+            if known.get(key) != files[key]:
+                changed.append(path)
+        stale = {key for key in known if key not in files} | {
+            path.relative_to(self.root).as_posix() for path in changed
+        }
+        if frame is not None and not changed and not stale:
+            return frame, 0
+
+        fresh = to_frame(read_rows(self.root, changed))
+        if frame is not None:
+            # Al unir categorías distintas quedan como texto: se vuelven a convertir
+            combined = pandas.concat(
+                [frame[~frame["source"].isin(stale)], fresh], ignore_index=True
+            )
+            frame = to_frame({name: combined[name] for name in COLUMNS})
+        else:
+            frame = fresh
+        self._write(frame, files)
+        return frame, len(changed)
+
+
+def count_by(frame: pandas.DataFrame, keys: List[str]) -> pandas.DataFrame:
+    return (
+        frame.groupby(keys, observed=True)
+        .size()
+        .rename("funciones")
+        .reset_index()
+        .sort_values("funciones", ascending=False, kind="stable", ignore_index=True)
+    )
+
+
+def by_cinema(frame: pandas.DataFrame) -> pandas.DataFrame:
+    return count_by(frame, ["chain", "cinema"])
+
+
+def by_hour(frame: pandas.DataFrame) -> pandas.DataFrame:
+    hours = (frame["minutes"] // 60).rename("hora")
+    return (
+        frame.groupby(hours, observed=True)
+        .size()
+        .rename("funciones")
+        .reset_index()
+        .sort_values("hora", ignore_index=True)
+    )
+
+
+def by_format(frame: pandas.DataFrame) -> pandas.DataFrame:
+    return count_by(frame, ["dimension", "format"])
+
+
+def by_language(frame: pandas.DataFrame) -> pandas.DataFrame:
+    return count_by(frame, ["language"])
+
+
+def screens_per_movie(frame: pandas.DataFrame) -> pandas.DataFrame:
+    return (
+        frame.groupby("movie", observed=True)
+        .agg(
+            title=("title", "first"),
+            cadenas=("chain", "nunique"),
+            cines=("cinema", "nunique"),
+            funciones=("time", "size"),
+        )
+        .reset_index()
+        .sort_values(["cines", "funciones"], ascending=False, kind="stable", ignore_index=True)
+    )
+
+
+REPORTS: Dict[str, Callable[[pandas.DataFrame], pandas.DataFrame]] = {
+    "cines": by_cinema,
+    "horas": by_hour,
+    "formatos": by_format,
+    "idiomas": by_language,
+    "peliculas": screens_per_movie,
+}
+
+
+def filter_frame(frame: pandas.DataFrame, **filters: Optional[str]) -> pandas.DataFrame:
+    # Se compara igual que en query_index, pero solo sobre las categorías distintas
+    for name, value in filters.items():
+        if not value:
+            continue
+        wanted = normalize(name, value)
+        categories = frame[name].cat.categories
+        keep = [category for category in categories if normalize(name, category) == wanted]
+        frame = frame[frame[name].isin(keep)]
+    return frame
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Resumen de las funciones guardadas en la carpeta de datos"
+    )
+    # choices con nargs="*" rechaza la lista vacía: se valida después
+    parser.add_argument(
+        "reports", nargs="*", help=f"Por defecto todos: {', '.join(REPORTS)}"
+    )
+    parser.add_argument("--root", default="data", help="Carpeta con los JSON guardados")
+    parser.add_argument("--chain")
+    parser.add_argument("--city")
+    parser.add_argument("--day")
+    parser.add_argument("--top", type=int, default=20, help="Filas por reporte en pantalla")
+    parser.add_argument("--excel", help="Guarda todos los reportes en un Excel, uno por hoja")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.reports if name not in REPORTS]
+    if unknown:
+        parser.error(f"reportes desconocidos: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    frame, changed = ShowtimeFrameCache(Path(args.root)).load()
+    frame = filter_frame(frame, chain=args.chain, city=args.city, day=args.day)
+    console.print(
+        f"[green]{len(frame)} funciones ({changed} archivos leídos de nuevo) en "
+        f"{time.perf_counter() - start:.1f} s[/green]"
+    )
+
+    results = {name: REPORTS[name](frame) for name in args.reports or REPORTS}
+    for name, result in results.items():
+        console.print(f"\n[bold cyan]{name}[/bold cyan]")
+        console.print(result.head(args.top).to_string(index=False))
+
+    if args.excel:
+        with pandas.ExcelWriter(args.excel) as writer:
+            for name, result in results.items():
+                result.to_excel(writer, sheet_name=name, index=False)
+        console.print(f"\n[green]Reportes guardados en {args.excel}[/green]")
+
+
+if __name__ == "__main__":
+    main()
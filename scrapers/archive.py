@@ -0,0 +1,158 @@
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from scrapers.models import MOVIE_DEPTH
+from rich.console import Console
+import argparse, json, lzma, os
+
+console = Console()
+
+ARCHIVE_VERSION = 1
+
+# Datos de la película que se repiten en cada cine y día: se guardan una sola vez
+MOVIE_METADATA = ("title", "genre", "running_time", "age_restriction", "image_url")
+
+
+def iter_json_files(root: Path) -> Iterator[Path]:
+    # Recorre los JSON de películas (<ciudad>/<cadena>/<cine>/<día>/*.json) en orden
+    # estable, sin entrar a carpetas ocultas ni leer otros JSON como data/posters
+    root = Path(root)
+    for folder, dirs, files in os.walk(root):
+        depth = len(Path(folder).relative_to(root).parts)
+        if depth >= MOVIE_DEPTH - 1:
+            dirs[:] = []
+        else:
+            dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+        if depth != MOVIE_DEPTH - 1:
+            continue
+        for name in sorted(files):
+            if name.endswith(".json"):
+                yield Path(folder) / name
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def pack(
+    root: Path = Path("data"), output: Optional[Path] = None, preset: int = 6
+) -> Tuple[Path, int]:
+    # Empaqueta los JSON de la carpeta de datos en un solo archivo .jsonl.xz
+    root = Path(root)
+    output = Path(output or root / ".archive" / f"{date.today().isoformat()}.jsonl.xz")
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    movie_ids: Dict[str, int] = {}
+    files = 0
+    temporary = output.with_name(output.name + ".tmp")
+    with lzma.open(temporary, "wt", encoding="utf-8", preset=preset) as f:
+        f.write(_dumps({"type": "header", "version": ARCHIVE_VERSION}) + "\n")
+        for path in iter_json_files(root):
+            try:
+                with path.open(encoding="utf-8") as source:
+                    movie_data = json.load(source)
+            except (OSError, ValueError) as e:
+                print(f"No se pudo archivar {path}: {e}")
+                continue
+            if not isinstance(movie_data, dict):
+                print(f"No se archiva {path}: no es una película")
+                continue
+
+            metadata = {
+                key: movie_data[key] for key in MOVIE_METADATA if key in movie_data
+            }
+            metadata_key = _dumps(metadata)
+            movie_id = movie_ids.get(metadata_key)
+            if movie_id is None:
+                movie_id = movie_ids[metadata_key] = len(movie_ids)
+                f.write(_dumps({"type": "movie", "id": movie_id, **metadata}) + "\n")
+
+            # Las funciones y el resto de campos apuntan a la película
+            rest = {
+                key: value
+                for key, value in movie_data.items()
+                if key not in MOVIE_METADATA
+            }
+            record = {
+                "type": "file",
+                "path": path.relative_to(root).as_posix(),
+                "movie": movie_id,
+                "data": rest,
+            }
+            f.write(_dumps(record) + "\n")
+            files += 1
+    temporary.replace(output)
+    return output, files
+
+
+def read_archive(path: Path) -> Iterator[Tuple[str, dict]]:
+    # Devuelve (ruta relativa, movie_data) sin cargar todo el archivo en memoria
+    movies: Dict[int, dict] = {}
+    with lzma.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            kind = record.pop("type")
+            if kind == "header":
+                if record["version"] > ARCHIVE_VERSION:
+                    raise ValueError(
+                        f"Versión de archivo no soportada: {record['version']}"
+                    )
+            elif kind == "movie":
+                movies[record.pop("id")] = record
+            elif kind == "file":
+                yield record["path"], {**movies[record["movie"]], **record["data"]}
+
+
+def extract(path: Path, root: Path) -> int:
+    # Restaura el árbol data/<ciudad>/<cadena>/<cine>/<día>
+    root = Path(root)
+    total = 0
+    for relative, movie_data in read_archive(path):
+        file_path = root / relative
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_path.open("w", encoding="utf-8") as f:
+            json.dump(movie_data, f, ensure_ascii=False, indent=4)
+        total += 1
+    return total
+
+
+def folder_size(root: Path) -> int:
+    return sum(path.stat().st_size for path in iter_json_files(root))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Archiva el historial de horarios en un solo archivo comprimido"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = commands.add_parser("pack", help="Empaqueta la carpeta de datos")
+    pack_parser.add_argument("--root", default="data")
+    pack_parser.add_argument("--output", help="Por defecto data/.archive/<fecha>.jsonl.xz")
+
+    list_parser = commands.add_parser("list", help="Muestra el contenido de un archivo")
+    list_parser.add_argument("archive")
+
+    extract_parser = commands.add_parser("extract", help="Restaura los JSON archivados")
+    extract_parser.add_argument("archive")
+    extract_parser.add_argument("--root", default="data")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        output, files = pack(Path(args.root), args.output and Path(args.output))
+        before = folder_size(Path(args.root))
+        after = output.stat().st_size
+        console.print(
+            f"[green]{files} archivos empaquetados en {output} "
+            f"({before / 1024:.0f} KB → {after / 1024:.0f} KB)[/green]"
+        )
+    elif args.command == "list":
+        for relative, movie_data in read_archive(Path(args.archive)):
+            console.print(f"[cyan]{relative}[/] {movie_data.get('title', '')}")
+    else:
+        total = extract(Path(args.archive), Path(args.root))
+        console.print(f"[green]{total} archivos restaurados en {args.root}[/green]")
+
+
+if __name__ == "__main__":
+    main()
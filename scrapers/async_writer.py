@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+import asyncio, zlib
+
+_STOP = object()
+
+
+class WriterError(Exception):
+    def __init__(self, errors: List[Exception]):
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} archivo(s) no se pudieron guardar: "
+            + "; ".join(str(error) for error in errors)
+        )
+
+
+class AsyncWriter:
+    """
+    Escribe los archivos en hilos aparte para no bloquear el bucle de eventos.
+    Cada archivo va siempre al mismo carril (un hilo), así que sus escrituras
+    se hacen en orden; la cola de cada carril es acotada.
+    """
+
+    def __init__(self, lanes: int = 2, max_backlog: int = 8):
+        self.lanes = [asyncio.Queue(maxsize=max_backlog) for _ in range(lanes)]
+        self.executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"writer-{i}")
+            for i in range(lanes)
+        ]
+        self.errors: List[Exception] = []
+        self._consumers: List[asyncio.Task] = []
+        self._closed = False
+
+    def _start(self):
+        if not self._consumers:
+            self._consumers = [
+                asyncio.create_task(self._consume(lane, executor))
+                for lane, executor in zip(self.lanes, self.executors)
+            ]
+
+    async def _consume(self, lane: asyncio.Queue, executor: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await lane.get()
+            try:
+                if job is _STOP:
+                    return
+                write, args, on_done = job
+                # Si on_done falla el carril sigue vivo: si no, flush y close no terminarían
+                try:
+                    await loop.run_in_executor(executor, write, *args)
+                    if on_done is not None:
+                        on_done()
+                except Exception as e:
+                    self.errors.append(e)
+            finally:
+                lane.task_done()
+
+    async def submit(
+        self,
+        key: str,
+        write: Callable,
+        *args,
+        on_done: Optional[Callable[[], None]] = None,
+    ):
+        # Espera si el carril está lleno: el scraping no adelanta demasiado a la escritura
+        if self._closed:
+            raise RuntimeError("El escritor ya fue cerrado")
+        self._start()
+        lane = self.lanes[zlib.crc32(key.encode("utf-8")) % len(self.lanes)]
+        await lane.put((write, args, on_done))
+
+    async def flush(self):
+        await asyncio.gather(*(lane.join() for lane in self.lanes))
+
+    async def close(self):
+        # Termina lo pendiente y reporta al final los errores de escritura
+        if self._closed:
+            return
+        self._closed = True
+        if self._consumers:
+            for lane in self.lanes:
+                await lane.put(_STOP)
+            await asyncio.gather(*self._consumers)
+        for executor in self.executors:
+            executor.shutdown(wait=True)
+        if self.errors:
+            raise WriterError(self.errors)
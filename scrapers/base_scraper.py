@@ -1,14 +1,97 @@
 from abc import ABC, abstractmethod
-from playwright.async_api import Playwright, Browser, Page, Locator, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext, Page, Locator, TimeoutError as PlaywrightTimeoutError
 from rich.text import Text
 from rich.console import Console
-from typing import List, Tuple
-import asyncio
+from scrapers.catalogue_cache import CatalogueCache, CataloguePath
+from scrapers.poster_cache import PosterCache
+from scrapers.run_journal import RunJournal
+from scrapers.browser_profile import BrowserProfile
+from scrapers.deep_links import DeepLinkCache
+from scrapers.rate_limiter import RateLimiter
+from scrapers.html_snapshots import SnapshotStore
+from scrapers.browser_host import read_endpoint
+from scrapers.async_writer import AsyncWriter, WriterError
+from scrapers.entity_resolver import MovieResolver
+from scrapers.memory_profiler import MemoryProfiler
+from scrapers.deadline import DeadlineExceeded, RunDeadline
+from contextlib import asynccontextmanager, nullcontext
+from scrapers.models import StreamEvent, Target
+from scrapers.sinks import SINKS, ExcelSink, JsonSink, MultiSink, SerializedMovie
+from slugify import slugify
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import asyncio, copy, functools, inspect, re, time
+
+# Marca el final de la recopilación en la cola de stream()
+_END = object()
 
 console = Console()
 
 
+def profiled(stage: str):
+    # Atribuye al profiler de memoria lo que ocurre mientras corre el método
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            with self.stage(stage):
+                return await method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 class BaseScraper(ABC):
+    # Nombre de la cadena, usado como raíz del catálogo de filtros
+    chain: Optional[str] = None
+
+    def __init__(
+        self,
+        catalogue: Optional[CatalogueCache] = None,
+        poster_cache: Optional[PosterCache] = None,
+        journal: Optional[RunJournal] = None,
+        profile: Optional[BrowserProfile] = None,
+        deep_links: Optional[DeepLinkCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        snapshots: Optional[SnapshotStore] = None,
+        cdp_endpoint: Optional[str] = None,
+        resolver: Optional[MovieResolver] = None,
+        profiler: Optional[MemoryProfiler] = None,
+        deadline: Optional[RunDeadline] = None,
+    ):
+        self.catalogue = catalogue or CatalogueCache()
+        # URLs de la cartelera ya filtrada por combinación
+        self.deep_links = deep_links or DeepLinkCache()
+        # Ritmo y concurrencia por sitio; en lotes lo comparten todas las páginas
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # HTML guardado para volver a extraer sin navegador
+        self.snapshots = snapshots
+        # Id común de cada película entre cadenas, cines y días
+        self.resolver = resolver or MovieResolver()
+        # Muestreo de memoria por etapa, solo si se pidió
+        self.profiler = profiler
+        # Plazo de la ejecución y tiempo máximo por película
+        self.deadline = deadline
+        # Chromium ya abierto por browser_host ("auto" lee su dirección del disco)
+        self.cdp_endpoint = cdp_endpoint
+        self.attached = False
+        # Etapa opcional de descarga de pósters
+        self.poster_cache = poster_cache
+        # Bitácora para retomar ejecuciones interrumpidas
+        self.journal = journal
+        # Perfil del navegador que se conserva entre ejecuciones
+        self.profile = profile
+        # Filtros escogidos hasta el momento (ciudad, cine, día)
+        self.selected_filters: List[str] = []
+        # Respuestas ya decididas para cada filtro, sin preguntar al usuario
+        self.preset_filters: Optional[Dict[str, str]] = None
+        # Supervisor de la página, si se activó el reciclado
+        self.supervisor = None
+        # Escritor en hilos aparte, activo mientras dura la recopilación
+        self.writer: Optional[AsyncWriter] = None
+        # Recibe cada película apenas se extrae (lo usa stream)
+        self.listener: Optional[Callable[[dict], Awaitable[None]]] = None
+
     @abstractmethod
     def scrape(self):
         """
@@ -32,12 +115,343 @@ class BaseScraper(ABC):
                     fila.append(item)
             console.print(fila)
 
+    async def create_folder(
+        self, city: str, cinema: str, day: str, chain: Optional[str] = None
+    ) -> Path:
+        city_slugify = slugify(city)
+        day_slugify = slugify(day, separator="_")
+        cinema_slugify = slugify(cinema, separator="_")
+        output_folder = (
+            Path("data")
+            / city_slugify
+            / (chain or self.chain)
+            / cinema_slugify
+            / day_slugify
+        )
+        output_folder.mkdir(parents=True, exist_ok=True)
+        return output_folder
+
+    def save_json(self, output_folder: Path, movie_data: dict):
+        JsonSink().write(output_folder, SerializedMovie(movie_data))
+
+    def save_excel(self, output_folder: Path, movie_data: dict):
+        ExcelSink().write(output_folder, SerializedMovie(movie_data))
+
+    @asynccontextmanager
+    async def writing(self):
+        # Las escrituras se solapan con el scraping y se vacían al terminar
+        self.writer = AsyncWriter()
+        try:
+            yield self.writer
+        except BaseException:
+            # Los errores de escritura no deben tapar el error de la recopilación
+            writer, self.writer = self.writer, None
+            try:
+                await writer.close()
+            except WriterError as e:
+                print(e)
+            raise
+        writer, self.writer = self.writer, None
+        await writer.close()
+
+    async def save_movie(
+        self,
+        format_to_save: Callable,
+        output_folder: Path,
+        movie_data: dict,
+        on_saved: Optional[Callable[[], None]] = None,
+    ):
+        self.resolver.assign(movie_data)
+        if self.profiler is not None:
+            format_to_save = self.profiler.wrap("save", format_to_save)
+        if self.listener is not None:
+            # Espera si el consumidor va lento: así la recopilación no se adelanta
+            await self.listener(copy.deepcopy(movie_data))
+        if self.writer is None:
+            format_to_save(output_folder, movie_data)
+            if on_saved:
+                on_saved()
+            return
+        key = f"{output_folder}/{movie_data.get('title', '')}"
+        await self.writer.submit(
+            key, format_to_save, output_folder, movie_data, on_done=on_saved
+        )
+
+    def stage(self, name: str):
+        return self.profiler.stage(name) if self.profiler else nullcontext()
+
+    async def start_profiler(self):
+        if self.profiler:
+            await self.profiler.start()
+
+    async def stop_profiler(self, runs_folder: Path = Path("data") / ".runs"):
+        # El resumen va a la carpeta oculta de las ejecuciones: en la carpeta del día
+        # el archivo, el índice y la analítica lo tomarían por una película
+        if self.profiler:
+            await self.profiler.stop()
+            # Uno por ejecución, con el id de la bitácora para cruzarlos
+            run_id = self.journal.run_id if self.journal else time.strftime("%Y%m%d-%H%M%S")
+            path = self.profiler.write_summary(runs_folder, f"memory_profile-{run_id}.json")
+            self.profiler.print_summary()
+            console.print(f"[green]Perfil de memoria guardado en {path}[/green]")
+
+    async def within_budget(
+        self, work: Awaitable, target: Target, index: int, title: str
+    ) -> bool:
+        # False si la película se saltó por pasarse de su tiempo
+        if self.deadline is None:
+            await work
+            return True
+        if self.deadline.expired:
+            # Lo que no se va a esperar se descarta: una corrutina se cierra y una
+            # tarea se cancela
+            if inspect.iscoroutine(work):
+                work.close()
+            elif isinstance(work, asyncio.Future):
+                work.cancel()
+            raise DeadlineExceeded("Se acabó el plazo de la ejecución")
+        budget = asyncio.timeout(self.deadline.movie_timeout())
+        try:
+            async with budget:
+                await work
+        except TimeoutError:
+            if not budget.expired():
+                raise
+            self.deadline.check()
+            console.print(
+                f"[yellow]⏱️ [bold]{title}[/bold] superó los "
+                f"{self.deadline.movie_budget:.0f} s por película, se salta[/yellow]"
+            )
+            if self.journal:
+                self.journal.record_movie(target, index, title, status="timeout")
+            return False
+        return True
+
+    async def defer_target(self, target: Target):
+        # Lo ya recopilado se escribe y la combinación queda para --resume
+        await self.flush_writer()
+        if self.journal:
+            self.journal.defer_target(target)
+        console.print(
+            f"[yellow]⏰ Se acabó el plazo: {target.cinema} ({target.day}) queda pendiente[/yellow]"
+        )
+
+    async def process_movies_writing(self, *args):
+        # Las escrituras pendientes se vacían aunque se corte por el plazo
+        async with self.writing():
+            await self.process_movies(*args)
+
+    async def run_until_deadline(self, work: Awaitable) -> bool:
+        # False si se acabó el plazo; lo recopilado hasta ese momento ya quedó guardado
+        if self.deadline is None:
+            await work
+            return True
+        scope = self.deadline.scope()
+        try:
+            async with scope:
+                await work
+        except DeadlineExceeded:
+            return False
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            return False
+        return True
+
+    async def flush_writer(self):
+        if self.writer is not None:
+            await self.writer.flush()
+        self.resolver.save()
+
+    @abstractmethod
+    async def scrape_target(
+        self, browser: Browser, target: Target, format_to_save: Callable
+    ) -> Path:
+        """
+        Recopila una combinación sin preguntar nada; la usan stream y los lotes
+        """
+        pass
+
+    async def stream(
+        self,
+        targets: Iterable[Target],
+        format_to_save: Optional[Callable] = None,
+        max_buffer: int = 8,
+    ) -> AsyncIterator[StreamEvent]:
+        # Entrega cada película apenas se extrae; sin format_to_save no se escribe nada
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffer)
+        current: List[Target] = []
+        targets = list(targets)
+
+        async def emit(movie_data: dict):
+            await queue.put(StreamEvent("movie", current[0], movie_data))
+
+        async def defer(pending: List[Target]):
+            for target in pending:
+                await self.defer_target(target)
+                await queue.put(StreamEvent("target_deferred", target))
+
+        async def produce():
+            # Si se cancela no se marca el final: nadie está leyendo la cola
+            try:
+                async with async_playwright() as p:
+                    browser = await self.setup_browser(p)
+                    try:
+                        for i, target in enumerate(targets):
+                            if self.deadline and self.deadline.expired:
+                                await defer(targets[i:])
+                                break
+                            current[:] = [target]
+                            await queue.put(StreamEvent("target_start", target))
+                            try:
+                                await self.scrape_target(
+                                    browser, target, format_to_save or (lambda *_: None)
+                                )
+                            except DeadlineExceeded:
+                                # Pasado el plazo no se empieza nada más: la actual y
+                                # las que faltan quedan para --resume
+                                await defer(targets[i:])
+                                break
+                            except Exception as e:
+                                await queue.put(
+                                    StreamEvent("target_failed", target, error=str(e))
+                                )
+                                continue
+                            await queue.put(StreamEvent("target_done", target))
+                    finally:
+                        await self.close_browser(browser)
+            except Exception:
+                await queue.put(_END)
+                raise
+            await queue.put(_END)
+
+        self.listener = emit
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                event = await queue.get()
+                if event is _END:
+                    break
+                yield event
+            # Propaga el error si no se pudo abrir el navegador
+            await producer
+        finally:
+            self.listener = None
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+    async def ask_format_to_save(self) -> MultiSink:
+        # Se pueden escoger varios formatos; todos salen de una sola recopilación
+        formats_keys = list(SINKS)
+        self.print_list_of_items(formats_keys)
+        formats_chosen = await self.ask_user_for_choices(formats_keys, "formato")
+        return MultiSink.from_labels([formats_keys[i - 1] for i in formats_chosen])
+
+    async def message_if_takes_time(self):
+        try:
+            await asyncio.sleep(5)
+            console.print(
+                "Espere un momento, es que hay [cyan]muchos horarios[/] por recopilar."
+            )
+            await asyncio.sleep(17)
+            console.print(
+                "Vaya, sí que hay [bold cyan]demasiados horarios[/] para esta película."
+            )
+        except asyncio.CancelledError:
+            pass
+
+    async def attach_browser(self, p: Playwright) -> Optional[BrowserContext]:
+        endpoint = read_endpoint() if self.cdp_endpoint == "auto" else self.cdp_endpoint
+        if not endpoint:
+            print("No hay un navegador anfitrión activo, se lanza Chromium localmente")
+            return None
+        try:
+            browser = await p.chromium.connect_over_cdp(endpoint, timeout=3000)
+        except Exception as e:
+            print(f"No se pudo conectar a {endpoint} ({e}), se lanza Chromium localmente")
+            return None
+        # Un contexto nuevo por ejecución; al cerrarlo Chromium sigue abierto
+        context = await self.new_context(browser)
+        self.attached = True
+        return context
+
     async def setup_browser(self, p: Playwright) -> Browser:
+        # El perfil persistente necesita su propio Chromium
+        if self.cdp_endpoint and not (self.profile and self.profile.persistent):
+            context = await self.attach_browser(p)
+            if context is not None:
+                return context
+        if self.profile and self.profile.persistent:
+            # El contexto persistente hace las veces de navegador: tiene new_page y close
+            self.profile.user_data_dir.mkdir(parents=True, exist_ok=True)
+            return await p.chromium.launch_persistent_context(
+                self.profile.user_data_dir, headless=False
+            )
         return await p.chromium.launch(headless=False)
 
-    async def load_page(self, browser: Browser, url: str, selector_check: str) -> Page:
-        page = await browser.new_page()
-        await page.goto(url)
+    async def new_context(self, browser: Browser) -> BrowserContext:
+        # Todos los contextos nuevos (CDP, reciclado) llevan las cookies guardadas
+        return await browser.new_context(**self.page_options())
+
+    def page_options(self) -> dict:
+        # Conectado por CDP el storage_state ya se aplicó al crear el contexto
+        if self.attached:
+            return {}
+        if self.profile and not self.profile.persistent and self.profile.is_warm:
+            return {"storage_state": self.profile.state_path}
+        return {}
+
+    @classmethod
+    def add_profile_arguments(cls, parser):
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Reutiliza un perfil persistente de Chromium (cookies y caché HTTP)",
+        )
+        parser.add_argument(
+            "--storage-state",
+            action="store_true",
+            help="Reutiliza solo las cookies y el almacenamiento local",
+        )
+        parser.add_argument(
+            "--reset-profile", action="store_true", help="Borra el perfil guardado"
+        )
+        parser.add_argument(
+            "--cdp",
+            nargs="?",
+            const="auto",
+            metavar="URL",
+            help="Se conecta al Chromium de browser_host en vez de lanzar uno nuevo",
+        )
+
+    @classmethod
+    def profile_from_args(cls, args) -> Optional[BrowserProfile]:
+        if not (args.profile or args.storage_state or args.reset_profile):
+            return None
+        profile = BrowserProfile(cls.chain, persistent=not args.storage_state)
+        if args.reset_profile:
+            profile.reset()
+        return profile
+
+    async def save_profile(self, page: Page):
+        # Con perfil persistente Chromium ya guarda todo en su directorio
+        if self.profile and not self.profile.persistent:
+            self.profile.folder.mkdir(parents=True, exist_ok=True)
+            await page.context.storage_state(path=self.profile.state_path)
+
+    async def load_page(
+        self, browser: Union[Browser, BrowserContext], url: str, selector_check: str
+    ) -> Page:
+        if isinstance(browser, BrowserContext):
+            # El contexto ya se creó con el storage_state; new_page no lo acepta
+            page = await browser.new_page()
+        else:
+            page = await browser.new_page(**self.page_options())
+        await self.navigate(page, url)
         page_selector = page.locator(selector_check)
 
         for _ in range(3):
@@ -46,10 +460,17 @@ class BaseScraper(ABC):
                 break
             except:
                 print("Contenido no cargó, refrescando página...")
-                await page.reload()
+                # El sitio va lento: se reduce la concurrencia antes de reintentar
+                self.rate_limiter.penalize(url)
+                async with self.rate_limiter.request(url) as slot:
+                    slot.check(await page.reload())
                 await asyncio.sleep(2)
         return page
 
+    async def navigate(self, page: Page, url: str):
+        async with self.rate_limiter.request(url) as slot:
+            slot.check(await page.goto(url))
+
     async def extract_general_information(
         self,
         movie: Locator,
@@ -60,21 +481,62 @@ class BaseScraper(ABC):
         splitter: str,
     ):
         title = movie.locator(title_selector)
-        movie_data["title"] = (await title.inner_text()).strip()
-
-        # Extraer género, duración y restricción de edad
-        keys = ["genre", "running_time", "age_restriction"]
         movie_extra_info = movie.locator(movie_extra_info_selector)
-        extras: List[Locator] = (
-            (await movie_extra_info.inner_text()).strip().split(splitter)
+        image = movie.locator(image_selector)
+        self.fill_general_information(
+            movie_data,
+            await title.inner_text(),
+            await movie_extra_info.inner_text(),
+            await image.get_attribute("src"),
+            splitter,
         )
 
+    @staticmethod
+    def fill_general_information(
+        movie_data: dict,
+        title: str,
+        extra_info: str,
+        image_url: Optional[str],
+        splitter: str,
+    ):
+        movie_data["title"] = title.strip()
+
+        # Extraer género, duración y restricción de edad
+        keys = ["genre", "running_time", "age_restriction"]
+        extras = extra_info.strip().split(splitter)
         for key, extra in zip(keys, extras):
             movie_data[key] = extra
 
-        # Extraer url de imagen
-        image = movie.locator(image_selector)
-        movie_data["image_url"] = await image.get_attribute("src")
+        movie_data["image_url"] = image_url
+
+    async def save_snapshot(self, page: Page, target: Target, kind: str, **context):
+        if self.snapshots is None:
+            return
+        try:
+            html = await page.content()
+            await asyncio.to_thread(
+                self.snapshots.record, target, kind, page.url, html, **context
+            )
+        except Exception as e:
+            print(f"No se pudo guardar el HTML de {page.url}: {e}")
+
+    def prefetch_poster(self, movie_data: dict):
+        # Empieza la descarga mientras se recopilan los horarios
+        if self.poster_cache and movie_data.get("image_url"):
+            self.poster_cache.prefetch(movie_data["image_url"])
+
+    async def attach_poster(self, movie_data: dict):
+        if not self.poster_cache or not movie_data.get("image_url"):
+            return
+        try:
+            poster_path = await self.poster_cache.fetch(movie_data["image_url"])
+            movie_data["image_path"] = poster_path.as_posix()
+        except Exception as e:
+            print(f"No se pudo descargar el póster de {movie_data.get('title')}: {e}")
+
+    def close_poster_cache(self):
+        if self.poster_cache:
+            self.poster_cache.close()
 
     async def enter_movie_details_page(
         self,
@@ -105,12 +567,96 @@ class BaseScraper(ABC):
                 print("El número que ingresó es inválido. Ingrese uno válido.")
                 continue
 
-    async def print_locators(self, items: Locator):
-        count = await items.count()
-        strings = []
-        for i in range(count):
-            strings.append((await items.nth(i).inner_text()).strip())
+    async def ask_user_for_choices(self, items: list, filter: str) -> List[int]:
+        while True:
+            try:
+                print()
+                answer = input(
+                    f"Seleccione uno o más números de {filter} (ej. 1,3): "
+                ).strip()
+                chosen = [int(part) for part in re.split(r"[\s,]+", answer) if part]
+                if not chosen or any(i <= 0 or i > len(items) for i in chosen):
+                    raise ValueError
+                # Sin repetidos y en el orden en que se escribieron
+                return list(dict.fromkeys(chosen))
+            except ValueError:
+                print("Algún número que ingresó es inválido. Ingrese números válidos.")
+                continue
+
+    def note_navigation(self):
+        if self.supervisor:
+            self.supervisor.note_navigation()
+
+    async def close_browser(self, browser: Browser):
+        # Si el supervisor relanzó el navegador, el que hay que cerrar es el nuevo
+        if self.supervisor and self.supervisor.browser is not None:
+            browser = self.supervisor.browser
+        await browser.close()
+
+    def build_target(self, city: str, cinema: str, day: str) -> Target:
+        return Target(self.chain or "", city, cinema, day)
+
+    def is_target_done(self, target: Target) -> bool:
+        return self.journal is not None and self.journal.is_target_done(target)
+
+    def is_movie_done(self, target: Target, title: str) -> bool:
+        return self.journal is not None and self.journal.is_movie_done(target, title)
+
+    async def read_catalogue_level(
+        self, browser: Browser, parents: Tuple[str, ...]
+    ) -> List[str]:
+        # Opciones del filtro que sigue a `parents` (ciudades, cines o fechas); solo
+        # las cadenas que admiten lotes lo implementan
+        raise NotImplementedError(f"{type(self).__name__} no recorre su catálogo")
+
+    async def crawl_catalogue(self, browser: Browser, levels: int = 3) -> int:
+        # Llena todo el árbol ciudad → cine → fecha para planificar lotes sin una
+        # sesión interactiva previa; lo vigente no se vuelve a leer
+        read = 0
+        pending: List[Tuple[str, ...]] = [()]
+        while pending:
+            parents = pending.pop(0)
+            path = (self.chain, *parents)
+            options = self.catalogue.get(path)
+            if options is None:
+                try:
+                    options = await self.read_catalogue_level(browser, parents)
+                except (LookupError, PlaywrightTimeoutError) as e:
+                    console.print(
+                        f"[yellow]No se pudo leer {' / '.join(path)}: {e}[/yellow]"
+                    )
+                    continue
+                self.catalogue.put(path, options)
+                read += 1
+            if len(parents) + 1 < levels:
+                pending.extend((*parents, option) for option in options)
+        return read
+
+    def catalogue_path(self) -> Optional[CataloguePath]:
+        if self.chain is None:
+            return None
+        return (self.chain, *self.selected_filters)
+
+    async def read_locator_texts(self, items: Locator) -> List[str]:
+        # Lee todos los textos en una sola evaluación del DOM
+        return [text.strip() for text in await items.all_inner_texts()]
+
+    async def find_item_index(self, items: Locator, text: str) -> int:
+        texts = await self.read_locator_texts(items)
+        if text not in texts:
+            raise LookupError(f"No se encontró la opción '{text}'")
+        return texts.index(text) + 1
+
+    async def print_locators(self, items: Locator) -> List[str]:
+        path = self.catalogue_path()
+        if path is None:
+            strings = await self.read_locator_texts(items)
+        else:
+            strings = await self.catalogue.get_or_refresh(
+                path, lambda: self.read_locator_texts(items)
+            )
         self.print_list_of_items(strings)
+        return strings
 
     async def select_filter(
         self, items: Locator, page: Page, filter: str
@@ -130,25 +676,40 @@ class BaseScraper(ABC):
                     return Array.from(chips).some(chip => chip.innerText.includes("{item_text}"));
                 }}"""
             )
+            self.selected_filters.append(item_text)
             return (item_text, True)
 
+        preset = (self.preset_filters or {}).get(filter)
+        if preset is not None:
+            # Ejecución por lotes: se busca la opción sin preguntar
+            filter_chosen = await self.find_item_index(items, preset)
+            return await execute_user_input(items, page, filter_chosen)
+
         # Imprime la lista de items disponibles
-        await self.print_locators(items)
+        strings = await self.print_locators(items)
         # Pedirle al usuario que seleccione un item
-        filter_chosen = await self.ask_user_for_input(items, filter)
+        filter_chosen = await self.ask_user_for_input(strings, filter)
+        # La lista pudo salir del catálogo: se ubica la opción por su texto en la página
+        try:
+            filter_chosen = await self.find_item_index(items, strings[filter_chosen - 1])
+        except LookupError:
+            print("La opción ya no está disponible, actualizando la lista...")
+            path = self.catalogue_path()
+            if path is not None:
+                self.catalogue.invalidate(path)
+            return await self.select_filter(items, page, filter)
         return await execute_user_input(items, page, filter_chosen)
 
-    async def apply_specific_filter(
+    async def open_filter(
         self,
         page: Page,
         filter_name: str,
         title_selector: str,
         accordion_selector: str,
         item_selector: str,
-    ) -> Tuple[str, bool]:
+    ) -> Optional[Locator]:
+        # Expande el acordeón del filtro y devuelve sus opciones
         title_element = page.locator(title_selector)
-        if not title_element:
-            return ("Missing filter title", False)
         accordion_locator = page.locator(accordion_selector)
         title_element_count = await title_element.count()
         for i in range(title_element_count):
@@ -159,12 +720,26 @@ class BaseScraper(ABC):
                     await accordion_locator.nth(i).click()
 
                 accordion = accordion_locator.nth(i)
-                items = accordion.locator(item_selector)
+                return accordion.locator(item_selector)
+        return None
 
-                return await self.select_filter(items, page, filter_name)
-
-        # Si no hay ningún filtro que coincida, se retorna nada
-        return ("Filters don't matches", False)
+    async def apply_specific_filter(
+        self,
+        page: Page,
+        filter_name: str,
+        title_selector: str,
+        accordion_selector: str,
+        item_selector: str,
+    ) -> Tuple[str, bool]:
+        if not page.locator(title_selector):
+            return ("Missing filter title", False)
+        items = await self.open_filter(
+            page, filter_name, title_selector, accordion_selector, item_selector
+        )
+        if items is None:
+            # Si no hay ningún filtro que coincida, se retorna nada
+            return ("Filters don't matches", False)
+        return await self.select_filter(items, page, filter_name)
 
     async def apply_filters(
         self,
@@ -175,6 +750,7 @@ class BaseScraper(ABC):
         item_selector: str,
     ) -> List[str]:
         # Selecciona todos los filtros y aplicar los escogidos
+        self.selected_filters = []
         applied = {filter_name: False for filter_name in filters_to_apply}
         data = []
         for filter_name in filters_to_apply:
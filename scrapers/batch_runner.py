@@ -0,0 +1,433 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Type
+from playwright.async_api import async_playwright, Browser
+from scrapers.base_scraper import BaseScraper, console
+from scrapers.catalogue_cache import CatalogueCache
+from scrapers.deadline import RunDeadline
+from scrapers.cineplanet_scraper import CineplanetScraper
+from scrapers.cinepolis_scraper import CinepolisScraper
+from scrapers.models import Target
+from scrapers.entity_resolver import MovieResolver, reassign
+from scrapers.prioritizer import Prioritizer
+from scrapers.rate_limiter import RateLimiter
+from scrapers.run_journal import RunJournal
+from scrapers.sinks import SINKS, JsonSink, MultiSink
+from scrapers.work_queue import WorkQueue
+from slugify import slugify
+import argparse, asyncio, json, multiprocessing, os, socket, uuid
+
+# Solo estas cadenas tienen scrape_target; UVK aún no admite lotes ni cola
+CHAINS: Dict[str, Type[BaseScraper]] = {
+    "cineplanet": CineplanetScraper,
+    "cinepolis": CinepolisScraper,
+}
+
+
+async def refresh_catalogue(catalogue: CatalogueCache, chains: Iterable[str]) -> int:
+    # Recorre el catálogo de cada cadena antes de planificar, así los lotes no
+    # dependen de una sesión interactiva reciente; lo vigente no se vuelve a leer
+    read = 0
+    async with async_playwright() as p:
+        for chain in chains:
+            scraper = CHAINS[chain](catalogue=catalogue)
+            browser = await scraper.setup_browser(p)
+            try:
+                read += await scraper.crawl_catalogue(browser)
+            finally:
+                await browser.close()
+    return read
+
+
+def plan_targets(
+    catalogue: CatalogueCache,
+    chains: Iterable[str],
+    city: Optional[str] = None,
+) -> List[Target]:
+    # Las combinaciones salen del catálogo en caché (ver refresh_catalogue)
+    targets = []
+    for chain in chains:
+        for target_city, cinema, day in catalogue.combinations(chain):
+            if city and city.lower() not in target_city.lower():
+                continue
+            targets.append(Target(chain, target_city, cinema, day))
+    return targets
+
+
+def deferred_first(targets: List[Target], deferred: Iterable[Target]) -> List[Target]:
+    # Lo que la ejecución retomada dejó aplazado por el plazo va primero, en el orden
+    # de prioridad; lo que ya no está en el catálogo no se agrega
+    keys = {target.key for target in deferred}
+    return [target for target in targets if target.key in keys] + [
+        target for target in targets if target.key not in keys
+    ]
+
+
+def shard_targets(targets: List[Target], workers: int) -> List[List[Target]]:
+    # Cada combinación va a un solo proceso; se reparten en turnos, así las más
+    # prioritarias arrancan a la vez en procesos distintos
+    unique = list(dict.fromkeys(targets))
+    shards: List[List[Target]] = [[] for _ in range(max(1, workers))]
+    for i, target in enumerate(unique):
+        shards[i % len(shards)].append(target)
+    return [shard for shard in shards if shard]
+
+
+async def scrape_targets(
+    targets: List[Target],
+    pages: int = 2,
+    run_id: Optional[str] = None,
+    journal_path: Optional[Path] = None,
+    deadline: Optional[RunDeadline] = None,
+    formats: Optional[List[str]] = None,
+) -> List[dict]:
+    # Un Playwright por proceso, con un máximo de `pages` páginas a la vez
+    if not targets:
+        return []
+    format_to_save = MultiSink.from_labels(formats or [JsonSink.label])
+    semaphore = asyncio.Semaphore(pages)
+    journal = None
+    if journal_path:
+        # Todos los procesos escriben en la misma bitácora y ejecución
+        journal = RunJournal(journal_path, run_id)
+        journal.load_progress()
+    results: List[dict] = []
+    # Un solo limitador para todas las páginas del proceso
+    rate_limiter = RateLimiter()
+    resolver = MovieResolver()
+
+    async def run_one(browser: Browser, target: Target):
+        titles: List[str] = []
+
+        def save(output_folder: Path, movie_data: dict):
+            format_to_save(output_folder, movie_data)
+            titles.append(movie_data["title"])
+
+        async with semaphore:
+            if deadline and deadline.expired:
+                # No alcanzó a empezar: queda para la próxima ejecución
+                if journal:
+                    journal.defer_target(target)
+                results.append({"target": target.to_dict(), "status": "deferred"})
+                return
+            scraper = CHAINS[target.chain](
+                journal=journal, rate_limiter=rate_limiter, resolver=resolver, deadline=deadline
+            )
+            folders: List[Path] = []
+
+            async def scrape():
+                folders.append(await scraper.scrape_target(browser, target, save))
+
+            try:
+                if not await scraper.run_until_deadline(scrape()):
+                    if journal:
+                        journal.defer_target(target)
+                    results.append(
+                        {"target": target.to_dict(), "status": "deferred", "movies": titles}
+                    )
+                    return
+                results.append(
+                    {
+                        "target": target.to_dict(),
+                        "status": "done",
+                        "output_folder": folders[0].as_posix(),
+                        "movies": titles,
+                    }
+                )
+            except Exception as e:
+                console.print(f"[red]❌ Falló {target.key}: {e}[/red]")
+                results.append(
+                    {"target": target.to_dict(), "status": "failed", "error": str(e)}
+                )
+
+    async with async_playwright() as p:
+        browser = await CHAINS[targets[0].chain]().setup_browser(p)
+        try:
+            await asyncio.gather(*(run_one(browser, target) for target in targets))
+        finally:
+            await browser.close()
+    if journal:
+        journal.close()
+    return results
+
+
+def run_worker(
+    targets: List[Target],
+    pages: int,
+    run_id: str,
+    journal_path: Optional[str],
+    deadline: Optional[RunDeadline] = None,
+    formats: Optional[List[str]] = None,
+) -> List[dict]:
+    # Punto de entrada de cada proceso del pool
+    return asyncio.run(
+        scrape_targets(
+            targets,
+            pages,
+            run_id,
+            Path(journal_path) if journal_path else None,
+            deadline,
+            formats,
+        )
+    )
+
+
+def merge_results(results: Iterable[List[dict]]) -> List[dict]:
+    # Una sola entrada por combinación; un resultado correcto prevalece sobre un fallo
+    merged: Dict[str, dict] = {}
+    for shard_results in results:
+        for result in shard_results:
+            key = Target.from_dict(result["target"]).key
+            if key not in merged or result["status"] == "done":
+                merged[key] = result
+    return list(merged.values())
+
+
+def reconcile_movie_ids(results: List[dict], resolver: MovieResolver) -> int:
+    # Cada proceso resuelve con su propio registro y una variante del título vista
+    # primero en procesos distintos puede quedar con ids distintos; aquí se vuelven
+    # a asignar con un solo registro. Solo se corrigen los JSON: los demás formatos
+    # conservan el id del proceso
+    paths = sorted(
+        path
+        for result in results
+        if result["status"] == "done" and result.get("output_folder")
+        for path in (
+            Path(result["output_folder"]) / f"{slugify(title)}.json"
+            for title in result.get("movies", [])
+        )
+        if path.exists()
+    )
+    if not paths:
+        return 0
+    _, updated = reassign(paths, resolver)
+    resolver.save(replace=True)
+    return updated
+
+
+def run_batch(
+    targets: List[Target],
+    workers: int = os.cpu_count() or 1,
+    pages: int = 2,
+    journal: Optional[RunJournal] = None,
+    worker: Callable = run_worker,
+    deadline: Optional[RunDeadline] = None,
+    formats: Optional[List[str]] = None,
+) -> List[dict]:
+    if journal:
+        targets = [target for target in targets if not journal.is_target_done(target)]
+    if not targets:
+        return []
+
+    shards = shard_targets(targets, workers)
+    run_id = journal.run_id if journal else uuid.uuid4().hex[:12]
+    journal_path = journal.path.as_posix() if journal else None
+
+    # Registro previo al lote, antes de que los procesos agreguen sus propios ids
+    resolver = MovieResolver()
+    resolver.load()
+
+    # spawn: cada proceso arranca su propio Playwright desde cero
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+        futures = [
+            pool.submit(worker, shard, pages, run_id, journal_path, deadline, formats)
+            for shard in shards
+        ]
+        results = merge_results(future.result() for future in futures)
+    reconcile_movie_ids(results, resolver)
+
+    manifest_path = Path("data") / ".runs" / f"batch-{run_id}.json"
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with manifest_path.open("w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=4)
+    return results
+
+
+async def consume_queue(
+    queue: WorkQueue,
+    worker_id: str,
+    pages: int = 2,
+    poll_seconds: float = 5,
+    deadline: Optional[RunDeadline] = None,
+    formats: Optional[List[str]] = None,
+) -> int:
+    # Cada página del nodo toma combinaciones de la cola compartida hasta vaciarla
+    processed = 0
+    format_to_save = MultiSink.from_labels(formats or [JsonSink.label])
+    rate_limiter = RateLimiter()
+    # Sin un proceso padre que reconcilie, los ids de títulos con variantes solo
+    # son estables dentro de este nodo (ver reconcile_movie_ids)
+    resolver = MovieResolver()
+
+    async def keep_lease(lease, scrape: asyncio.Task):
+        # Renueva el préstamo mientras la combinación se sigue recopilando; si otro
+        # nodo ya lo tomó se corta para no escribir lo mismo dos veces
+        while True:
+            await asyncio.sleep(queue.lease_seconds / 3)
+            if not await asyncio.to_thread(queue.renew, lease):
+                console.print(
+                    f"[yellow]Se perdió el préstamo de {lease.target.key}, queda para "
+                    "otro nodo[/yellow]"
+                )
+                scrape.cancel()
+                return
+
+    async def run_slot(browser: Browser, slot: int):
+        nonlocal processed
+        slot_id = f"{worker_id}/{slot}"
+        while True:
+            if deadline and deadline.expired:
+                return
+            lease = await asyncio.to_thread(queue.lease, slot_id)
+            if lease is None:
+                if await asyncio.to_thread(queue.is_drained):
+                    return
+                await asyncio.sleep(poll_seconds)
+                continue
+
+            scraper = CHAINS[lease.target.chain](
+                rate_limiter=rate_limiter, resolver=resolver, deadline=deadline
+            )
+            scrape = asyncio.create_task(
+                scraper.run_until_deadline(
+                    scraper.scrape_target(browser, lease.target, format_to_save)
+                )
+            )
+            heartbeat = asyncio.create_task(keep_lease(lease, scrape))
+            try:
+                finished = await scrape
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                # Lo canceló keep_lease: el préstamo ya es de otro
+                continue
+            except Exception as e:
+                console.print(f"[red]❌ Falló {lease.target.key}: {e}[/red]")
+                await asyncio.to_thread(queue.fail, lease, str(e))
+                continue
+            finally:
+                heartbeat.cancel()
+            if not finished:
+                # Vuelve a la cola para otro nodo sin gastar un intento
+                await asyncio.to_thread(queue.release, lease)
+                return
+            if await asyncio.to_thread(queue.complete, lease):
+                processed += 1
+
+    async with async_playwright() as p:
+        browser = await CineplanetScraper().setup_browser(p)
+        try:
+            await asyncio.gather(*(run_slot(browser, slot) for slot in range(pages)))
+        finally:
+            await browser.close()
+    return processed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Recopila en paralelo todas las combinaciones del catálogo"
+    )
+    parser.add_argument("--chains", nargs="+", default=list(CHAINS), choices=list(CHAINS))
+    parser.add_argument("--city", help="Solo las ciudades que contengan este texto")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pages", type=int, default=2, help="Páginas por proceso")
+    parser.add_argument(
+        "--resume", action="store_true", help="Retoma la última ejecución interrumpida"
+    )
+    parser.add_argument("--queue", help="Archivo SQLite de la cola compartida entre nodos")
+    parser.add_argument(
+        "--enqueue", action="store_true", help="Solo encola las combinaciones del catálogo"
+    )
+    parser.add_argument(
+        "--cap",
+        action="append",
+        default=[],
+        metavar="CADENA=N",
+        help="Máximo de combinaciones simultáneas por cadena entre todos los nodos",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        default=[JsonSink.label],
+        choices=list(SINKS),
+        help="Formatos en que se guarda cada película",
+    )
+    parser.add_argument(
+        "--skip-refresh",
+        action="store_true",
+        help="Planifica solo con el catálogo guardado, sin recorrer las cadenas",
+    )
+    RunDeadline.add_arguments(parser)
+    args = parser.parse_args(argv)
+    deadline = RunDeadline.from_args(args)
+
+    if args.queue and not args.enqueue:
+        caps = {chain: int(total) for chain, total in (cap.split("=") for cap in args.cap)}
+        queue = WorkQueue(Path(args.queue), chain_caps=caps)
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        processed = asyncio.run(
+            consume_queue(queue, worker_id, args.pages, deadline=deadline, formats=args.formats)
+        )
+        console.print(
+            f"\n[bold green]🎉 {processed} combinaciones recopiladas por {worker_id}[/bold green]"
+        )
+        return
+
+    catalogue = CatalogueCache()
+    if not args.skip_refresh:
+        read = asyncio.run(refresh_catalogue(catalogue, args.chains))
+        console.print(f"[green]{read} listas del catálogo leídas de nuevo[/green]")
+    targets = plan_targets(catalogue, args.chains, args.city)
+    if not targets:
+        console.print(
+            "[yellow]El catálogo está vacío o caducado: no se pudo leer ninguna "
+            "combinación[/yellow]"
+        )
+        return
+
+    # Primero el día más cercano, los cines con más público y los datos más viejos
+    prioritizer = Prioritizer()
+    if args.queue:
+        added = WorkQueue(Path(args.queue)).enqueue(targets, prioritizer.scores(targets))
+        console.print(f"[green]{added} combinaciones nuevas en la cola[/green]")
+        return
+
+    journal = RunJournal.open(resume=args.resume)
+    ordered = prioritizer.order(targets)
+    postponed = journal.deferred_targets() if args.resume else []
+    if postponed:
+        console.print(
+            f"[yellow]{len(postponed)} combinaciones aplazadas en la ejecución anterior "
+            "van primero[/yellow]"
+        )
+        ordered = deferred_first(ordered, postponed)
+    journal.start_run()
+    results = run_batch(
+        ordered,
+        args.workers,
+        args.pages,
+        journal,
+        deadline=deadline,
+        formats=args.formats,
+    )
+    deferred = sum(1 for result in results if result["status"] == "deferred")
+    if deferred:
+        # Sin run_end la ejecución queda pendiente para --resume
+        journal.close()
+    else:
+        journal.finish_run()
+
+    done = sum(1 for result in results if result["status"] == "done")
+    console.print(
+        f"\n[bold green]🎉 {done} de {len(results)} combinaciones recopiladas[/bold green]"
+    )
+    if deferred:
+        console.print(
+            f"[yellow]⏰ {deferred} combinaciones quedaron pendientes por el plazo: "
+            "use --resume para continuar[/yellow]"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from pathlib import Path
+from typing import List, Optional
+from playwright.async_api import async_playwright
+from rich.console import Console
+import argparse, asyncio, json, os
+
+console = Console()
+
+ENDPOINT_PATH = Path("data") / ".browser" / "endpoint.json"
+
+
+def read_endpoint(path: Path = ENDPOINT_PATH) -> Optional[str]:
+    # Dirección CDP del Chromium que mantiene abierto el proceso anfitrión
+    try:
+        with Path(path).open(encoding="utf-8") as f:
+            host = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        # Si el anfitrión murió sin limpiar, el archivo ya no sirve
+        os.kill(host["pid"], 0)
+    except (KeyError, ProcessLookupError):
+        return None
+    except PermissionError:
+        pass
+    return host.get("cdp")
+
+
+def write_endpoint(cdp: str, path: Path = ENDPOINT_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump({"cdp": cdp, "pid": os.getpid()}, f)
+    os.replace(tmp_path, path)
+
+
+async def serve(port: int = 9222, headless: bool = False, path: Path = ENDPOINT_PATH):
+    # Mantiene Chromium abierto y lo relanza si se cae
+    async with async_playwright() as p:
+        try:
+            while True:
+                browser = await p.chromium.launch(
+                    headless=headless,
+                    args=[f"--remote-debugging-port={port}", "--remote-debugging-address=127.0.0.1"],
+                )
+                disconnected = asyncio.Event()
+                browser.on("disconnected", lambda _: disconnected.set())
+                cdp = f"http://127.0.0.1:{port}"
+                write_endpoint(cdp, path)
+                console.print(f"[green]Chromium listo en {cdp}[/green]")
+                await disconnected.wait()
+                console.print("[yellow]Chromium se cerró, relanzando...[/yellow]")
+        finally:
+            Path(path).unlink(missing_ok=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Mantiene un Chromium abierto para que los scrapers se conecten por CDP"
+    )
+    parser.add_argument("--port", type=int, default=9222)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--endpoint-file", default=str(ENDPOINT_PATH))
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.port, args.headless, Path(args.endpoint_file)))
+    except KeyboardInterrupt:
+        console.print("Anfitrión del navegador detenido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from pathlib import Path
+import shutil
+
+
+class BrowserProfile:
+    """
+    Perfil del navegador guardado por cadena. En modo persistente se reutiliza el
+    directorio de Chromium completo (cookies, almacenamiento local y caché HTTP);
+    si no, solo se guarda el storage_state (cookies y almacenamiento local).
+    """
+
+    def __init__(
+        self,
+        chain: str,
+        root: Path = Path("data") / ".profiles",
+        persistent: bool = True,
+    ):
+        self.folder = Path(root) / chain
+        self.persistent = persistent
+        # Se calcula antes de abrir Chromium, que crea el directorio al arrancar
+        self.was_warm = self.is_warm
+
+    @property
+    def user_data_dir(self) -> Path:
+        return self.folder / "user-data"
+
+    @property
+    def state_path(self) -> Path:
+        return self.folder / "storage_state.json"
+
+    @property
+    def is_warm(self) -> bool:
+        # Ya hubo una ejecución que aceptó las cookies con este perfil
+        if self.persistent:
+            return self.user_data_dir.exists() and any(self.user_data_dir.iterdir())
+        return self.state_path.exists()
+
+    def reset(self):
+        if self.folder.exists():
+            shutil.rmtree(self.folder)
+            print(f"Perfil del navegador borrado: {self.folder}")
+        self.was_warm = False
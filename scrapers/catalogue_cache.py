@@ -0,0 +1,138 @@
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio, json, os, time
+
+# Caducidad por nivel del árbol cadena → ciudad → cines → fechas
+DEFAULT_TTLS: Dict[int, float] = {
+    1: 7 * 24 * 3600,  # Ciudades de la cadena
+    2: 24 * 3600,  # Cines de una ciudad
+    3: 3600,  # Fechas disponibles de un cine
+}
+
+CataloguePath = Tuple[str, ...]
+Loader = Callable[[], Awaitable[List[str]]]
+
+
+class CatalogueCache:
+    """
+    Caché persistente de los catálogos de filtros de cada cadena (ciudades,
+    cines y fechas disponibles), con caducidad por nivel y refresco en segundo plano.
+    """
+
+    SEPARATOR = "|"
+
+    def __init__(
+        self,
+        path: Path = Path("data") / ".cache" / "catalogue.json",
+        ttls: Optional[Dict[int, float]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.clock = clock
+        self._entries: Optional[Dict[str, dict]] = None
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        # Se lee el archivo solo la primera vez que se necesita
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                try:
+                    with self.path.open(encoding="utf-8") as f:
+                        self._entries = json.load(f).get("entries", {})
+                except (OSError, ValueError):
+                    print("No se pudo leer la caché de catálogos, se reconstruirá")
+        return self._entries
+
+    def _key(self, path: CataloguePath) -> str:
+        return self.SEPARATOR.join(path)
+
+    def _ttl(self, path: CataloguePath) -> float:
+        return self.ttls.get(len(path), min(self.ttls.values()))
+
+    def is_fresh(self, path: CataloguePath) -> bool:
+        entry = self.entries.get(self._key(path))
+        if entry is None:
+            return False
+        return self.clock() - entry["fetched_at"] < self._ttl(path)
+
+    def peek(self, path: CataloguePath) -> Optional[List[str]]:
+        # Devuelve lo guardado aunque haya caducado
+        entry = self.entries.get(self._key(path))
+        return list(entry["items"]) if entry else None
+
+    def get(self, path: CataloguePath) -> Optional[List[str]]:
+        return self.peek(path) if self.is_fresh(path) else None
+
+    def put(self, path: CataloguePath, items: List[str]):
+        self.entries[self._key(path)] = {
+            "items": list(items),
+            "fetched_at": self.clock(),
+        }
+        self.save()
+
+    def invalidate(self, path: CataloguePath):
+        # Elimina la entrada y todas las que cuelgan de ella
+        prefix = self._key(path)
+        for key in list(self.entries):
+            if key == prefix or key.startswith(prefix + self.SEPARATOR):
+                del self.entries[key]
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 1, "entries": self.entries}, f, ensure_ascii=False, indent=2
+            )
+        os.replace(tmp_path, self.path)
+
+    async def _refresh(self, path: CataloguePath, loader: Loader) -> List[str]:
+        key = self._key(path)
+        try:
+            items = await loader()
+            self.put(path, items)
+            return items
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def _refresh_quietly(self, path: CataloguePath, loader: Loader):
+        try:
+            await self._refresh(path, loader)
+        except Exception as e:
+            print(f"No se pudo refrescar el catálogo {self._key(path)}: {e}")
+
+    async def get_or_refresh(self, path: CataloguePath, loader: Loader) -> List[str]:
+        # Vigente: se sirve directamente
+        items = self.get(path)
+        if items is not None:
+            return items
+
+        # Caducado: se sirve lo guardado y se refresca en segundo plano
+        stale = self.peek(path)
+        key = self._key(path)
+        if stale is not None:
+            if key not in self._refreshing:
+                self._refreshing[key] = asyncio.create_task(
+                    self._refresh_quietly(path, loader)
+                )
+            return stale
+
+        # Sin datos: hay que esperar a la lectura
+        return await self._refresh(path, loader)
+
+    async def drain(self):
+        # Espera a que terminen los refrescos pendientes antes de cerrar el navegador
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+
+    def combinations(self, chain: str) -> Iterator[Tuple[str, str, str]]:
+        # Recorre el árbol guardado para planificar ejecuciones por lotes; lo caducado
+        # se omite porque esas fechas o cines ya pueden no estar en la página
+        for city in self.get((chain,)) or []:
+            for cinema in self.get((chain, city)) or []:
+                for day in self.get((chain, city, cinema)) or []:
+                    yield city, cinema, day
@@ -4,21 +4,116 @@ from playwright.async_api import (
     TimeoutError,
     Locator,
     Browser,
+    BrowserContext,
     Playwright,
 )
-from scrapers.base_scraper import BaseScraper
-from slugify import slugify
-from typing import List, Tuple, Callable
-from rich.console import Console
+from scrapers.base_scraper import BaseScraper, console, profiled
+from scrapers.models import Target
+from scrapers.run_journal import RunJournal
+from scrapers.page_supervisor import PageSupervisor
+from scrapers.html_snapshots import SnapshotStore
+from scrapers.memory_profiler import MemoryProfiler
+from scrapers.poster_cache import PosterCache
+from scrapers.deadline import DeadlineExceeded, RunDeadline
+from scrapers.prioritizer import order_movies
+from typing import List, Optional, Tuple, Callable
 from rich.traceback import install
 from pathlib import Path
-import json, asyncio, pandas
+from urllib.parse import urljoin
+import asyncio, argparse
 
-console = Console()
 install()
 
+# Lee todos los cines expandidos de la página de detalle en una sola evaluación
+SNAPSHOT_SHOWTIMES_JS = """
+(cinemas) => cinemas.map((cine) => {
+    const text = (root, selector) => {
+        const element = root.querySelector(selector);
+        return element ? element.innerText.trim() : "";
+    };
+    const containers = cine.querySelectorAll(".cinema-showcases--sessions-details");
+    return {
+        name: text(cine, ".cinema-showcases--summary-name"),
+        containers: Array.from(containers).map((container) => ({
+            dimension: text(container, ".sessions-details--formats-dimension"),
+            theather: text(container, ".sessions-details--formats-theather"),
+            language: text(container, ".sessions-details--formats-language"),
+            sessions: Array.from(
+                container.querySelectorAll(".sessions-details--session-item")
+            ).map((item) => {
+                const link = item.querySelector(".showtime-selector--link");
+                return {
+                    text: link ? link.innerText.trim() : "",
+                    disabled: (item.getAttribute("class") || "").includes(
+                        "showtime-selector_disable"
+                    ),
+                    href: link ? link.getAttribute("href") : null,
+                };
+            }),
+        })),
+    };
+})
+"""
+
+
+# Datos de toda la cartelera y el enlace al detalle de cada película, en una sola evaluación
+LISTING_JS = """
+(movies) => movies.map((movie) => {
+    const text = (selector) => {
+        const element = movie.querySelector(selector);
+        return element ? element.innerText : "";
+    };
+    const image =
+        movie.querySelector(".image-loader--image_loaded") || movie.querySelector("img");
+    const link =
+        movie.querySelector(".movie-info-details--first-button-wrapper a[href]") ||
+        movie.querySelector(".movie-info-details--first-button-wrapper[href]") ||
+        movie.querySelector("a[href]");
+    return {
+        title: text(".movies-list--large-movie-description-title"),
+        extra: text(".movies-list--large-movie-description-extra"),
+        image: image ? image.getAttribute("src") : null,
+        href: link ? link.getAttribute("href") : null,
+    };
+})
+"""
+
+
+# Filtros de la cartelera y los selectores de su título, acordeón y opciones
+FILTERS = ["Ciudad", "Cine", "Día"]
+FILTER_SELECTORS = (
+    ".movies-filter--filter-category-accordion-trigger h3",
+    ".movies-filter--filter-category-accordion",
+    ".movies-filter--filter-category-list-item-label",
+)
+
 
 class CineplanetScraper(BaseScraper):
+    chain = "cineplanet"
+    url = "https://www.cineplanet.com.pe/peliculas"
+
+    def __init__(
+        self,
+        *args,
+        expand_all: bool = False,
+        recycle_after: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+        prefetch: int = 0,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        # Expande todos los cines y extrae la página de detalle de una sola vez
+        self.expand_all = expand_all
+        # Reciclado de la página cada N navegaciones o al superar la memoria indicada
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        # Páginas de detalle que se cargan por adelantado en pestañas aparte
+        self.prefetch = prefetch
+
+    async def go_back(self, page: Page, **options):
+        # Volver atrás también recarga la página: cuenta para el ritmo del sitio
+        async with self.rate_limiter.request(self.url) as slot:
+            slot.check(await page.go_back(**options))
 
     async def _click_extract_then_go_back(
         self,
@@ -28,25 +123,28 @@ class CineplanetScraper(BaseScraper):
         wait_for_selector_new_page: str,
         wait_for_selector_return_page: str,
     ) -> str:
-        # Ingresa a la página de venta y guarda el URL
+        # Ingresa a la página de venta y guarda el URL; cada ida y vuelta es una
+        # petición al sitio y pasa por el limitador como los goto
         try:
-            await clickable_element.click()
-
-            # Presionar el botón de confirmación de compra en caso aparezca
-            tickets_section = page.locator(
-                ".call-to-action_rounded-solid.call-to-action_pink-solid.call-to-action_large"
-            )
-            if await tickets_section.is_visible():
-                await tickets_section.click()
-
-            await page.wait_for_url(expected_new_url)
-            await page.locator(wait_for_selector_new_page).wait_for(timeout=5000)
-            current_url = page.url
+            async with self.rate_limiter.request(self.url):
+                await clickable_element.click()
+
+                # Presionar el botón de confirmación de compra en caso aparezca
+                tickets_section = page.locator(
+                    ".call-to-action_rounded-solid.call-to-action_pink-solid.call-to-action_large"
+                )
+                if await tickets_section.is_visible():
+                    await tickets_section.click()
+
+                self.note_navigation()
+                await page.wait_for_url(expected_new_url)
+                await page.locator(wait_for_selector_new_page).wait_for(timeout=5000)
+                current_url = page.url
         except TimeoutError:
             print("[!] No se logró navegar correctamente")
             current_url = "Error"
         finally:
-            await page.go_back(wait_until="domcontentloaded")
+            await self.go_back(page, wait_until="domcontentloaded")
             await page.locator(wait_for_selector_return_page).wait_for(timeout=5000)
 
         return current_url
@@ -144,8 +242,19 @@ class CineplanetScraper(BaseScraper):
             raw_data.append(showtime_block)
         return cinema_name, raw_data
 
+    def listing_ready_selector(self) -> str:
+        # Con un perfil guardado el aviso de cookies ya no aparece
+        if self.profile and self.profile.was_warm:
+            return ".movies-filter--filter-category-accordion"
+        return 'button:has-text("Aceptar Cookies")'
+
     async def accept_cookies(self, page: Page):
         button = page.locator("button:has-text('Aceptar Cookies')")
+        if self.profile and self.profile.was_warm:
+            # No se espera: el consentimiento ya está guardado en el perfil
+            if await button.is_visible():
+                await button.click()
+            return
         # Espera y hace clic en el botón "Aceptar Cookies" para cerrar el aviso, si existe
         try:
             await button.wait_for(timeout=2000)
@@ -154,56 +263,7 @@ class CineplanetScraper(BaseScraper):
         except TimeoutError:
             print("No se encontró botón de cookies o hubo un problema")
 
-    async def create_folder(self, city: str, cinema: str, day: str) -> Path:
-        city_slugify = slugify(city)
-        day_slugify = slugify(day, separator="_")
-        cinema_slugify = slugify(cinema, separator="_")
-        output_folder = (
-            Path("data") / city_slugify / "cineplanet" / cinema_slugify / day_slugify
-        )
-        output_folder.mkdir(parents=True, exist_ok=True)
-        return output_folder
-
-    def save_json(self, output_folder: Path, movie_data: dict):
-        file_path = output_folder / f"{slugify(movie_data['title'])}.json"
-        with file_path.open("w", encoding="utf-8") as f:
-            json.dump(movie_data, f, ensure_ascii=False, indent=4)
-
-    def save_excel(self, output_folder: Path, movie_data: dict):
-        file_path = output_folder / f"{slugify(movie_data['title'])}.xlsx"
-        rows = []
-
-        for cinema, funciones in movie_data.get("showtimes", {}).items():
-            for funcion in funciones:
-                dimension = funcion.get("dimension", "")
-                formato = funcion.get("format", "")
-                idioma = funcion.get("language", "")
-
-                for hora_url in funcion.get("showtimes", []):
-                    hora, url = hora_url
-
-                    rows.append(
-                        {
-                            "Título": movie_data.get("title", ""),
-                            "Género": movie_data.get("genre", ""),
-                            "Duración": movie_data.get("running_time", ""),
-                            "Restricción de edad": movie_data.get(
-                                "age_restriction", ""
-                            ),
-                            "Cine": cinema,
-                            "Ciudad": movie_data.get("city", ""),
-                            "Día": movie_data.get("day", ""),
-                            "Dimensión": dimension,
-                            "Formato": formato,
-                            "Idioma": idioma,
-                            "Hora": hora,
-                            "URL": url,
-                        }
-                    )
-
-        df = pandas.DataFrame(rows)
-        df.to_excel(file_path, index=False)
-
+    @profiled("load_all_movies")
     async def load_all_movies(self, page: Page):
         button = page.locator(".movies-list--view-more-button")
         # Intenta detectar el botón por 2 segundos
@@ -222,20 +282,79 @@ class CineplanetScraper(BaseScraper):
                 print(f"Error al intentar hacer click en 'Ver más'")
                 break
 
-    async def message_if_takes_time(self):
+    async def expand_all_cinemas(self, page: Page):
+        cinema_elements = page.locator(".film-detail-showtimes--accordion")
+        expanded = await cinema_elements.evaluate_all(
+            "(cinemas) => cinemas.map((cine) => (cine.getAttribute('class') || '').includes('accordion_expanded'))"
+        )
+        for cine_idx, is_expanded in enumerate(expanded):
+            if not is_expanded:
+                await cinema_elements.nth(cine_idx).click()
+
+        # Espera a que todos los cines muestren sus funciones
         try:
-            await asyncio.sleep(5)
-            console.print(
-                "Espere un momento, es que hay [cyan]muchos horarios[/] por recopilar."
+            await page.wait_for_function(
+                """() => Array.from(
+                    document.querySelectorAll('.film-detail-showtimes--accordion')
+                ).every((cine) => cine.querySelector('.cinema-showcases--sessions-details'))""",
+                timeout=5000,
             )
-            await asyncio.sleep(17)
-            console.print(
-                "Vaya, sí que hay [bold cyan]demasiados horarios[/] para esta película."
-            )
-        except asyncio.CancelledError:
-            pass
+        except TimeoutError:
+            print("[!] Algunos cines no mostraron sus funciones")
+
+    async def _capture_url_by_click(
+        self, page: Page, cine_idx: int, container_idx: int, showtime_idx: int
+    ) -> List[str]:
+        # Camino lento para las funciones sin enlace: entra a la compra y regresa
+        cine = page.locator(".film-detail-showtimes--accordion").nth(cine_idx)
+        if "accordion_expanded" not in (await cine.get_attribute("class") or ""):
+            await cine.click()
+        container = cine.locator(".cinema-showcases--sessions-details").nth(
+            container_idx
+        )
+        session_items = container.locator(".sessions-details--session-item")
+        return await self._parse_showtimes(session_items, showtime_idx, page)
 
+    async def scrape_showtimes_snapshot(self, page: Page, movie_data: dict):
+        await self.expand_all_cinemas(page)
+        cinemas = await page.locator(".film-detail-showtimes--accordion").evaluate_all(
+            SNAPSHOT_SHOWTIMES_JS
+        )
+
+        showtimes_by_cinema: dict = {}
+        for cine_idx, cinema in enumerate(cinemas):
+            raw_data = []
+            for container_idx, container in enumerate(cinema["containers"]):
+                showtimes = []
+                for showtime_idx, session in enumerate(container["sessions"]):
+                    if session["disabled"]:
+                        continue
+                    if session["href"]:
+                        showtimes.append(
+                            [session["text"], urljoin(page.url, session["href"])]
+                        )
+                        continue
+                    showtime_text_and_link = await self._capture_url_by_click(
+                        page, cine_idx, container_idx, showtime_idx
+                    )
+                    if showtime_text_and_link:
+                        showtimes.append(showtime_text_and_link)
+                raw_data.append(
+                    {
+                        "dimension": container["dimension"],
+                        "format": container["theather"],
+                        "language": container["language"],
+                        "showtimes": showtimes,
+                    }
+                )
+            showtimes_by_cinema[cinema["name"]] = raw_data
+        movie_data["showtimes"] = showtimes_by_cinema
+
+    @profiled("scrape_showtimes_data")
     async def scrape_showtimes_data(self, page: Page, movie_data: dict):
+        if self.expand_all:
+            return await self.scrape_showtimes_snapshot(page, movie_data)
+
         # Construir el diccionario de los cines y los horarios de proyección de la película
         showtimes_by_cinema: dict = {}
         cinema_elements = page.locator(".film-detail-showtimes--accordion")
@@ -247,33 +366,89 @@ class CineplanetScraper(BaseScraper):
             showtimes_by_cinema[cinema_name] = raw_data
         movie_data["showtimes"] = showtimes_by_cinema
 
-    async def ask_format_to_save(self) -> Callable:
-        formats = {"JSON": self.save_json, "Excel": self.save_excel}
-        formats_keys = list(formats.keys())
-        self.print_list_of_items(formats_keys)
-        format_chosen = await self.ask_user_for_input(formats_keys, "formato")
-        key_chosen = formats_keys[format_chosen - 1]
-        format_to_save = formats[key_chosen]
-        return format_to_save
+    async def apply_cineplanet_filters(
+        self, page: Page, filters: List[str] = FILTERS
+    ) -> List[str]:
+        return await self.apply_filters(page, filters, *FILTER_SELECTORS)
+
+    async def read_catalogue_level(
+        self, browser: Browser, parents: Tuple[str, ...]
+    ) -> List[str]:
+        # Una página por nivel: se aplican los filtros anteriores y se leen las opciones
+        page = await self.load_page(browser, self.url, self.listing_ready_selector())
+        try:
+            await self.accept_cookies(page)
+            if parents:
+                self.preset_filters = dict(zip(FILTERS, parents))
+                await self.apply_cineplanet_filters(page, FILTERS[: len(parents)])
+            items = await self.open_filter(page, FILTERS[len(parents)], *FILTER_SELECTORS)
+            if items is None:
+                raise LookupError(f"No se encontró el filtro '{FILTERS[len(parents)]}'")
+            return await self.read_locator_texts(items)
+        finally:
+            self.preset_filters = None
+            await page.close()
+
+    async def wait_for_chips(self, page: Page, texts: List[str], timeout: float = 5000):
+        # Los chips muestran los filtros aplicados en la cartelera
+        await page.wait_for_function(
+            """(texts) => {
+                const chips = Array.from(document.querySelectorAll('.movies-chips--chip'));
+                return texts.every(text => chips.some(chip => chip.innerText.includes(text)));
+            }""",
+            arg=texts,
+            timeout=timeout,
+        )
+
+    def remember_deep_link(self, page: Page, target: Target):
+        # Solo sirve si la web refleja los filtros en la URL
+        url = page.url
+        if url and url.rstrip("/") != self.url.rstrip("/"):
+            self.deep_links.put(target, url)
+
+    async def open_filtered_listing(
+        self, browser: Browser, target: Target
+    ) -> Tuple[Page, List[str]]:
+        filters = [target.city, target.cinema, target.day]
+        url = self.deep_links.get(target)
+        if url:
+            page = await self.load_page(browser, url, self.listing_ready_selector())
+            try:
+                await self.accept_cookies(page)
+                await self.wait_for_chips(page, filters)
+                self.selected_filters = list(filters)
+                return page, filters
+            except TimeoutError:
+                print("El enlace directo ya no filtra la cartelera, usando los filtros...")
+                self.deep_links.reject(target)
+                await page.close()
+
+        page = await self.load_page(browser, self.url, self.listing_ready_selector())
+        try:
+            await self.accept_cookies(page)
+            self.preset_filters = dict(zip(FILTERS, filters))
+            applied = await self.apply_cineplanet_filters(page)
+        except BaseException:
+            await page.close()
+            raise
+        finally:
+            self.preset_filters = None
+        self.remember_deep_link(page, target)
+        return page, applied
 
     async def prepare_scrapping(
         self, p: Playwright, url: str
     ) -> Tuple[Browser, Page, Locator, str, Callable]:
         # Abrir navegador y página web
         browser = await self.setup_browser(p)
-        page = await self.load_page(browser, url, 'button:has-text("Aceptar Cookies")')
+        page = await self.load_page(browser, url, self.listing_ready_selector())
 
         # Aceptar cookies del sitio
         await self.accept_cookies(page)
 
         # Aplicar filtros
-        city, cinema, day = await self.apply_filters(
-            page,
-            ["Ciudad", "Cine", "Día"], # Lista de filtros a aplicar
-            ".movies-filter--filter-category-accordion-trigger h3", # Selector del título del filtro
-            ".movies-filter--filter-category-accordion", # Acordeón de los filtros con sus opciones
-            ".movies-filter--filter-category-list-item-label" # Cada opción del acordeón de filtros
-        )
+        city, cinema, day = await self.apply_cineplanet_filters(page)
+        self.remember_deep_link(page, self.build_target(city, cinema, day))
 
         # Crear ruta de carpetas
         output_folder = await self.create_folder(city, cinema, day)
@@ -289,82 +464,343 @@ class CineplanetScraper(BaseScraper):
 
         return browser, page, movies, output_folder, format_to_save
 
-    async def process_movies(
+    async def collect_listing(self, page: Page, movies: Locator) -> List[dict]:
+        # La cartelera ya está expandida: se lee completa una sola vez
+        listing = await movies.evaluate_all(LISTING_JS)
+        for entry in listing:
+            if entry["href"]:
+                entry["href"] = urljoin(page.url, entry["href"])
+        return listing
+
+    async def open_movie_details(self, page: Page, href: str):
+        await self.navigate(page, href)
+        await page.locator(".movie-details--info").wait_for(timeout=10000)
+
+    async def prefetch_details(self, page: Page, href: str) -> Page:
+        # Abre el detalle en otra pestaña del mismo contexto
+        details_page = await page.context.new_page()
+        try:
+            await self.open_movie_details(details_page, href)
+        except BaseException:
+            await details_page.close()
+            raise
+        return details_page
+
+    async def process_movie(
         self,
         page: Page,
-        movies: Locator,
+        entry: dict,
+        i: int,
+        target: Target,
+        chips: dict,
         output_folder: str,
         format_to_save,
+        direct: bool = True,
+        details: Optional[asyncio.Task] = None,
     ):
-        movies_count = await movies.count()
-        for i in range(movies_count):
-            movie = movies.nth(i)
-            movie_data = {}
-
-            await self.extract_general_information(
-                movie,
-                movie_data,
-                ".movies-list--large-movie-description-title",
-                ".movies-list--large-movie-description-extra",
-                ".image-loader--image_loaded",
-                ", ",
-            )
-
-            filters = page.locator(".movies-chips--chip")
-            filters_count = await filters.count()
-
-            for i in range(filters_count):
-                text = (await filters.nth(i).inner_text()).strip()
-                if i == 0:
-                    movie_data["city"] = text
-                elif i == 1:
-                    movie_data["cinema"] = text
-                else:
-                    movie_data["day"] = text
+        movie_data = {}
+        self.fill_general_information(
+            movie_data, entry["title"], entry["extra"], entry["image"], ", "
+        )
+        movie_data.update(chips)
 
+        if self.is_movie_done(target, movie_data["title"]):
             console.print(
-                f"\n[cyan]▶️ Recopilando horarios de proyección de [bold]{movie_data['title']}[/bold][/cyan]"
+                f"[yellow]⏭️ [bold]{movie_data['title']}[/bold] ya estaba guardada[/yellow]"
             )
+            return
+        self.prefetch_poster(movie_data)
 
-            await self.enter_movie_details_page(
-                movie,
-                page,
-                ".movie-info-details--first-button-wrapper", # Botón de compra de entradas
-                ".movie-details--info",
-            )
+        console.print(
+            f"\n[cyan]▶️ Recopilando horarios de proyección de [bold]{movie_data['title']}[/bold][/cyan]"
+        )
 
-            wait_message = asyncio.create_task(self.message_if_takes_time())
+        if details is not None:
+            # La pestaña se cargó mientras se recopilaba la película anterior
+            page = await details
+        elif direct:
+            # Se abre el detalle por su enlace, sin volver a la cartelera
+            await self.open_movie_details(page, entry["href"])
+        else:
+            async with self.rate_limiter.request(self.url):
+                await self.enter_movie_details_page(
+                    page.locator(".movies-list--large-item").nth(i),
+                    page,
+                    ".movie-info-details--first-button-wrapper", # Botón de compra de entradas
+                    ".movie-details--info",
+                )
+        self.note_navigation()
+
+        wait_message = asyncio.create_task(self.message_if_takes_time())
+        try:
             await self.scrape_showtimes_data(page, movie_data)
+            await self.save_snapshot(page, target, "detail", index=i, href=entry["href"])
+        finally:
             wait_message.cancel()
+            if details is not None:
+                await page.close()
+
+        await self.attach_poster(movie_data)
 
-            format_to_save(output_folder, movie_data)
+        def on_saved(title=movie_data["title"], index=i):
+            # Se marca en la bitácora solo cuando el archivo ya está escrito
+            if self.journal:
+                self.journal.record_movie(target, index, title)
             console.print(
-                f"[green]✅ Horarios de [bold]{movie_data['title']}[/bold] guardados[/green]"
+                f"[green]✅ Horarios de [bold]{title}[/bold] guardados[/green]"
             )
 
-            await page.go_back()
+        await self.save_movie(format_to_save, output_folder, movie_data, on_saved)
+
+        if not direct:
+            # Sin enlaces hay que regresar y volver a expandir la cartelera
+            await self.go_back(page)
+            await page.wait_for_selector(".movies-list--large-item")
+            await self.load_all_movies(page)
+
+    async def process_movies(
+        self,
+        page: Page,
+        movies: Locator,
+        output_folder: str,
+        format_to_save,
+    ):
+        # Los filtros aplicados son los mismos para todas las películas
+        chips = {}
+        filters = page.locator(".movies-chips--chip")
+        filters_count = await filters.count()
+        for i, key in zip(range(filters_count), ["city", "cinema", "day"]):
+            chips[key] = (await filters.nth(i).inner_text()).strip()
+
+        target = self.build_target(
+            chips.get("city", ""), chips.get("cinema", ""), chips.get("day", "")
+        )
+        if self.is_target_done(target):
+            console.print(f"[yellow]⏭️ {target.cinema} ({target.day}) ya fue recopilado[/yellow]")
+            return
+        if self.journal:
+            self.journal.start_target(target)
+
+        listing = await self.collect_listing(page, movies)
+        await self.save_snapshot(page, target, "listing")
+        listing_url = page.url
+        # Si alguna película no tiene enlace se usa el recorrido con clics
+        direct = all(entry["href"] for entry in listing)
+        # Con enlaces el orden es libre y los estrenos van primero; con clics se
+        # sigue la cartelera
+        order = order_movies(listing, self.resolver) if direct else list(range(len(listing)))
+        try:
+            if direct and self.prefetch > 0 and not self.supervisor:
+                await self.process_movies_pipelined(
+                    page, listing, target, chips, output_folder, format_to_save, order
+                )
+                order = []
+            for i in order:
+                entry = listing[i]
+                if self.supervisor:
+                    # La página puede cambiar si se recicla o se relanza el navegador
+                    work = self.supervisor.run(
+                        lambda page: self.process_movie(
+                            page, entry, i, target, chips, output_folder, format_to_save, direct
+                        )
+                    )
+                else:
+                    work = self.process_movie(
+                        page, entry, i, target, chips, output_folder, format_to_save, direct
+                    )
+                finished = await self.within_budget(work, target, i, entry["title"].strip())
+                if not finished and not direct:
+                    await self.return_to_listing(
+                        self.supervisor.page if self.supervisor else page, listing_url
+                    )
+        except DeadlineExceeded:
+            await self.defer_target(target)
+            raise
+
+        await self.flush_writer()
+        if self.journal:
+            self.journal.finish_target(target)
+
+    async def process_movies_pipelined(
+        self,
+        page: Page,
+        listing: List[dict],
+        target: Target,
+        chips: dict,
+        output_folder: str,
+        format_to_save,
+        order: Optional[List[int]] = None,
+    ):
+        # Mientras se recopila una película ya cargan las siguientes `prefetch`
+        order = list(range(len(listing))) if order is None else order
+        pending: dict = {}
+        try:
+            for position, i in enumerate(order):
+                entry = listing[i]
+                for j in order[position : position + self.prefetch + 1]:
+                    title = listing[j]["title"].strip()
+                    if j not in pending and not self.is_movie_done(target, title):
+                        pending[j] = asyncio.create_task(
+                            self.prefetch_details(page, listing[j]["href"])
+                        )
+                details = pending.pop(i, None)
+                try:
+                    await self.within_budget(
+                        self.process_movie(
+                            page,
+                            entry,
+                            i,
+                            target,
+                            chips,
+                            output_folder,
+                            format_to_save,
+                            details=details,
+                        ),
+                        target,
+                        i,
+                        entry["title"].strip(),
+                    )
+                except BaseException:
+                    if details is not None:
+                        pending[i] = details
+                    raise
+        finally:
+            # Si algo falla se cierran las pestañas que quedaron cargando
+            for task in pending.values():
+                task.cancel()
+            for result in await asyncio.gather(*pending.values(), return_exceptions=True):
+                if isinstance(result, Page):
+                    await result.close()
+
+    async def return_to_listing(self, page: Page, listing_url: str):
+        # La película se cortó a medias: puede haber quedado en su detalle
+        if page.url != listing_url:
+            await self.go_back(page)
             await page.wait_for_selector(".movies-list--large-item")
+        await self.load_all_movies(page)
+
+    async def restore_listing(self, context: BrowserContext) -> Page:
+        # Vuelve a dejar la cartelera filtrada y expandida en una página nueva
+        page, _ = await self.open_filtered_listing(
+            context, self.build_target(*self.selected_filters)
+        )
+        await self.load_all_movies(page)
+        return page
+
+    def supervise(self, p: Playwright, browser: Browser, page: Page):
+        if self.recycle_after is None and self.max_rss_mb is None:
+            return
+        self.supervisor = PageSupervisor(
+            lambda: self.setup_browser(p),
+            self.restore_listing,
+            self.new_context,
+            max_navigations=self.recycle_after or 10**9,
+            max_rss_mb=self.max_rss_mb,
+        )
+        self.supervisor.adopt(browser, page)
+
+    async def scrape_target(
+        self, browser: Browser, target: Target, format_to_save: Callable
+    ) -> Path:
+        # Recopila una combinación de filtros sin interacción del usuario
+        page, (city, cinema, day) = await self.open_filtered_listing(browser, target)
+        try:
+            output_folder = await self.create_folder(city, cinema, day)
             await self.load_all_movies(page)
             movies = page.locator(".movies-list--large-item")
+            async with self.writing():
+                await self.process_movies(page, movies, output_folder, format_to_save)
+            return output_folder
+        finally:
+            await page.close()
 
     async def scrape(self, url: str):
+        if self.journal:
+            self.journal.start_run()
         async with async_playwright() as p:
+            await self.start_profiler()
             browser, page, movies, output_folder, format_to_save = (
                 await self.prepare_scrapping(p, url)
             )
+            self.supervise(p, browser, page)
 
             with console.status(
                 "[bold green]Recopilando información de películas...[/]",
                 spinner="bouncingBall",
                 spinner_style="bold green",
             ):
-                await self.process_movies(page, movies, output_folder, format_to_save)
-
-            console.print(
-                "\n[bold green]🎉 ¡Todos los horarios han sido guardados exitosamente![/bold green]"
-            )
-            await browser.close()
+                finished = await self.run_until_deadline(
+                    self.process_movies_writing(page, movies, output_folder, format_to_save)
+                )
+
+            if finished:
+                console.print(
+                    "\n[bold green]🎉 ¡Todos los horarios han sido guardados exitosamente![/bold green]"
+                )
+            else:
+                console.print(
+                    "\n[yellow]⏰ Se acabó el plazo: lo recopilado quedó guardado, "
+                    "use --resume para continuar[/yellow]"
+                )
+            await self.catalogue.drain()
+            self.close_poster_cache()
+            await self.stop_profiler()
+            await self.save_profile(self.supervisor.page if self.supervisor else page)
+            await self.close_browser(browser)
+        if self.journal and finished:
+            self.journal.finish_run()
+        elif self.journal:
+            # Sin run_end la ejecución queda pendiente para --resume
+            self.journal.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(CineplanetScraper().scrape("https://www.cineplanet.com.pe/peliculas"))
+    parser = argparse.ArgumentParser(description="Cartelera de Cineplanet")
+    parser.add_argument(
+        "--resume", action="store_true", help="Retoma la última ejecución interrumpida"
+    )
+    parser.add_argument(
+        "--recycle-after", type=int, help="Recicla la página cada N navegaciones"
+    )
+    parser.add_argument(
+        "--max-rss-mb", type=float, help="Recicla la página al superar esta memoria"
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=1,
+        help="Páginas de detalle que se cargan por adelantado (0 para desactivar)",
+    )
+    parser.add_argument(
+        "--expand-all",
+        action="store_true",
+        help="Expande todos los cines del detalle y lo extrae de una sola vez",
+    )
+    parser.add_argument(
+        "--snapshots", action="store_true", help="Guarda el HTML para re-extraer sin navegador"
+    )
+    parser.add_argument(
+        "--posters", action="store_true", help="Descarga los pósters a data/posters"
+    )
+    parser.add_argument(
+        "--memory-profile",
+        action="store_true",
+        help="Mide la memoria por etapa y guarda un resumen en data/.runs",
+    )
+    RunDeadline.add_arguments(parser)
+    CineplanetScraper.add_profile_arguments(parser)
+    args = parser.parse_args()
+    scraper = CineplanetScraper(
+        journal=RunJournal.open(resume=args.resume),
+        profile=CineplanetScraper.profile_from_args(args),
+        recycle_after=args.recycle_after,
+        max_rss_mb=args.max_rss_mb,
+        prefetch=args.prefetch,
+        expand_all=args.expand_all,
+        snapshots=SnapshotStore() if args.snapshots else None,
+        poster_cache=PosterCache() if args.posters else None,
+        cdp_endpoint=args.cdp,
+        profiler=MemoryProfiler() if args.memory_profile else None,
+        deadline=RunDeadline.from_args(args),
+    )
+    asyncio.run(scraper.scrape(CineplanetScraper.url))
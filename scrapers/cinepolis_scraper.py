@@ -1,18 +1,33 @@
 from playwright.async_api import async_playwright, Playwright, Page, Browser, Locator
-from scrapers.base_scraper import BaseScraper
-from rich.console import Console
+from scrapers.base_scraper import BaseScraper, console, profiled
+from scrapers.models import Target
+from scrapers.run_journal import RunJournal
+from scrapers.html_snapshots import SnapshotStore
+from scrapers.memory_profiler import MemoryProfiler
+from scrapers.poster_cache import PosterCache
+from scrapers.deadline import DeadlineExceeded, RunDeadline
 from rich.traceback import install
-from slugify import slugify
 from pathlib import Path
 from typing import Tuple, Callable
-import asyncio
+import asyncio, argparse
 
-console = Console()
 install
 
+# Primera opción de cada combo ("Selecciona un cine"), que no es una opción real
+PLACEHOLDER = "Selecciona un"
+# Combos de ciudad, cine y día, que se llenan en cascada
+FILTERS = {
+    "ciudad": "#cmbCiudades",
+    "cine": "#cmbComplejos",
+    "día": "#cmbFechas",
+}
+
 
 class CinepolisScraper(BaseScraper):
+    chain = "cinepolis"
+    url = "https://cinepolis.com.pe/"
 
+    @profiled("scrape_showtimes_data")
     async def scrape_showtimes_data(self, movie: Locator, movie_data: dict):
         cinema_selector = movie.locator(".horarioExp")
         cinema_selector_count = await cinema_selector.count()
@@ -56,20 +71,29 @@ class CinepolisScraper(BaseScraper):
         movie_data["age_restriction"] = age_restriction
         movie_data["running_time"] = running_time
 
-    async def extract_filters(
-        self, page: Page, id_filter: str, filter_type: str
-    ) -> list[str]:
+    async def read_options(self, page: Page, id_filter: str) -> list[str]:
         select_locator = page.locator(id_filter)
         await select_locator.wait_for(timeout=4000)
-        option_locators = select_locator.locator("option")
-        count = await option_locators.count()
+        # Todas las opciones en una sola evaluación del DOM
+        return await self.read_locator_texts(select_locator.locator("option"))
 
-        filters = []
-        for i in range(count):
-            option = option_locators.nth(i)
-            text = await option.inner_text()
+    async def read_choices(self, page: Page, id_filter: str) -> list[str]:
+        # Sin el texto de relleno: al catálogo solo llegan opciones reales
+        return [
+            text for text in await self.read_options(page, id_filter) if PLACEHOLDER not in text
+        ]
+
+    async def extract_filters(
+        self, page: Page, id_filter: str, filter_type: str, parents: tuple = ()
+    ) -> list[str]:
+        options = await self.catalogue.get_or_refresh(
+            (self.chain, *parents), lambda: self.read_choices(page, id_filter)
+        )
 
-            if "Selecciona un" not in text:
+        filters = []
+        for text in options:
+            # Un catálogo guardado antes de filtrar puede traer todavía el relleno
+            if PLACEHOLDER not in text:
                 filters.append(
                     text.removesuffix(", Perú") if filter_type == "ciudad" else text
                 )
@@ -79,45 +103,81 @@ class CinepolisScraper(BaseScraper):
     async def extract_chosen_filter(
         self, filter_chosen: int, page: Page, id_filter: str, filters: list
     ) -> str:
-        select_locator = page.locator(id_filter)
-        option_locators = select_locator.locator("option")
-        count = await option_locators.count()
-
-        for i in range(count):
-            option = option_locators.nth(i)
-            text = (await option.inner_text()).strip()
-
+        for text in await self.read_options(page, id_filter):
             if filters[filter_chosen - 1] in text:
                 return text
 
     async def select_filter_cinepolis(
-        self, filter_type: str, page: Page, id_filter: str
+        self, filter_type: str, page: Page, id_filter: str, parents: tuple = ()
     ) -> str:
-        filters = await self.extract_filters(page, id_filter, filter_type)
+        preset = (self.preset_filters or {}).get(filter_type)
+        if preset is not None:
+            return await self.select_preset_cinepolis(page, id_filter, preset)
+
+        filters = await self.extract_filters(page, id_filter, filter_type, parents)
         self.print_list_of_items(filters)
         filter_chosen = await self.ask_user_for_input(filters, filter_type)
         filter_name = await self.extract_chosen_filter(
             filter_chosen, page, id_filter, filters
         )
+        if filter_name is None:
+            # El catálogo guardado ya no coincide con la página: se descarta y se vuelve a preguntar
+            print("La opción ya no está disponible, actualizando la lista...")
+            self.catalogue.invalidate((self.chain, *parents))
+            return await self.select_filter_cinepolis(
+                filter_type, page, id_filter, parents
+            )
         await page.select_option(id_filter, label=filter_name)
         return filter_name
 
+    async def select_preset_cinepolis(
+        self, page: Page, id_filter: str, preset: str
+    ) -> str:
+        # Los combos se llenan en cascada: se espera a que aparezca la opción buscada
+        await page.wait_for_function(
+            """([selector, text]) => Array.from(
+                document.querySelectorAll(selector + ' option')
+            ).some((option) => option.innerText.includes(text))""",
+            arg=[id_filter, preset],
+            timeout=5000,
+        )
+        for text in await self.read_choices(page, id_filter):
+            if preset in text:
+                await page.select_option(id_filter, label=text)
+                return text
+        raise LookupError(f"No se encontró la opción '{preset}'")
+
     async def apply_filters_cinepolis(self, page: Page) -> list[str]:
         # Seleccionar ciudad, cine y día
-        filters = {
-            "ciudad": "#cmbCiudades",
-            "cine": "#cmbComplejos",
-            "día": "#cmbFechas",
-        }
-        filters_keys = list(filters.keys())
         filters_applied = []
-        for filter in filters_keys:
+        for filter, id_filter in FILTERS.items():
             filter_name = await self.select_filter_cinepolis(
-                filter, page, filters[filter]
+                filter, page, id_filter, tuple(filters_applied)
             )
             filters_applied.append(filter_name)
         return filters_applied
 
+    async def read_catalogue_level(
+        self, browser: Browser, parents: Tuple[str, ...]
+    ) -> list[str]:
+        # Se eligen los combos anteriores y se espera a que el siguiente se llene
+        ids = list(FILTERS.values())
+        page = await self.load_page(browser, self.url, ".contentBusqueda")
+        try:
+            for id_filter, parent in zip(ids, parents):
+                await self.select_preset_cinepolis(page, id_filter, parent)
+            id_filter = ids[len(parents)]
+            await page.wait_for_function(
+                """([selector, placeholder]) => Array.from(
+                    document.querySelectorAll(selector + ' option')
+                ).some((option) => !option.innerText.includes(placeholder))""",
+                arg=[id_filter, PLACEHOLDER],
+                timeout=5000,
+            )
+            return await self.read_choices(page, id_filter)
+        finally:
+            await page.close()
+
     async def prepare_scrapping(
         self, p: Playwright, url: str
     ) -> Tuple[Browser, Page, Path, Callable, Locator, str, str, str]:
@@ -150,33 +210,100 @@ class CinepolisScraper(BaseScraper):
         cinema: str,
         day: str,
     ):
+        target = self.build_target(city, cinema, day)
+        if self.is_target_done(target):
+            console.print(f"[yellow]⏭️ {cinema} ({day}) ya fue recopilado[/yellow]")
+            return
+        if self.journal:
+            self.journal.start_target(target)
+        # La cartelera de Cinépolis ya trae los horarios de todas las películas
+        await self.save_snapshot(page, target, "listing")
+
         movies_count = await movies.count()
-        for i in range(movies_count):
-            movie = movies.nth(i)
-            movie_data = {}
-            movie_data["city"] = city
-            movie_data["cinema"] = cinema
-            movie_data["day"] = day
-
-            await self.extract_general_information_cinepolis(
-                page, movie, movie_data, ".datalayer-movie"
-            )
+        try:
+            for i in range(movies_count):
+                movie = movies.nth(i)
+                movie_data = {}
+                movie_data["city"] = city
+                movie_data["cinema"] = cinema
+                movie_data["day"] = day
 
-            console.print(
-                f"\n[cyan]▶️ Recopilando horarios de proyección de [bold]{movie_data['title']}[/bold][/cyan]"
-            )
+                await self.extract_general_information_cinepolis(
+                    page, movie, movie_data, ".datalayer-movie"
+                )
+
+                if self.is_movie_done(target, movie_data["title"]):
+                    console.print(
+                        f"[yellow]⏭️ [bold]{movie_data['title']}[/bold] ya estaba guardada[/yellow]"
+                    )
+                    continue
+
+                console.print(
+                    f"\n[cyan]▶️ Recopilando horarios de proyección de [bold]{movie_data['title']}[/bold][/cyan]"
+                )
+
+                wait_message = asyncio.create_task(self.message_if_takes_time())
+                try:
+                    finished = await self.within_budget(
+                        self.scrape_showtimes_data(movie, movie_data),
+                        target,
+                        i,
+                        movie_data["title"],
+                    )
+                finally:
+                    wait_message.cancel()
+                if not finished:
+                    continue
+
+                await self.attach_poster(movie_data)
 
-            wait_message = asyncio.create_task(self.message_if_takes_time())
-            await self.scrape_showtimes_data(movie, movie_data)
-            wait_message.cancel()
+                def on_saved(title=movie_data["title"], index=i):
+                    # Se marca en la bitácora solo cuando el archivo ya está escrito
+                    if self.journal:
+                        self.journal.record_movie(target, index, title)
+                    console.print(
+                        f"[green]✅ Horarios de [bold]{title}[/bold] guardados[/green]"
+                    )
 
-            format_to_save(output_folder, movie_data)
-            console.print(
-                f"[green]✅ Horarios de [bold]{movie_data['title']}[/bold] guardados[/green]"
+                await self.save_movie(format_to_save, output_folder, movie_data, on_saved)
+        except DeadlineExceeded:
+            await self.defer_target(target)
+            raise
+
+        await self.flush_writer()
+        if self.journal:
+            self.journal.finish_target(target)
+
+    async def scrape_target(
+        self, browser: Browser, target: Target, format_to_save: Callable
+    ) -> Path:
+        # Recopila una combinación de filtros sin interacción del usuario
+        page = await self.load_page(browser, self.url, ".contentBusqueda")
+        try:
+            self.preset_filters = {
+                "ciudad": target.city,
+                "cine": target.cinema,
+                "día": target.day,
+            }
+            city, cinema, day = await self.apply_filters_cinepolis(page)
+            output_folder = await self.create_folder(
+                city.removesuffix(", Perú"), cinema, day, "cinepolis"
             )
+            movies = page.locator(".divFecha article")
+            async with self.writing():
+                await self.process_movies(
+                    page, movies, output_folder, format_to_save, city, cinema, day
+                )
+            return output_folder
+        finally:
+            self.preset_filters = None
+            await page.close()
 
     async def scrape(self, url: str):
+        if self.journal:
+            self.journal.start_run()
         async with async_playwright() as p:
+            await self.start_profiler()
             browser, page, output_folder, format_to_save, movies, city, cinema, day = (
                 await self.prepare_scrapping(p, url)
             )
@@ -186,15 +313,59 @@ class CinepolisScraper(BaseScraper):
                 spinner="bouncingBall",
                 spinner_style="bold green",
             ):
-                await self.process_movies(
-                    page, movies, output_folder, format_to_save, city, cinema, day
+                finished = await self.run_until_deadline(
+                    self.process_movies_writing(
+                        page, movies, output_folder, format_to_save, city, cinema, day
+                    )
                 )
 
-            console.print(
-                "\n[bold green]🎉 ¡Todos los horarios han sido guardados exitosamente![/bold green]"
-            )
+            if finished:
+                console.print(
+                    "\n[bold green]🎉 ¡Todos los horarios han sido guardados exitosamente![/bold green]"
+                )
+            else:
+                console.print(
+                    "\n[yellow]⏰ Se acabó el plazo: lo recopilado quedó guardado, "
+                    "use --resume para continuar[/yellow]"
+                )
+            await self.catalogue.drain()
+            self.close_poster_cache()
+            await self.stop_profiler()
+            await self.save_profile(page)
             await browser.close()
+        if self.journal and finished:
+            self.journal.finish_run()
+        elif self.journal:
+            # Sin run_end la ejecución queda pendiente para --resume
+            self.journal.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(CinepolisScraper().scrape("https://cinepolis.com.pe/"))
+    parser = argparse.ArgumentParser(description="Cartelera de Cinépolis")
+    parser.add_argument(
+        "--resume", action="store_true", help="Retoma la última ejecución interrumpida"
+    )
+    parser.add_argument(
+        "--snapshots", action="store_true", help="Guarda el HTML para re-extraer sin navegador"
+    )
+    parser.add_argument(
+        "--posters", action="store_true", help="Descarga los pósters a data/posters"
+    )
+    parser.add_argument(
+        "--memory-profile",
+        action="store_true",
+        help="Mide la memoria por etapa y guarda un resumen en data/.runs",
+    )
+    RunDeadline.add_arguments(parser)
+    CinepolisScraper.add_profile_arguments(parser)
+    args = parser.parse_args()
+    scraper = CinepolisScraper(
+        journal=RunJournal.open(resume=args.resume),
+        profile=CinepolisScraper.profile_from_args(args),
+        snapshots=SnapshotStore() if args.snapshots else None,
+        poster_cache=PosterCache() if args.posters else None,
+        cdp_endpoint=args.cdp,
+        profiler=MemoryProfiler() if args.memory_profile else None,
+        deadline=RunDeadline.from_args(args),
+    )
+    asyncio.run(scraper.scrape(CinepolisScraper.url))
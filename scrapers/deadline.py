@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+import asyncio, time
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class RunDeadline:
+    """
+    Hora límite de la ejecución y tiempo máximo por película. Se guarda como hora
+    de reloj para que todos los procesos de un lote compartan el mismo plazo.
+    """
+
+    def __init__(
+        self,
+        ends_at: Optional[float] = None,
+        movie_budget: Optional[float] = None,
+        grace: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ends_at = ends_at
+        self.movie_budget = movie_budget
+        # Margen para cerrar la página y vaciar el escritor después del plazo
+        self.grace = grace
+        self.clock = clock
+
+    @classmethod
+    def after(
+        cls, minutes: Optional[float] = None, movie_budget: Optional[float] = None, **options
+    ) -> "RunDeadline":
+        clock = options.get("clock", time.time)
+        ends_at = clock() + minutes * 60 if minutes is not None else None
+        return cls(ends_at, movie_budget, **options)
+
+    @classmethod
+    def until(cls, hour: str, movie_budget: Optional[float] = None) -> "RunDeadline":
+        # "23:30": la próxima vez que el reloj marque esa hora
+        now = datetime.now()
+        hours, minutes = (int(part) for part in hour.split(":"))
+        end = now.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+        if end <= now:
+            end += timedelta(days=1)
+        return cls(end.timestamp(), movie_budget)
+
+    @classmethod
+    def from_args(cls, args) -> Optional["RunDeadline"]:
+        if args.until:
+            return cls.until(args.until, args.movie_budget)
+        if args.deadline is not None or args.movie_budget is not None:
+            return cls.after(args.deadline, args.movie_budget)
+        return None
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--deadline", type=float, metavar="MINUTOS", help="Tiempo máximo de la ejecución"
+        )
+        parser.add_argument(
+            "--until", metavar="HH:MM", help="Hora a la que debe terminar la ejecución"
+        )
+        parser.add_argument(
+            "--movie-budget",
+            type=float,
+            metavar="SEGUNDOS",
+            help="Tiempo máximo por película; si se pasa, se salta",
+        )
+
+    def remaining(self) -> Optional[float]:
+        if self.ends_at is None:
+            return None
+        return max(self.ends_at - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.ends_at is not None and self.clock() >= self.ends_at
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded("Se acabó el plazo de la ejecución")
+
+    def movie_timeout(self) -> Optional[float]:
+        limits = [
+            limit for limit in (self.movie_budget, self.remaining()) if limit is not None
+        ]
+        return min(limits) if limits else None
+
+    def scope(self) -> asyncio.Timeout:
+        # Red de seguridad para las etapas que no son películas (filtros, "Ver más")
+        remaining = self.remaining()
+        return asyncio.timeout(None if remaining is None else remaining + self.grace)
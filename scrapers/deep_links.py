@@ -0,0 +1,71 @@
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from scrapers.models import Target
+import json, os, time
+
+
+class DeepLinkCache:
+    """
+    Recuerda la URL de la cartelera ya filtrada para cada combinación, para
+    navegar directamente a ella en vez de abrir los acordeones de filtros.
+    """
+
+    def __init__(
+        self,
+        path: Path = Path("data") / ".cache" / "deep_links.json",
+        ttl: float = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: Optional[Dict[str, dict]] = None
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                try:
+                    with self.path.open(encoding="utf-8") as f:
+                        self._entries = json.load(f).get("entries", {})
+                except (OSError, ValueError):
+                    print("No se pudo leer la caché de enlaces, se reconstruirá")
+        return self._entries
+
+    def get(self, target: Target) -> Optional[str]:
+        entry = self.entries.get(target.key)
+        if entry is None or entry.get("url") is None:
+            return None
+        if self.clock() - entry["saved_at"] >= self.ttl:
+            return None
+        return entry["url"]
+
+    def put(self, target: Target, url: str):
+        entry = self.entries.get(target.key, {})
+        # Un enlace que ya falló no se vuelve a guardar hasta que cambie
+        if url == entry.get("rejected") or url == entry.get("url"):
+            return
+        self.entries[target.key] = {"url": url, "saved_at": self.clock()}
+        self.save()
+
+    def reject(self, target: Target):
+        entry = self.entries.get(target.key)
+        if entry is None:
+            return
+        self.entries[target.key] = {
+            "url": None,
+            "rejected": entry.get("url"),
+            "saved_at": self.clock(),
+        }
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Varios procesos del lote pueden guardar a la vez
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 1, "entries": self.entries}, f, ensure_ascii=False, indent=2
+            )
+        os.replace(tmp_path, self.path)
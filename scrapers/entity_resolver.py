@@ -0,0 +1,287 @@
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from scrapers.archive import iter_json_files
+from rich.console import Console
+import argparse, json, os, re, time, unicodedata
+
+console = Console()
+
+# Palabras de versión o formato que cada cadena agrega al título
+FORMAT_WORDS = {
+    "doblada", "doblado", "dob", "dobl", "subtitulada", "subtitulado", "sub", "subt",
+    "2d", "3d", "4d", "4dx", "xd", "imax", "dbox", "prime", "atmos", "vose",
+    "espanol", "castellano", "ingles", "preventa", "estreno", "reestreno",
+}
+# Solo cuentan dentro de un paréntesis: fuera pueden ser parte del título
+VERSION_WORDS = FORMAT_WORDS | {"version", "original", "regular", "digital"}
+LEADING_WORDS = {"preventa", "estreno", "reestreno"}
+
+_BRACKETS = re.compile(r"\(([^)]*)\)|\[([^\]]*)\]")
+_HOURS = re.compile(r"(\d+)\s*(?:h|hr|hrs|horas?)\b", re.IGNORECASE)
+_MINUTES = re.compile(r"(\d+)\s*(?:m|min|mins|minutos?|')", re.IGNORECASE)
+_CLOCK = re.compile(r"^\s*(\d+):(\d{2})\s*$")
+_NOT_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _words(text: str) -> List[str]:
+    # Igual que slugify para títulos en español, pero sin su costo por llamada
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NOT_WORD.sub(" ", text).split()
+
+
+@lru_cache(maxsize=65536)
+def normalize_title(title: str) -> str:
+    # "Avatar: Fuego y Ceniza (Doblada) 3D" -> "avatar fuego y ceniza"
+    def drop_version(match: re.Match) -> str:
+        words = _words(match.group(1) or match.group(2) or "")
+        return " " if any(word in VERSION_WORDS for word in words) else match.group(0)
+
+    words = _words(_BRACKETS.sub(drop_version, title or ""))
+    while words and words[-1] in FORMAT_WORDS:
+        words.pop()
+    while words and words[0] in LEADING_WORDS:
+        words.pop(0)
+    return " ".join(words)
+
+
+def parse_running_time(text: Optional[str]) -> Optional[int]:
+    # Convierte "3h 12min", "192 min", "2h" o "1:55" en minutos
+    if not text:
+        return None
+    clock = _CLOCK.match(text)
+    if clock:
+        return int(clock.group(1)) * 60 + int(clock.group(2))
+    hours = _HOURS.search(text)
+    minutes = _MINUTES.search(text)
+    if hours or minutes:
+        return (int(hours.group(1)) * 60 if hours else 0) + (
+            int(minutes.group(1)) if minutes else 0
+        )
+    text = text.strip()
+    return int(text) if text.isdigit() else None
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _numbers(key: str) -> Tuple[str, ...]:
+    # "Toy Story 3" y "Toy Story 4" se parecen mucho pero no son la misma película
+    return tuple(word for word in key.split() if word.isdigit())
+
+
+class MovieResolver:
+    """
+    Asigna a cada película un id estable entre cadenas, cines y días. Los títulos
+    se normalizan y se comparan solo contra los que comparten trigramas poco
+    comunes (índice de bloqueo), confirmando con la duración cuando se conoce.
+    """
+
+    def __init__(
+        self,
+        path: Path = Path("data") / ".cache" / "movies.json",
+        threshold: float = 0.75,
+        loose_threshold: float = 0.6,
+        tolerance: int = 5,
+        max_postings: int = 500,
+    ):
+        self.path = Path(path)
+        # Sin duración para confirmar se exige más parecido
+        self.threshold = threshold
+        self.loose_threshold = loose_threshold
+        # Minutos de diferencia aceptados entre cadenas
+        self.tolerance = tolerance
+        # Trigramas presentes en más títulos no sirven para bloquear
+        self.max_postings = max_postings
+        self.movies: Dict[str, dict] = {}
+        # Título normalizado -> ids que lo usan (una nueva versión puede repetirlo)
+        self.aliases: Dict[str, List[str]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self.sizes: Dict[str, int] = {}
+        self.dirty = False
+        self._loaded = False
+
+    def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        for movie_id, movie in self._read().items():
+            self._add(movie_id, movie)
+
+    def _read(self) -> Dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                return json.load(f).get("movies", {})
+        except (OSError, ValueError):
+            print("No se pudo leer el registro de películas, se reconstruirá")
+            return {}
+
+    def _add(self, movie_id: str, movie: dict):
+        current = self.movies.setdefault(
+            movie_id, {"title": movie["title"], "minutes": movie.get("minutes"), "aliases": []}
+        )
+        if current["minutes"] is None:
+            current["minutes"] = movie.get("minutes")
+        for key in movie.get("aliases", []):
+            self._index(movie_id, key)
+
+    def _index(self, movie_id: str, key: str):
+        movie = self.movies[movie_id]
+        if key not in movie["aliases"]:
+            movie["aliases"].append(key)
+        ids = self.aliases.setdefault(key, [])
+        if movie_id in ids:
+            return
+        ids.append(movie_id)
+        if len(ids) == 1:
+            grams = trigrams(key)
+            self.sizes[key] = len(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(key)
+
+    def _runtime_matches(self, movie_id: str, minutes: Optional[int]) -> Optional[bool]:
+        known = self.movies[movie_id]["minutes"]
+        if minutes is None or known is None:
+            return None
+        return abs(known - minutes) <= self.tolerance
+
+    def _candidates(self, key: str) -> Counter:
+        shared: Counter = Counter()
+        for gram in trigrams(key):
+            keys = self.postings.get(gram)
+            if keys and len(keys) <= self.max_postings:
+                shared.update(keys)
+        return shared
+
+    def match(self, key: str, minutes: Optional[int]) -> Optional[str]:
+        self.load()
+        for movie_id in self.aliases.get(key, []):
+            if self._runtime_matches(movie_id, minutes) is not False:
+                return movie_id
+
+        size = len(trigrams(key))
+        numbers = _numbers(key)
+        best, best_score = None, 0.0
+        for candidate, count in self._candidates(key).items():
+            # Coeficiente de Dice sobre trigramas, sin volver a calcular conjuntos
+            score = 2 * count / (size + self.sizes[candidate])
+            if score < self.loose_threshold or score <= best_score:
+                continue
+            if _numbers(candidate) != numbers:
+                continue
+            for movie_id in self.aliases[candidate]:
+                same_runtime = self._runtime_matches(movie_id, minutes)
+                if same_runtime is False:
+                    continue
+                if same_runtime is None and score < self.threshold:
+                    continue
+                best, best_score = movie_id, score
+                break
+        return best
+
+    def _new_id(self, key: str, minutes: Optional[int]) -> str:
+        # El id sale del título, así dos procesos que lo ven primero coinciden
+        movie_id = key.replace(" ", "-") or "sin-titulo"
+        if movie_id in self.movies and minutes is not None:
+            movie_id = f"{movie_id}-{minutes}"
+        suffix = 2
+        base = movie_id
+        while movie_id in self.movies:
+            movie_id = f"{base}-{suffix}"
+            suffix += 1
+        return movie_id
+
+    def resolve(self, title: str, running_time: Optional[str] = None) -> str:
+        key = normalize_title(title)
+        minutes = parse_running_time(running_time)
+        movie_id = self.match(key, minutes)
+        if movie_id is None:
+            movie_id = self._new_id(key, minutes)
+            self.movies[movie_id] = {"title": title.strip(), "minutes": minutes, "aliases": []}
+            self.dirty = True
+        elif self.movies[movie_id]["minutes"] is None and minutes is not None:
+            self.movies[movie_id]["minutes"] = minutes
+            self.dirty = True
+        if key not in self.movies[movie_id]["aliases"]:
+            self._index(movie_id, key)
+            self.dirty = True
+        return movie_id
+
+    def assign(self, movie_data: dict) -> str:
+        movie_data["movie_id"] = self.resolve(
+            movie_data.get("title", ""), movie_data.get("running_time")
+        )
+        return movie_data["movie_id"]
+
+    def save(self, replace: bool = False):
+        # replace: el registro en disco se sustituye por este (reconciliación del lote)
+        if not self.dirty and not replace:
+            return
+        if not replace:
+            # Otro proceso del lote pudo registrar películas mientras tanto
+            for movie_id, movie in self._read().items():
+                self._add(movie_id, movie)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 1, "movies": self.movies}, f, ensure_ascii=False, indent=2
+            )
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def reassign(paths: Iterable[Path], resolver: MovieResolver) -> Tuple[int, int]:
+    # Vuelve a asignar movie_id a los JSON indicados, en ese orden
+    files = updated = 0
+    for path in paths:
+        try:
+            with path.open(encoding="utf-8") as f:
+                movie_data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer {path}: {e}")
+            continue
+        if not isinstance(movie_data, dict) or "title" not in movie_data:
+            continue
+        files += 1
+        previous = movie_data.get("movie_id")
+        if resolver.assign(movie_data) != previous:
+            path.write_text(
+                json.dumps(movie_data, ensure_ascii=False, indent=4), encoding="utf-8"
+            )
+            updated += 1
+    return files, updated
+
+
+def backfill(root: Path, resolver: MovieResolver) -> Tuple[int, int]:
+    # Agrega movie_id a los JSON ya guardados
+    return reassign(iter_json_files(root), resolver)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Asigna un id común a la misma película en todas las cadenas"
+    )
+    parser.add_argument("root", nargs="?", default="data")
+    parser.add_argument("--registry", default=str(Path("data") / ".cache" / "movies.json"))
+    args = parser.parse_args(argv)
+
+    resolver = MovieResolver(Path(args.registry))
+    start = time.perf_counter()
+    files, updated = backfill(Path(args.root), resolver)
+    resolver.save()
+    console.print(
+        f"[green]{files} archivos revisados, {updated} actualizados, "
+        f"{len(resolver.movies)} películas distintas en "
+        f"{time.perf_counter() - start:.1f} s[/green]"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Tuple
+import re
+
+# Etiquetas que no tienen cierre
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+# Su contenido no forma parte del texto visible
+SKIP_TEXT_TAGS = {"script", "style", "template", "noscript"}
+
+_WHITESPACE = re.compile(r"\s+")
+_COMPOUND = re.compile(r"([a-zA-Z][\w-]*|\*)?((?:\.[\w-]+|\[[\w-]+\]|:scope)*)")
+_PART = re.compile(r"\.([\w-]+)|\[([\w-]+)\]|(:scope)")
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent", "data")
+
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: List["Node"] = []
+        self.parent = parent
+        # Solo los nodos de texto (tag "#text") tienen contenido
+        self.data = ""
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    def get(self, name: str) -> Optional[str]:
+        return self.attrs.get(name)
+
+    def elements(self) -> Iterator["Node"]:
+        for child in self.children:
+            if child.tag != "#text":
+                yield child
+
+    def descendants(self) -> Iterator["Node"]:
+        stack = list(reversed(list(self.elements())))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(list(node.elements())))
+
+    def _texts(self) -> Iterator[str]:
+        for child in self.children:
+            if child.tag == "#text":
+                yield child.data
+            elif child.tag not in SKIP_TEXT_TAGS:
+                if child.tag == "br":
+                    yield " "
+                yield from child._texts()
+
+    def text(self) -> str:
+        # Aproxima innerText: texto visible con los espacios colapsados
+        return _WHITESPACE.sub(" ", "".join(self._texts())).strip()
+
+    def select(self, selector: str) -> List["Node"]:
+        return select(self, selector)
+
+    def select_one(self, selector: str) -> Optional["Node"]:
+        found = self.select(selector)
+        return found[0] if found else None
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # Cierra hasta la etiqueta abierta más cercana; si no existe, se ignora
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        node = Node("#text", parent=self.stack[-1])
+        node.data = data
+        self.stack[-1].children.append(node)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _parse_compound(text: str) -> Tuple[Optional[str], List[str], List[str], bool]:
+    match = _COMPOUND.fullmatch(text)
+    if match is None or not text:
+        raise ValueError(f"Selector no soportado: {text}")
+    tag = match.group(1)
+    classes, attributes, scope = [], [], False
+    for part in _PART.finditer(match.group(2) or ""):
+        if part.group(1):
+            classes.append(part.group(1))
+        elif part.group(2):
+            attributes.append(part.group(2))
+        else:
+            scope = True
+    return (None if tag in (None, "*") else tag.lower()), classes, attributes, scope
+
+
+def _matches(node: Node, compound) -> bool:
+    tag, classes, attributes, _ = compound
+    if tag and node.tag != tag:
+        return False
+    node_classes = node.classes
+    return all(name in node_classes for name in classes) and all(
+        name in node.attrs for name in attributes
+    )
+
+
+def _tokenize(selector: str) -> List[Tuple[str, str]]:
+    # Devuelve (combinador, selector compuesto): " " descendiente, ">" hijo directo
+    tokens = []
+    combinator = " "
+    for token in selector.replace(">", " > ").split():
+        if token == ">":
+            combinator = ">"
+            continue
+        tokens.append((combinator, token))
+        combinator = " "
+    return tokens
+
+
+def select(root: Node, selector: str) -> List[Node]:
+    """
+    Motor mínimo de selectores CSS: etiqueta, .clase, [atributo], :scope,
+    descendiente, hijo directo (>) y listas separadas por comas.
+    """
+    found: List[Node] = []
+    seen = set()
+    for group in selector.split(","):
+        current = [root]
+        for combinator, token in _tokenize(group):
+            compound = _parse_compound(token)
+            if compound[3]:
+                # :scope es el propio nodo desde el que se busca
+                continue
+            matches = []
+            matched = set()
+            for node in current:
+                candidates = node.elements() if combinator == ">" else node.descendants()
+                for candidate in candidates:
+                    if id(candidate) not in matched and _matches(candidate, compound):
+                        matched.add(id(candidate))
+                        matches.append(candidate)
+            current = matches
+        for node in current:
+            if node is not root and id(node) not in seen:
+                seen.add(id(node))
+                found.append(node)
+    if len(found) > 1:
+        # Varias raíces o grupos pueden mezclar el orden del documento
+        order = {id(node): i for i, node in enumerate(root.descendants())}
+        found.sort(key=lambda node: order[id(node)])
+    return found
@@ -0,0 +1,71 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+from scrapers.models import Target
+import gzip, hashlib, json, os, threading
+
+
+class SnapshotStore:
+    """
+    Guarda el HTML de la cartelera y de cada página de detalle, comprimido y con
+    el hash del contenido como nombre, junto a un índice por ejecución.
+    """
+
+    def __init__(self, root: Path = Path("data") / ".snapshots", run_id: Optional[str] = None):
+        self.root = Path(root)
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "runs" / f"{self.run_id}.jsonl"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}.html.gz"
+
+    def put(self, html: str) -> str:
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        # Una página que no cambió entre ejecuciones se guarda una sola vez
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        with gzip.open(self._blob_path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def record(self, target: Target, kind: str, url: str, html: str, **context):
+        digest = self.put(html)
+        line = json.dumps(
+            {
+                "kind": kind,
+                "target": target.to_dict(),
+                "url": url,
+                "digest": digest,
+                **context,
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.manifest_path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def runs(self) -> List[str]:
+        folder = self.root / "runs"
+        if not folder.exists():
+            return []
+        return sorted(path.stem for path in folder.glob("*.jsonl"))
+
+    def records(self, run_id: Optional[str] = None) -> Iterator[dict]:
+        path = self.root / "runs" / f"{run_id or self.run_id}.jsonl"
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,229 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from scrapers.page_supervisor import process_tree_rss
+from rich.console import Console
+from rich.table import Table
+import asyncio, functools, json, os, threading, time, tracemalloc
+
+console = Console()
+
+MB = 1024 * 1024
+
+
+def own_rss() -> int:
+    # Memoria residente (bytes) solo de este proceso de Python
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        # Máximos observados mientras la etapa estaba activa
+        self.rss_peak = 0
+        self.browser_peak = 0
+        self.heap_peak = 0
+        # Suma de lo que quedó reservado al terminar cada llamada
+        self.heap_growth = 0
+        self.top: List[dict] = []
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "seconds": round(self.seconds, 3),
+            "rss_peak_mb": round(self.rss_peak / MB, 1),
+            "browser_peak_mb": round(self.browser_peak / MB, 1),
+            "heap_peak_mb": round(self.heap_peak / MB, 1),
+            "heap_growth_mb": round(self.heap_growth / MB, 1),
+            "top_allocators": self.top,
+        }
+
+
+class MemoryProfiler:
+    """
+    Muestrea el heap de Python (tracemalloc) y la memoria de Chromium y del
+    driver durante la ejecución, y atribuye los picos a las etapas activas.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        top: int = 10,
+        frames: int = 1,
+        snapshot_growth: float = 1.1,
+        rss: Callable[[], int] = process_tree_rss,
+        python_rss: Callable[[], int] = own_rss,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        # Solo se toma otra foto del heap si el pico de la etapa crece este factor
+        self.snapshot_growth = snapshot_growth
+        self.rss = rss
+        self.python_rss = python_rss
+        self.clock = clock
+        self.stages: Dict[str, StageStats] = {}
+        self.active: Dict[str, int] = {}
+        self.timeline: List[list] = []
+        self.started = 0.0
+        self._snapshot_at: Dict[str, int] = {}
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._owns_tracing = False
+        self._sampler: Optional[asyncio.Task] = None
+        # Los guardados corren en hilos del escritor
+        self._lock = threading.Lock()
+
+    async def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._baseline = tracemalloc.take_snapshot()
+        self.started = self.clock()
+        self._sampler = asyncio.create_task(self._run_sampler())
+
+    async def stop(self):
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+        self.sample()
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    async def _run_sampler(self):
+        while True:
+            # Leer /proc toma unos milisegundos: se hace fuera del bucle de eventos
+            rss, python_rss = await asyncio.to_thread(lambda: (self.rss(), self.python_rss()))
+            self.sample(rss, python_rss)
+            await asyncio.sleep(self.interval)
+
+    def _top_allocators(self) -> List[dict]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        stats = (
+            snapshot.compare_to(self._baseline, "lineno")
+            if self._baseline
+            else snapshot.statistics("lineno")
+        )
+        return [
+            {
+                "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_mb": round(stat.size / MB, 2),
+                "growth_mb": round(getattr(stat, "size_diff", stat.size) / MB, 2),
+            }
+            for stat in stats[: self.top]
+        ]
+
+    def sample(self, rss: Optional[int] = None, python_rss: Optional[int] = None):
+        rss = self.rss() if rss is None else rss
+        python_rss = self.python_rss() if python_rss is None else python_rss
+        browser = max(rss - python_rss, 0)
+        heap = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        with self._lock:
+            active = [name for name, count in self.active.items() if count]
+            self.timeline.append(
+                [round(self.clock() - self.started, 2), rss, browser, heap, active]
+            )
+            snapshot_for = []
+            for name in active:
+                stats = self.stages[name]
+                stats.rss_peak = max(stats.rss_peak, rss)
+                stats.browser_peak = max(stats.browser_peak, browser)
+                if heap > stats.heap_peak:
+                    stats.heap_peak = heap
+                    if heap >= self._snapshot_at.get(name, 0) * self.snapshot_growth:
+                        self._snapshot_at[name] = heap
+                        snapshot_for.append(name)
+        if snapshot_for and tracemalloc.is_tracing():
+            top = self._top_allocators()
+            with self._lock:
+                for name in snapshot_for:
+                    self.stages[name].top = top
+
+    @contextmanager
+    def stage(self, name: str):
+        with self._lock:
+            self.stages.setdefault(name, StageStats())
+            self.active[name] = self.active.get(name, 0) + 1
+        start = self.clock()
+        heap_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        try:
+            yield
+        finally:
+            # Las etapas cortas quedan con al menos una muestra
+            self.sample()
+            heap_after = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+            with self._lock:
+                stats = self.stages[name]
+                stats.calls += 1
+                stats.seconds += self.clock() - start
+                stats.heap_growth += heap_after - heap_before
+                self.active[name] -= 1
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def summary(self) -> dict:
+        peak = max(self.timeline, key=lambda row: row[1], default=None)
+        return {
+            "seconds": round(self.clock() - self.started, 1),
+            "samples": len(self.timeline),
+            "rss_peak_mb": round(peak[1] / MB, 1) if peak else 0,
+            "browser_peak_mb": round(max((row[2] for row in self.timeline), default=0) / MB, 1),
+            "heap_peak_mb": round(max((row[3] for row in self.timeline), default=0) / MB, 1),
+            # Etapas activas cuando la memoria total llegó a su máximo
+            "rss_peak_stages": peak[4] if peak else [],
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "timeline": self.timeline,
+        }
+
+    def write_summary(self, folder: Path, name: str = "memory_profile.json") -> Path:
+        path = Path(folder) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def print_summary(self):
+        summary = self.summary()
+        table = Table(title="Memoria por etapa (MB)")
+        for column in ("Etapa", "Llamadas", "Segundos", "RSS total", "Navegador", "Heap", "Crecimiento"):
+            table.add_column(column)
+        for name, stats in sorted(
+            summary["stages"].items(), key=lambda item: item[1]["rss_peak_mb"], reverse=True
+        ):
+            table.add_row(
+                name,
+                str(stats["calls"]),
+                f"{stats['seconds']:.1f}",
+                f"{stats['rss_peak_mb']:.0f}",
+                f"{stats['browser_peak_mb']:.0f}",
+                f"{stats['heap_peak_mb']:.1f}",
+                f"{stats['heap_growth_mb']:.1f}",
+            )
+        console.print(table)
+        console.print(
+            f"Pico total: [bold]{summary['rss_peak_mb']:.0f} MB[/bold] "
+            f"durante {', '.join(summary['rss_peak_stages']) or 'ninguna etapa'}"
+        )
@@ -0,0 +1,256 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from slugify import slugify
+import re, sys
+
+TIME_PATTERN = re.compile(
+    r"(?P<hour>\d{1,2})[:.h](?P<minute>\d{2})\s*(?P<period>[ap]\.?\s*m\.?)?",
+    re.IGNORECASE,
+)
+
+# Claves de movie_data que tienen un campo propio en Movie
+MOVIE_FIELDS = (
+    "title",
+    "genre",
+    "running_time",
+    "age_restriction",
+    "image_url",
+    "image_path",
+    "city",
+    "cinema",
+    "day",
+)
+
+# Partes de la ruta de cada película: <ciudad>/<cadena>/<cine>/<día>/<película>.json
+MOVIE_DEPTH = 5
+
+
+def chain_from_path(root: Path, path: Path) -> str:
+    # La cadena es la segunda carpeta de la ruta de cada película
+    parts = Path(path).relative_to(root).parts
+    return parts[1] if len(parts) >= MOVIE_DEPTH else ""
+
+
+def parse_time(text: str) -> Optional[int]:
+    # Convierte "7:30 pm", "19:30" o "07.30 p. m." en minutos desde la medianoche
+    match = TIME_PATTERN.search(text or "")
+    if match is None:
+        return None
+    hour, minute = int(match["hour"]), int(match["minute"])
+    period = (match["period"] or "").lower().replace(".", "").replace(" ", "")
+    if period == "pm" and hour < 12:
+        hour += 12
+    elif period == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    # Los nombres de cines, formatos e idiomas se repiten miles de veces
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class Showtime:
+    time: str
+    url: Optional[str]
+    minutes: Optional[int] = None
+
+    def __post_init__(self):
+        if self.minutes is None:
+            self.minutes = parse_time(self.time)
+
+    @classmethod
+    def from_list(cls, raw) -> "Showtime":
+        time, url = raw
+        return cls(time, url)
+
+    def to_list(self) -> list:
+        return [self.time, self.url]
+
+
+@dataclass(slots=True)
+class SessionFormat:
+    dimension: Optional[str] = None
+    format: Optional[str] = None
+    language: Optional[str] = None
+    showtimes: List[Showtime] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "SessionFormat":
+        return cls(
+            intern(raw.get("dimension")),
+            intern(raw.get("format")),
+            intern(raw.get("language")),
+            [Showtime.from_list(showtime) for showtime in raw.get("showtimes", [])],
+        )
+
+    def to_dict(self) -> dict:
+        # Solo se escriben las claves que la cadena devuelve
+        data = {}
+        for key in ("dimension", "format", "language"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        data["showtimes"] = [showtime.to_list() for showtime in self.showtimes]
+        return data
+
+
+@dataclass(slots=True)
+class CinemaSchedule:
+    cinema: str
+    formats: List[SessionFormat] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Movie:
+    title: str
+    genre: Optional[str] = None
+    running_time: Optional[str] = None
+    age_restriction: Optional[str] = None
+    image_url: Optional[str] = None
+    image_path: Optional[str] = None
+    city: Optional[str] = None
+    cinema: Optional[str] = None
+    day: Optional[str] = None
+    schedules: List[CinemaSchedule] = field(default_factory=list)
+    # Cinépolis guarda los horarios como lista, sin agrupar por cine
+    flat_showtimes: bool = False
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, movie_data: dict) -> "Movie":
+        movie = cls(title=movie_data.get("title", ""))
+        for key in MOVIE_FIELDS[1:]:
+            setattr(movie, key, intern(movie_data.get(key)))
+        movie.extra = {
+            key: value
+            for key, value in movie_data.items()
+            if key not in MOVIE_FIELDS and key != "showtimes"
+        }
+
+        showtimes = movie_data.get("showtimes", {})
+        if isinstance(showtimes, list):
+            movie.flat_showtimes = True
+            showtimes = {movie.cinema or "": showtimes}
+        movie.schedules = [
+            CinemaSchedule(
+                intern(cinema), [SessionFormat.from_dict(raw) for raw in formats]
+            )
+            for cinema, formats in showtimes.items()
+        ]
+        return movie
+
+    def to_dict(self) -> dict:
+        movie_data: Dict[str, Any] = {"title": self.title}
+        for key in MOVIE_FIELDS[1:]:
+            value = getattr(self, key)
+            if value is not None:
+                movie_data[key] = value
+        movie_data.update(self.extra)
+
+        if self.flat_showtimes:
+            movie_data["showtimes"] = [
+                session_format.to_dict()
+                for schedule in self.schedules
+                for session_format in schedule.formats
+            ]
+        else:
+            movie_data["showtimes"] = {
+                schedule.cinema: [
+                    session_format.to_dict() for session_format in schedule.formats
+                ]
+                for schedule in self.schedules
+            }
+        return movie_data
+
+    def iter_showtimes(self) -> Iterator[tuple]:
+        for schedule in self.schedules:
+            for session_format in schedule.formats:
+                for showtime in session_format.showtimes:
+                    yield schedule, session_format, showtime
+
+    def showtime_rows(self) -> Iterator[dict]:
+        # Una fila plana por función, para el índice de consultas y la analítica
+        for schedule, session_format, showtime in self.iter_showtimes():
+            yield {
+                "city": self.city or "",
+                "cinema": schedule.cinema,
+                "day": self.day or "",
+                "title": self.title,
+                # Cinépolis no separa dimensión y formato
+                "dimension": session_format.dimension or session_format.format or "",
+                "format": session_format.format or "",
+                "language": session_format.language or "",
+                "time": showtime.time,
+                "minutes": showtime.minutes,
+                "url": showtime.url,
+            }
+
+    def rows(self) -> List[dict]:
+        # Una fila por función, con las columnas del Excel
+        return [
+            {
+                "Título": self.title,
+                "Género": self.genre or "",
+                "Duración": self.running_time or "",
+                "Restricción de edad": self.age_restriction or "",
+                "Cine": schedule.cinema,
+                "Ciudad": self.city or "",
+                "Día": self.day or "",
+                "Dimensión": session_format.dimension or "",
+                "Formato": session_format.format or "",
+                "Idioma": session_format.language or "",
+                "Hora": showtime.time,
+                "URL": showtime.url,
+            }
+            for schedule, session_format, showtime in self.iter_showtimes()
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class Target:
+    # Una combinación de filtros a recopilar: cadena, ciudad, cine y día
+    chain: str
+    city: str
+    cinema: str
+    day: str
+
+    @property
+    def key(self) -> str:
+        return "|".join((self.chain, self.city, self.cinema, self.day))
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "Target":
+        return cls(raw["chain"], raw["city"], raw["cinema"], raw["day"])
+
+    def to_dict(self) -> dict:
+        return {
+            "chain": self.chain,
+            "city": self.city,
+            "cinema": self.cinema,
+            "day": self.day,
+        }
+
+
+def output_folder(root: Path, target: Target) -> Path:
+    # Misma estructura que BaseScraper.create_folder
+    return (
+        Path(root)
+        / slugify(target.city.removesuffix(", Perú"))
+        / target.chain
+        / slugify(target.cinema, separator="_")
+        / slugify(target.day, separator="_")
+    )
+
+
+@dataclass(slots=True)
+class StreamEvent:
+    # Lo que entrega BaseScraper.stream: progreso de cada combinación o una película
+    kind: str  # target_start, movie, target_done, target_failed o target_deferred
+    target: Target
+    movie_data: Optional[dict] = None
+    error: Optional[str] = None
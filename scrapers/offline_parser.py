@@ -0,0 +1,174 @@
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+from scrapers.base_scraper import BaseScraper
+from scrapers.html_dom import Node, parse_html
+from scrapers.html_snapshots import SnapshotStore
+from scrapers.models import Target, output_folder
+from scrapers.sinks import JsonSink, SerializedMovie
+from rich.console import Console
+import argparse, time
+
+console = Console()
+
+# Se usan los mismos selectores que LISTING_JS, SNAPSHOT_SHOWTIMES_JS y CinepolisScraper
+
+
+def _text(root: Node, selector: str) -> str:
+    element = root.select_one(selector)
+    return element.text() if element else ""
+
+
+def _attribute(root: Node, selector: str, name: str) -> Optional[str]:
+    element = root.select_one(selector)
+    return element.get(name) if element else None
+
+
+def parse_cineplanet_listing(html: str, page_url: str) -> Tuple[dict, List[dict]]:
+    root = parse_html(html)
+    chips = {
+        key: chip.text()
+        for key, chip in zip(["city", "cinema", "day"], root.select(".movies-chips--chip"))
+    }
+    entries = []
+    for movie in root.select(".movies-list--large-item"):
+        image = movie.select_one(".image-loader--image_loaded") or movie.select_one("img")
+        link = (
+            movie.select_one(".movie-info-details--first-button-wrapper a[href]")
+            or movie.select_one(".movie-info-details--first-button-wrapper[href]")
+            or movie.select_one("a[href]")
+        )
+        entries.append(
+            {
+                "title": _text(movie, ".movies-list--large-movie-description-title"),
+                "extra": _text(movie, ".movies-list--large-movie-description-extra"),
+                "image": image.get("src") if image else None,
+                "href": urljoin(page_url, link.get("href")) if link else None,
+            }
+        )
+    return chips, entries
+
+
+def parse_cineplanet_detail(html: str, page_url: str) -> dict:
+    showtimes_by_cinema: dict = {}
+    for cine in parse_html(html).select(".film-detail-showtimes--accordion"):
+        raw_data = []
+        for container in cine.select(".cinema-showcases--sessions-details"):
+            showtimes = []
+            for item in container.select(".sessions-details--session-item"):
+                if "showtime-selector_disable" in (item.get("class") or ""):
+                    continue
+                link = item.select_one(".showtime-selector--link")
+                href = link.get("href") if link else None
+                # Sin enlace en el HTML la URL de compra solo se obtiene con un clic
+                showtimes.append(
+                    [link.text() if link else "", urljoin(page_url, href) if href else None]
+                )
+            raw_data.append(
+                {
+                    "dimension": _text(container, ".sessions-details--formats-dimension"),
+                    "format": _text(container, ".sessions-details--formats-theather"),
+                    "language": _text(container, ".sessions-details--formats-language"),
+                    "showtimes": showtimes,
+                }
+            )
+        showtimes_by_cinema[_text(cine, ".cinema-showcases--summary-name")] = raw_data
+    return showtimes_by_cinema
+
+
+def parse_cinepolis_listing(html: str, target: Target) -> List[dict]:
+    movies = []
+    for movie in parse_html(html).select(".divFecha article"):
+        movie_data = {
+            "city": target.city,
+            "cinema": target.cinema,
+            "day": target.day,
+            "title": _text(movie, ".datalayer-movie"),
+            "age_restriction": _attribute(movie, ".clasificacion", "data-description"),
+            "running_time": _text(movie, ".duracion"),
+        }
+        # Igual que CinepolisScraper.scrape_showtimes_data: un solo bloque acumulado
+        data: dict = {}
+        for cinema in movie.select(".horarioExp"):
+            children = [
+                child for column in cinema.select(".col3") for child in column.elements()
+            ]
+            if len(children) > 0:
+                data["language"] = children[-1].text()
+            if len(children) > 1:
+                data["format"] = children[-2].text()
+            data["showtimes"] = [
+                [_text(button, "a"), _attribute(button, "a", "href")]
+                for row in cinema.select(".col9")
+                for button in row.select(".btnhorario")
+            ]
+        movie_data["showtimes"] = [data]
+        movies.append(movie_data)
+    return movies
+
+
+def reparse(store: SnapshotStore, run_id: Optional[str] = None) -> Iterator[Tuple[Target, dict]]:
+    # Recorre el índice de la ejecución y vuelve a extraer cada película
+    listings: Dict[str, Tuple[dict, List[dict]]] = {}
+    for record in store.records(run_id):
+        target = Target.from_dict(record["target"])
+        html = store.get(record["digest"])
+        if target.chain == "cinepolis":
+            for movie_data in parse_cinepolis_listing(html, target):
+                yield target, movie_data
+        elif record["kind"] == "listing":
+            listings[target.key] = parse_cineplanet_listing(html, record["url"])
+        elif record["kind"] == "detail":
+            chips, entries = listings.get(target.key, ({}, []))
+            href = record.get("href")
+            entry = next((entry for entry in entries if href and entry["href"] == href), None)
+            if entry is None and record.get("index", len(entries)) < len(entries):
+                entry = entries[record["index"]]
+            if entry is None:
+                print(f"No se encontró la película de {record['url']} en la cartelera")
+                continue
+            movie_data: dict = {}
+            BaseScraper.fill_general_information(
+                movie_data, entry["title"], entry["extra"], entry["image"], ", "
+            )
+            movie_data.update(chips)
+            movie_data["showtimes"] = parse_cineplanet_detail(html, record["url"])
+            yield target, movie_data
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Vuelve a extraer las películas desde el HTML guardado, sin navegador"
+    )
+    parser.add_argument("--snapshots", default="data/.snapshots")
+    parser.add_argument("--run", help="Ejecución a procesar (por defecto la última)")
+    parser.add_argument("--output", default="data/.reparsed")
+    parser.add_argument("--list", action="store_true", help="Lista las ejecuciones guardadas")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(Path(args.snapshots))
+    runs = store.runs()
+    if args.list or not runs:
+        for run in runs:
+            console.print(run)
+        if not runs:
+            console.print("[yellow]No hay HTML guardado todavía[/yellow]")
+        return
+
+    run_id = args.run or runs[-1]
+    start = time.perf_counter()
+    sink = JsonSink()
+    total = 0
+    for target, movie_data in reparse(store, run_id):
+        folder = output_folder(Path(args.output) / run_id, target)
+        folder.mkdir(parents=True, exist_ok=True)
+        sink.write(folder, SerializedMovie(movie_data))
+        total += 1
+    console.print(
+        f"[green]{total} películas re-extraídas de {run_id} en "
+        f"{time.perf_counter() - start:.1f} s[/green]"
+    )
+
+
+if __name__ == "__main__":
+    main()
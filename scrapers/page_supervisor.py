@@ -0,0 +1,156 @@
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from playwright.async_api import Browser, BrowserContext, Page, Error as PlaywrightError
+import asyncio, os
+
+T = TypeVar("T")
+
+
+def process_tree_rss(root_pid: Optional[int] = None) -> int:
+    # Suma la memoria residente (bytes) de este proceso, el driver y Chromium
+    root_pid = root_pid or os.getpid()
+    proc = Path("/proc")
+    if not proc.exists():
+        return 0
+
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
+        pid = int(entry.name)
+        for line in status.splitlines():
+            if line.startswith("PPid:"):
+                parents[pid] = int(line.split()[1])
+            elif line.startswith("VmRSS:"):
+                rss[pid] = int(line.split()[1]) * 1024
+
+    total = 0
+    for pid in rss:
+        current = pid
+        # Sube por los padres hasta llegar a la raíz o a init
+        while current and current != root_pid:
+            current = parents.get(current, 0)
+        if current == root_pid:
+            total += rss[pid]
+    return total
+
+
+class PageSupervisor:
+    """
+    Recicla el contexto del navegador cada cierto número de navegaciones o al superar
+    un umbral de memoria, y relanza el navegador si la página se cuelga o se cae.
+    """
+
+    def __init__(
+        self,
+        launch: Callable[[], Awaitable[Browser]],
+        open_page: Callable[[BrowserContext], Awaitable[Page]],
+        new_context: Optional[Callable[[Browser], Awaitable[BrowserContext]]] = None,
+        max_navigations: int = 40,
+        max_rss_mb: Optional[float] = 1500,
+        watchdog_seconds: float = 180,
+        rss: Callable[[], int] = process_tree_rss,
+    ):
+        self.launch = launch
+        self.open_page = open_page
+        # Crea el contexto nuevo con las opciones del scraper (storage_state)
+        self.new_context = new_context or (lambda browser: browser.new_context())
+        self.max_navigations = max_navigations
+        self.max_rss_mb = max_rss_mb
+        self.watchdog_seconds = watchdog_seconds
+        self.rss = rss
+        self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+        self.navigations = 0
+        self.crashed = False
+        self.recycles = 0
+
+    def _watch(self, page: Page):
+        self.crashed = False
+        page.on("crash", lambda _: self._mark_crashed())
+
+    def _mark_crashed(self):
+        print("[!] La página del navegador se cayó")
+        self.crashed = True
+
+    def adopt(self, browser: Browser, page: Page):
+        # Supervisa una página que ya se abrió y filtró
+        self.browser = browser
+        self.context = page.context
+        self.page = page
+        self._watch(page)
+
+    def note_navigation(self, count: int = 1):
+        self.navigations += count
+
+    def needs_recycle(self) -> bool:
+        if self.navigations >= self.max_navigations:
+            return True
+        if self.max_rss_mb is not None:
+            return self.rss() > self.max_rss_mb * 1024 * 1024
+        return False
+
+    async def _close_context(self):
+        if self.context is None:
+            return
+        try:
+            await self.context.close()
+        except PlaywrightError:
+            pass  # El contexto ya no existe si el navegador se cayó
+        self.context = None
+
+    def _browser_lost(self) -> bool:
+        # Un contexto persistente no expone is_connected
+        is_connected = getattr(self.browser, "is_connected", None)
+        return self.browser is not None and is_connected is not None and not is_connected()
+
+    async def recycle(self, relaunch: bool = False) -> Page:
+        await self._close_context()
+        persistent = self.browser is not None and not hasattr(self.browser, "new_context")
+        if persistent or relaunch or self.browser is None or self._browser_lost():
+            if self.browser is not None:
+                try:
+                    await self.browser.close()
+                except PlaywrightError:
+                    pass
+            self.browser = await self.launch()
+
+        if hasattr(self.browser, "new_context"):
+            self.context = await self.new_context(self.browser)
+        else:
+            # Perfil persistente: el navegador es el propio contexto
+            self.context = self.browser
+        # Restaura filtros y lista de películas en la página nueva
+        self.page = await self.open_page(self.context)
+        self._watch(self.page)
+        self.navigations = 0
+        self.recycles += 1
+        return self.page
+
+    async def checkpoint(self) -> Page:
+        if self.needs_recycle():
+            print("Reciclando la página del navegador para liberar memoria...")
+            await self.recycle()
+        return self.page
+
+    async def run(self, operation: Callable[[Page], Awaitable[T]], retries: int = 1) -> T:
+        # Ejecuta la operación con un vigilante de tiempo; si la página muere, se relanza
+        for attempt in range(retries + 1):
+            page = await self.checkpoint()
+            try:
+                return await asyncio.wait_for(operation(page), self.watchdog_seconds)
+            except (asyncio.TimeoutError, PlaywrightError) as e:
+                browser_lost = self._browser_lost()
+                recoverable = (
+                    isinstance(e, asyncio.TimeoutError) or self.crashed or browser_lost
+                )
+                if not recoverable or attempt == retries:
+                    raise
+                print("[!] La página dejó de responder, relanzando el navegador...")
+                await self.recycle(relaunch=self.crashed or browser_lost)
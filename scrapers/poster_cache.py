@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import asyncio, hashlib, json, mimetypes, os, threading
+import requests
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+
+class PosterCache:
+    """
+    Descarga cada póster una sola vez y lo guarda con el hash de su contenido
+    como nombre, junto a un índice url → archivo para las peticiones condicionales.
+    """
+
+    def __init__(
+        self,
+        folder: Path = Path("data") / "posters",
+        max_workers: int = 8,
+        timeout: float = 10,
+        session: Optional[requests.Session] = None,
+    ):
+        self.folder = Path(folder)
+        self.index_path = self.folder / "index.json"
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="poster"
+        )
+        if session is None:
+            # Reutiliza las conexiones entre descargas del mismo host
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=max_workers, pool_maxsize=max_workers
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.index: Dict[str, dict] = self._load_index()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def _load_index(self) -> Dict[str, dict]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with self.index_path.open(encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print("No se pudo leer el índice de pósters, se reconstruirá")
+            return {}
+
+    def _save_index(self):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _extension(self, url: str, content_type: str) -> str:
+        content_type = content_type.split(";")[0].strip().lower()
+        if content_type in EXTENSIONS:
+            return EXTENSIONS[content_type]
+        suffix = Path(urlparse(url).path).suffix.lower()
+        return suffix or mimetypes.guess_extension(content_type) or ".img"
+
+    def _download(self, url: str) -> Path:
+        # Se ejecuta en un hilo del pool
+        entry = self.index.get(url)
+        headers = {}
+        if entry and (self.folder / entry["file"]).exists():
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and entry:
+            return self.folder / entry["file"]
+        response.raise_for_status()
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        extension = self._extension(url, response.headers.get("Content-Type", ""))
+        relative = Path(digest[:2]) / f"{digest}{extension}"
+        file_path = self.folder / relative
+        if not file_path.exists():
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_suffix(".part")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, file_path)
+
+        with self._lock:
+            self.index[url] = {
+                "file": relative.as_posix(),
+                "sha256": digest,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self._save_index()
+        return file_path
+
+    def prefetch(self, url: str) -> asyncio.Future:
+        # Cada url se descarga como máximo una vez por ejecución
+        if url not in self._pending:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self._download, url)
+            future.add_done_callback(lambda done: self._forget_failed(url, done))
+            self._pending[url] = future
+        return self._pending[url]
+
+    def _forget_failed(self, url: str, future: asyncio.Future):
+        # Un error pasajero no bloquea la url: la próxima llamada la vuelve a pedir
+        if future.cancelled() or future.exception() is not None:
+            if self._pending.get(url) is future:
+                del self._pending[url]
+
+    async def fetch(self, url: str) -> Path:
+        return await self.prefetch(url)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
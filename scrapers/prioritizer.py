@@ -0,0 +1,143 @@
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from scrapers.archive import iter_json_files
+from scrapers.entity_resolver import MovieResolver, normalize_title
+from scrapers.models import Movie, Target, output_folder
+from slugify import slugify
+import json, re, time
+
+WEEKDAYS = ("lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo")
+MONTHS = (
+    "ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "set", "oct", "nov", "dic",
+)
+# Días que se asumen para un texto que no se entiende: después de toda la semana
+UNKNOWN_DAYS = 7
+# Más allá de estos días todas las fechas puntúan igual
+MAX_DAYS = 99
+# Peso del cine y de la antigüedad: entre los dos suman menos que un día
+TIE_BREAK = 0.4
+
+
+def _month(word: str) -> Optional[int]:
+    # "sep" y "set" se usan indistintamente
+    word = word[:3].replace("sep", "set")
+    return MONTHS.index(word) + 1 if word in MONTHS else None
+
+
+def days_ahead(day: str, today: date) -> int:
+    # "Hoy Lunes" -> 0, "Mañana" -> 1, "Jueves 23 oct" o "23/10" -> días que faltan
+    words = slugify(day or "", separator=" ").split()
+    if not words:
+        return UNKNOWN_DAYS
+    if words[0] == "hoy":
+        return 0
+    if words[0] == "manana":
+        return 1
+
+    numbers = re.findall(r"\d+", day)
+    # "martes" empieza como "mar"zo: los días de la semana no cuentan como mes
+    months = [_month(word) for word in words if word not in WEEKDAYS]
+    month = next((month for month in months if month), None)
+    if "/" in day and len(numbers) >= 2:
+        month = int(numbers[1])
+    if numbers and month:
+        try:
+            wanted = date(today.year, month, int(numbers[0]))
+        except ValueError:
+            return UNKNOWN_DAYS
+        if wanted < today:
+            # Cartelera de fin de año que ya muestra enero
+            wanted = wanted.replace(year=today.year + 1)
+        return (wanted - today).days
+    for word in words:
+        if word in WEEKDAYS:
+            return (WEEKDAYS.index(word) - today.weekday()) % 7
+    return UNKNOWN_DAYS
+
+
+def load_traffic(root: Path) -> Dict[str, float]:
+    # Carpeta del cine (ciudad/cadena/cine) -> fracción del cine con más funciones;
+    # se cuentan los JSON directamente, sin pandas ni caché en disco
+    totals: Dict[str, int] = {}
+    for path in iter_json_files(root):
+        try:
+            with path.open(encoding="utf-8") as f:
+                movie = Movie.from_dict(json.load(f))
+        except (OSError, ValueError, AttributeError):
+            continue
+        cinema = "/".join(path.relative_to(root).parts[:3])
+        totals[cinema] = totals.get(cinema, 0) + sum(1 for _ in movie.iter_showtimes())
+    busiest = max(totals.values(), default=0)
+    return {cinema: count / busiest for cinema, count in totals.items()} if busiest else {}
+
+
+class Prioritizer:
+    """
+    Ordena las combinaciones para que lo más útil llegue primero: el día más
+    cercano, los cines con más funciones y los datos más antiguos.
+    """
+
+    def __init__(
+        self,
+        root: Path = Path("data"),
+        traffic: Optional[Dict[str, float]] = None,
+        today: Optional[date] = None,
+        clock: Callable[[], float] = time.time,
+        traffic_loader: Callable[[Path], Dict[str, float]] = load_traffic,
+    ):
+        self.root = Path(root)
+        self.clock = clock
+        self.today = today or datetime.fromtimestamp(clock()).date()
+        # Se calcula la primera vez que se puntúa, si no se pasó ya hecho
+        self._traffic = traffic
+        self.traffic_loader = traffic_loader
+
+    @property
+    def traffic(self) -> Dict[str, float]:
+        if self._traffic is None:
+            self._traffic = self.traffic_loader(self.root)
+        return self._traffic
+
+    def _cinema_key(self, target: Target) -> str:
+        return output_folder(Path(), target).parent.as_posix()
+
+    def stale_hours(self, target: Target) -> Optional[float]:
+        # Horas desde el último JSON guardado; None si nunca se recopiló
+        folder = output_folder(self.root, target)
+        try:
+            newest = max(
+                (path.stat().st_mtime for path in folder.iterdir() if path.suffix == ".json"),
+                default=None,
+            )
+        except OSError:
+            return None
+        return None if newest is None else max(self.clock() - newest, 0.0) / 3600
+
+    def score(self, target: Target) -> float:
+        # Cada día más lejos resta un punto: hoy vale 100, mañana 99...
+        urgency = MAX_DAYS + 1 - min(days_ahead(target.day, self.today), MAX_DAYS)
+        traffic = self.traffic.get(self._cinema_key(target), 0.0)
+        hours = self.stale_hours(target)
+        staleness = 1.0 if hours is None else min(hours / 24, 1.0)
+        # Cine y antigüedad suman menos de un punto: solo desempatan dentro del mismo día
+        return round(urgency + TIE_BREAK * traffic + TIE_BREAK * staleness, 3)
+
+    def scores(self, targets: Iterable[Target]) -> Dict[str, float]:
+        return {target.key: self.score(target) for target in targets}
+
+    def order(self, targets: Iterable[Target]) -> List[Target]:
+        targets = list(targets)
+        scores = self.scores(targets)
+        # Orden estable: con el mismo puntaje se respeta el del catálogo
+        return sorted(targets, key=lambda target: -scores[target.key])
+
+
+def order_movies(listing: List[dict], resolver: MovieResolver) -> List[int]:
+    # Los estrenos (títulos que el registro no conoce) van primero; se devuelven
+    # los índices de la cartelera, que la bitácora y las capturas siguen usando
+    def is_new(i: int) -> bool:
+        key = normalize_title(listing[i]["title"])
+        return bool(key) and resolver.match(key, None) is None
+
+    return sorted(range(len(listing)), key=lambda i: not is_new(i))
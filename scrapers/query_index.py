@@ -0,0 +1,225 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from scrapers.models import MOVIE_DEPTH, Movie, chain_from_path, intern, parse_time
+from slugify import slugify
+from rich.console import Console
+import argparse, bisect, json, os
+
+console = Console()
+
+# Campos que tienen su propio índice
+INDEXED_FIELDS = ("chain", "city", "cinema", "day", "title", "dimension", "format", "language")
+
+
+def normalize(field_name: str, value: Optional[str]) -> str:
+    value = value or ""
+    if field_name == "city":
+        value = value.removesuffix(", Perú")
+    return slugify(value)
+
+
+@dataclass(slots=True)
+class ShowtimeEntry:
+    chain: str
+    city: str
+    cinema: str
+    day: str
+    title: str
+    dimension: str
+    format: str
+    language: str
+    time: str
+    minutes: Optional[int]
+    url: Optional[str]
+    source: str
+
+
+class ScheduleIndex:
+    """
+    Índice en memoria de las funciones guardadas en data/<ciudad>/<cadena>/<cine>/<día>.
+    """
+
+    def __init__(self, root: Path = Path("data")):
+        self.root = Path(root)
+        self.entries: List[Optional[ShowtimeEntry]] = []
+        self.indexes: Dict[str, Dict[str, Set[int]]] = {
+            name: {} for name in INDEXED_FIELDS
+        }
+        # (minutos, id) ordenados para búsquedas por rango horario
+        self.by_time: List[Tuple[int, int]] = []
+        self._files: Dict[str, Tuple[int, int, List[int]]] = {}
+        self._time_dirty = False
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self.entries if entry is not None)
+
+    def _iter_json_files(self) -> Iterable[os.DirEntry]:
+        # Solo data/<ciudad>/<cadena>/<cine>/<día>/<película>.json: otros JSON
+        # (índice de pósters, resúmenes) no son películas
+        stack = [(self.root, 0)]
+        while stack:
+            folder, depth = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    for item in it:
+                        if item.name.startswith("."):
+                            continue
+                        if item.is_dir(follow_symlinks=False):
+                            if depth < MOVIE_DEPTH - 1:
+                                stack.append((Path(item.path), depth + 1))
+                        elif depth == MOVIE_DEPTH - 1 and item.name.endswith(".json"):
+                            yield item
+            except FileNotFoundError:
+                continue
+
+    def _add(self, entry: ShowtimeEntry) -> int:
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        for name in INDEXED_FIELDS:
+            key = normalize(name, getattr(entry, name))
+            self.indexes[name].setdefault(key, set()).add(entry_id)
+        if entry.minutes is not None:
+            self.by_time.append((entry.minutes, entry_id))
+            self._time_dirty = True
+        return entry_id
+
+    def _remove(self, entry_ids: List[int]):
+        for entry_id in entry_ids:
+            entry = self.entries[entry_id]
+            if entry is None:
+                continue
+            for name in INDEXED_FIELDS:
+                key = normalize(name, getattr(entry, name))
+                bucket = self.indexes[name].get(key)
+                if bucket is not None:
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del self.indexes[name][key]
+            self.entries[entry_id] = None
+        if entry_ids:
+            removed = set(entry_ids)
+            self.by_time = [item for item in self.by_time if item[1] not in removed]
+
+    def _load_file(self, path: Path) -> List[int]:
+        try:
+            with path.open(encoding="utf-8") as f:
+                movie = Movie.from_dict(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"No se pudo indexar {path}: {e}")
+            return []
+
+        chain = intern(chain_from_path(self.root, path))
+        source = path.as_posix()
+        return [
+            self._add(ShowtimeEntry(chain=chain, source=source, **row))
+            for row in movie.showtime_rows()
+        ]
+
+    def refresh(self) -> int:
+        # Solo se vuelven a leer los archivos nuevos o modificados
+        changed = 0
+        seen = set()
+        for item in self._iter_json_files():
+            stat = item.stat()
+            seen.add(item.path)
+            known = self._files.get(item.path)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                continue
+            if known:
+                self._remove(known[2])
+            ids = self._load_file(Path(item.path))
+            self._files[item.path] = (stat.st_mtime_ns, stat.st_size, ids)
+            changed += 1
+
+        for path in set(self._files) - seen:
+            self._remove(self._files.pop(path)[2])
+            changed += 1
+
+        if self._time_dirty:
+            self.by_time.sort()
+            self._time_dirty = False
+        return changed
+
+    def _time_range(self, start: Optional[int], end: Optional[int]) -> Set[int]:
+        low = 0 if start is None else bisect.bisect_left(self.by_time, (start, -1))
+        high = (
+            len(self.by_time)
+            if end is None
+            else bisect.bisect_right(self.by_time, (end, len(self.entries)))
+        )
+        return {entry_id for _, entry_id in self.by_time[low:high]}
+
+    def query(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        **filters: Optional[str],
+    ) -> List[ShowtimeEntry]:
+        unknown = set(filters) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Filtros desconocidos: {', '.join(sorted(unknown))}")
+
+        buckets = [
+            self.indexes[name].get(normalize(name, value), set())
+            for name, value in filters.items()
+            if value
+        ]
+        # Se intersecta empezando por el conjunto más pequeño
+        buckets.sort(key=len)
+        candidates: Optional[Set[int]] = set(buckets[0]) if buckets else None
+        for bucket in buckets[1:]:
+            candidates &= bucket
+            if not candidates:
+                break
+
+        start_minutes = parse_time(start) if start else None
+        end_minutes = parse_time(end) if end else None
+        if start_minutes is not None or end_minutes is not None:
+            if candidates is not None and len(candidates) < len(self.by_time) // 8:
+                low = -1 if start_minutes is None else start_minutes
+                high = 24 * 60 if end_minutes is None else end_minutes
+                candidates = {
+                    entry_id
+                    for entry_id in candidates
+                    if self.entries[entry_id].minutes is not None
+                    and low <= self.entries[entry_id].minutes <= high
+                }
+            else:
+                in_range = self._time_range(start_minutes, end_minutes)
+                candidates = in_range if candidates is None else candidates & in_range
+
+        if candidates is None:
+            candidates = {i for i, entry in enumerate(self.entries) if entry is not None}
+
+        results = [self.entries[entry_id] for entry_id in candidates]
+        results.sort(key=lambda entry: (entry.minutes is None, entry.minutes or 0, entry.cinema))
+        return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Consulta las funciones guardadas en la carpeta de datos"
+    )
+    parser.add_argument("--root", default="data", help="Carpeta con los JSON guardados")
+    parser.add_argument("--from", dest="start", help="Hora mínima, por ejemplo 19:00")
+    parser.add_argument("--to", dest="end", help="Hora máxima, por ejemplo 21:00")
+    for name in INDEXED_FIELDS:
+        parser.add_argument(f"--{name}")
+    args = parser.parse_args(argv)
+
+    index = ScheduleIndex(Path(args.root))
+    index.refresh()
+    filters = {name: getattr(args, name) for name in INDEXED_FIELDS}
+    results = index.query(args.start, args.end, **filters)
+
+    for entry in results:
+        console.print(
+            f"[cyan]{entry.time}[/] [bold]{entry.title}[/] - {entry.cinema} "
+            f"({entry.dimension} {entry.language}) {entry.day}"
+        )
+    console.print(f"\n[green]{len(results)} funciones encontradas[/green]")
+
+
+if __name__ == "__main__":
+    main()
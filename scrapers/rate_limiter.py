@@ -0,0 +1,146 @@
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+import asyncio, time
+
+# Respuestas con las que el sitio pide que se vaya más despacio
+THROTTLE_STATUSES = (429, 503)
+
+
+class Slot:
+    # Resultado de una petición, que decide cómo se ajusta el límite
+    def __init__(self):
+        self.outcome = "ok"
+        self.retry_after: Optional[float] = None
+
+    def failed(self):
+        self.outcome = "error"
+
+    def throttled(self, retry_after: Optional[float] = None):
+        self.outcome = "throttled"
+        self.retry_after = retry_after
+
+    def check(self, response):
+        # Revisa la respuesta de page.goto
+        status = getattr(response, "status", None)
+        if status in THROTTLE_STATUSES:
+            retry_after = None
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+            self.throttled(retry_after)
+
+
+class DomainLimiter:
+    """
+    Limita las peticiones a un sitio con un balde de fichas (ritmo máximo) y una
+    concurrencia AIMD: sube de a poco mientras responde rápido y se reduce a la
+    mitad ante errores, recargas o respuestas 429.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 8,
+        initial_concurrency: float = 2,
+        target_latency: float = 8.0,
+        decrease: float = 0.5,
+        cooldown: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = float(initial_concurrency)
+        self.target_latency = target_latency
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            while True:
+                now = self.clock()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        except BaseException:
+            await self.release("cancelled", 0)
+            raise
+
+    def backoff(self, pause: Optional[float] = None):
+        self.limit = max(self.min_concurrency, self.limit * self.decrease)
+        if pause:
+            self.paused_until = max(self.paused_until, self.clock() + pause)
+
+    async def release(self, outcome: str, latency: float, retry_after: Optional[float] = None):
+        if outcome == "ok":
+            if latency <= self.target_latency:
+                # Aumento aditivo: cerca de una página más por cada ronda completa
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        elif outcome == "throttled":
+            self.backoff(retry_after or self.cooldown)
+        elif outcome == "error":
+            self.backoff()
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+
+class RateLimiter:
+    # Un DomainLimiter por sitio, compartido por todas las páginas del proceso
+    def __init__(self, **options):
+        self.options = options
+        self.domains: Dict[str, DomainLimiter] = {}
+
+    def for_url(self, url: str) -> DomainLimiter:
+        domain = urlsplit(url).hostname or ""
+        domain = domain.removeprefix("www.")
+        if domain not in self.domains:
+            self.domains[domain] = DomainLimiter(**self.options)
+        return self.domains[domain]
+
+    def penalize(self, url: str):
+        # El contenido no cargó: se baja la concurrencia sin esperar a otra petición
+        self.for_url(url).backoff()
+
+    @asynccontextmanager
+    async def request(self, url: str):
+        limiter = self.for_url(url)
+        await limiter.acquire()
+        slot = Slot()
+        start = limiter.clock()
+        try:
+            yield slot
+        except Exception:
+            slot.failed()
+            raise
+        finally:
+            await limiter.release(slot.outcome, limiter.clock() - start, slot.retry_after)
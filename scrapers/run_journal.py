@@ -0,0 +1,137 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from scrapers.models import Target
+import json, os, uuid
+
+
+class RunJournal:
+    """
+    Bitácora de solo escritura al final (JSONL) con el avance de cada ejecución,
+    para poder retomar una ejecución interrumpida sin repetir lo ya guardado.
+    """
+
+    def __init__(
+        self,
+        path: Path = Path("data") / ".runs" / "journal.jsonl",
+        run_id: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self._movies: Dict[str, Set[str]] = {}
+        self._targets: Set[str] = set()
+        self._deferred: Set[str] = set()
+        self._file = None
+
+    @classmethod
+    def open(
+        cls, path: Path = Path("data") / ".runs" / "journal.jsonl", resume: bool = False
+    ) -> "RunJournal":
+        journal = cls(path)
+        if resume:
+            run_id = journal.last_unfinished_run()
+            if run_id is None:
+                print("No hay ejecuciones pendientes, se empieza una nueva")
+            else:
+                journal.run_id = run_id
+                journal.load_progress()
+                print(f"Retomando la ejecución {run_id}")
+        return journal
+
+    def _read_events(self):
+        if not self.path.exists():
+            return
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Última línea incompleta si el proceso murió mientras escribía
+                    continue
+
+    def last_unfinished_run(self) -> Optional[str]:
+        last_run = None
+        finished = set()
+        for event in self._read_events():
+            if event["event"] == "run_start":
+                last_run = event["run_id"]
+            elif event["event"] == "run_end":
+                finished.add(event["run_id"])
+        return last_run if last_run not in finished else None
+
+    def load_progress(self):
+        for event in self._read_events():
+            if event.get("run_id") != self.run_id:
+                continue
+            if event["event"] == "movie" and event.get("status") == "done":
+                self._movies.setdefault(event["target"], set()).add(event["title"])
+            elif event["event"] == "target_end":
+                self._targets.add(event["target"])
+
+    def _write(self, event: str, **fields):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+        record = {
+            "event": event,
+            "run_id": self.run_id,
+            "at": datetime.now().isoformat(timespec="seconds"),
+            **fields,
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Se fuerza a disco para sobrevivir a un cierre abrupto
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def start_run(self):
+        self._write("run_start")
+
+    def finish_run(self):
+        self._write("run_end")
+        self.close()
+
+    def start_target(self, target: Target):
+        self._write("target_start", target=target.key, **target.to_dict())
+
+    def finish_target(self, target: Target):
+        self._targets.add(target.key)
+        self._write("target_end", target=target.key)
+
+    def defer_target(self, target: Target, reason: str = "deadline"):
+        # Queda pendiente para la próxima ejecución (--resume)
+        if target.key in self._deferred:
+            return
+        self._deferred.add(target.key)
+        self._write("target_deferred", target=target.key, reason=reason, **target.to_dict())
+
+    def deferred_targets(self) -> List[Target]:
+        # Combinaciones aplazadas en esta ejecución que aún no se terminaron
+        targets: Dict[str, Target] = {}
+        finished = set(self._targets)
+        for event in self._read_events():
+            if event.get("run_id") != self.run_id:
+                continue
+            if event["event"] == "target_deferred":
+                targets[event["target"]] = Target.from_dict(event)
+            elif event["event"] == "target_end":
+                finished.add(event["target"])
+        return [target for key, target in targets.items() if key not in finished]
+
+    def record_movie(self, target: Target, index: int, title: str, status: str = "done"):
+        if status == "done":
+            self._movies.setdefault(target.key, set()).add(title)
+        self._write("movie", target=target.key, index=index, title=title, status=status)
+
+    def is_target_done(self, target: Target) -> bool:
+        return target.key in self._targets
+
+    def is_movie_done(self, target: Target, title: str) -> bool:
+        return title in self._movies.get(target.key, set())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
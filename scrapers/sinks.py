@@ -0,0 +1,202 @@
+from abc import ABC, abstractmethod
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Type
+from scrapers.models import Movie
+from slugify import slugify
+import csv, json, os, sqlite3, threading, pandas
+
+
+class SerializedMovie:
+    """
+    Los datos de una película convertidos una sola vez y compartidos por todos
+    los formatos de salida.
+    """
+
+    def __init__(self, movie_data: dict):
+        self.data = movie_data
+        self.slug = slugify(movie_data["title"])
+
+    @cached_property
+    def movie(self) -> Movie:
+        return Movie.from_dict(self.data)
+
+    @cached_property
+    def json_text(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, indent=4)
+
+    @cached_property
+    def json_line(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+
+    @cached_property
+    def rows(self) -> List[dict]:
+        return self.movie.rows()
+
+
+class Sink(ABC):
+    # Nombre con el que se ofrece al usuario
+    label: str = ""
+
+    def __init__(self):
+        # Los archivos compartidos entre películas se escriben de a uno
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def write(self, output_folder: Path, record: SerializedMovie):
+        pass
+
+
+class JsonSink(Sink):
+    label = "JSON"
+
+    def write(self, output_folder: Path, record: SerializedMovie):
+        file_path = output_folder / f"{record.slug}.json"
+        file_path.write_text(record.json_text, encoding="utf-8")
+
+
+class ExcelSink(Sink):
+    label = "Excel"
+
+    def write(self, output_folder: Path, record: SerializedMovie):
+        file_path = output_folder / f"{record.slug}.xlsx"
+        pandas.DataFrame(record.rows).to_excel(file_path, index=False)
+
+
+class CsvSink(Sink):
+    label = "CSV"
+
+    def write(self, output_folder: Path, record: SerializedMovie):
+        file_path = output_folder / f"{record.slug}.csv"
+        with file_path.open("w", encoding="utf-8", newline="") as f:
+            if not record.rows:
+                return
+            writer = csv.DictWriter(f, fieldnames=list(record.rows[0]))
+            writer.writeheader()
+            writer.writerows(record.rows)
+
+
+class JsonlSink(Sink):
+    label = "JSONL"
+
+    def write(self, output_folder: Path, record: SerializedMovie):
+        # Un archivo por carpeta, una línea por película: volver a recopilarla
+        # (--resume, otra ejecución del mismo día) reemplaza su línea
+        file_path = output_folder / "movies.jsonl"
+        title = record.data["title"]
+        with self._lock:
+            lines = []
+            if file_path.exists():
+                with file_path.open(encoding="utf-8") as f:
+                    lines = [
+                        line
+                        for line in f
+                        if line.strip() and json.loads(line).get("title") != title
+                    ]
+            lines.append(record.json_line + "\n")
+            tmp_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text("".join(lines), encoding="utf-8")
+            os.replace(tmp_path, file_path)
+
+
+class SqliteSink(Sink):
+    label = "SQLite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS movies (
+        folder TEXT NOT NULL,
+        title TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (folder, title)
+    );
+    CREATE TABLE IF NOT EXISTS showtimes (
+        folder TEXT NOT NULL,
+        title TEXT NOT NULL,
+        cinema TEXT,
+        city TEXT,
+        day TEXT,
+        dimension TEXT,
+        format TEXT,
+        language TEXT,
+        time TEXT,
+        url TEXT
+    );
+    CREATE INDEX IF NOT EXISTS showtimes_movie ON showtimes (folder, title);
+    """
+
+    def __init__(self, path: Path = Path("data") / "movies.sqlite"):
+        super().__init__()
+        self.path = Path(path)
+
+    def write(self, output_folder: Path, record: SerializedMovie):
+        folder = Path(output_folder).as_posix()
+        title = record.data["title"]
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            try:
+                with connection:
+                    connection.executescript(self.SCHEMA)
+                    # Volver a recopilar una película reemplaza sus funciones
+                    connection.execute(
+                        "INSERT OR REPLACE INTO movies VALUES (?, ?, ?)",
+                        (folder, title, record.json_line),
+                    )
+                    connection.execute(
+                        "DELETE FROM showtimes WHERE folder = ? AND title = ?",
+                        (folder, title),
+                    )
+                    connection.executemany(
+                        "INSERT INTO showtimes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                folder,
+                                title,
+                                row["Cine"],
+                                row["Ciudad"],
+                                row["Día"],
+                                row["Dimensión"],
+                                row["Formato"],
+                                row["Idioma"],
+                                row["Hora"],
+                                row["URL"],
+                            )
+                            for row in record.rows
+                        ],
+                    )
+            finally:
+                connection.close()
+
+
+SINKS: Dict[str, Type[Sink]] = {
+    sink.label: sink for sink in (JsonSink, ExcelSink, JsonlSink, SqliteSink, CsvSink)
+}
+
+
+class MultiSink:
+    """
+    Guarda cada película en todos los formatos escogidos, serializándola una vez.
+    Se usa igual que save_json: format_to_save(output_folder, movie_data).
+    """
+
+    def __init__(self, sinks: Sequence[Sink]):
+        self.sinks = list(sinks)
+
+    @classmethod
+    def from_labels(cls, labels: Sequence[str], sqlite_path: Optional[Path] = None):
+        sinks = []
+        for label in labels:
+            if label == SqliteSink.label and sqlite_path:
+                sinks.append(SqliteSink(sqlite_path))
+            else:
+                sinks.append(SINKS[label]())
+        return cls(sinks)
+
+    @property
+    def labels(self) -> List[str]:
+        return [sink.label for sink in self.sinks]
+
+    def __call__(self, output_folder: Path, movie_data: dict):
+        record = SerializedMovie(movie_data)
+        for sink in self.sinks:
+            sink.write(output_folder, record)
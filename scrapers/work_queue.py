@@ -0,0 +1,249 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from scrapers.models import Target
+import sqlite3, time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    chain TEXT NOT NULL,
+    city TEXT NOT NULL,
+    cinema TEXT NOT NULL,
+    day TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    priority REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, chain);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (status, priority DESC, id);
+"""
+
+
+@dataclass(slots=True)
+class Lease:
+    task_id: int
+    target: Target
+    worker_id: str
+    attempts: int
+    expires: float
+
+
+class WorkQueue:
+    """
+    Cola de combinaciones compartida entre varias máquinas mediante un archivo
+    SQLite: cada combinación se presta a un solo trabajador por un tiempo limitado.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_seconds: float = 900,
+        max_attempts: int = 3,
+        chain_caps: Optional[Dict[str, int]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.chain_caps = chain_caps or {}
+        self.clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Sin WAL: en un sistema de archivos compartido solo es fiable el modo clásico
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connect()
+        try:
+            # Bloquea la escritura desde el inicio para que dos nodos no tomen lo mismo
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            connection.close()
+
+    def enqueue(
+        self, targets: Iterable[Target], priorities: Optional[Dict[str, float]] = None
+    ) -> int:
+        # Las combinaciones ya encoladas solo actualizan su prioridad si siguen pendientes
+        now = self.clock()
+        priorities = priorities or {}
+        rows = [
+            (
+                target.key,
+                target.chain,
+                target.city,
+                target.cinema,
+                target.day,
+                priorities.get(target.key, 0.0),
+                now,
+            )
+            for target in targets
+        ]
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                """INSERT OR IGNORE INTO tasks (key, chain, city, cinema, day, priority, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            added = connection.total_changes - before
+            if priorities:
+                connection.executemany(
+                    "UPDATE tasks SET priority = ? WHERE key = ? AND status = 'queued'",
+                    [(priority, key) for key, priority in priorities.items()],
+                )
+            return added
+
+    def _expire_leases(self, connection: sqlite3.Connection, now: float):
+        # Un préstamo vencido vuelve a la cola, o a la lista de muertos si agotó intentos
+        connection.execute(
+            """UPDATE tasks
+            SET status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'queued' END,
+                lease_owner = NULL, lease_expires = NULL,
+                last_error = 'Préstamo vencido', updated_at = ?
+            WHERE status = 'leased' AND lease_expires < ?""",
+            (self.max_attempts, now, now),
+        )
+
+    def lease(self, worker_id: str) -> Optional[Lease]:
+        now = self.clock()
+        with self._transaction() as connection:
+            self._expire_leases(connection, now)
+
+            busy = {
+                row["chain"]: row["total"]
+                for row in connection.execute(
+                    "SELECT chain, COUNT(*) AS total FROM tasks WHERE status = 'leased' GROUP BY chain"
+                )
+            }
+            full = [
+                chain for chain, cap in self.chain_caps.items() if busy.get(chain, 0) >= cap
+            ]
+            placeholders = ",".join("?" for _ in full)
+            query = "SELECT * FROM tasks WHERE status = 'queued'"
+            if full:
+                query += f" AND chain NOT IN ({placeholders})"
+            row = connection.execute(
+                query + " ORDER BY priority DESC, id LIMIT 1", full
+            ).fetchone()
+            if row is None:
+                return None
+
+            expires = now + self.lease_seconds
+            connection.execute(
+                """UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                attempts = attempts + 1, updated_at = ? WHERE id = ?""",
+                (worker_id, expires, now, row["id"]),
+            )
+            return Lease(
+                row["id"],
+                Target(row["chain"], row["city"], row["cinema"], row["day"]),
+                worker_id,
+                row["attempts"] + 1,
+                expires,
+            )
+
+    def renew(self, lease: Lease) -> bool:
+        now = self.clock()
+        with self._transaction() as connection:
+            updated = connection.execute(
+                """UPDATE tasks SET lease_expires = ?, updated_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (now + self.lease_seconds, now, lease.task_id, lease.worker_id),
+            ).rowcount
+        if updated:
+            lease.expires = now + self.lease_seconds
+        return bool(updated)
+
+    def complete(self, lease: Lease) -> bool:
+        # Solo cuenta si el préstamo sigue siendo de este trabajador
+        with self._transaction() as connection:
+            return bool(
+                connection.execute(
+                    """UPDATE tasks SET status = 'done', lease_owner = NULL,
+                    lease_expires = NULL, updated_at = ?
+                    WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                    (self.clock(), lease.task_id, lease.worker_id),
+                ).rowcount
+            )
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        with self._transaction() as connection:
+            return bool(
+                connection.execute(
+                    """UPDATE tasks
+                    SET status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'queued' END,
+                        lease_owner = NULL, lease_expires = NULL,
+                        last_error = ?, updated_at = ?
+                    WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                    (self.max_attempts, error, self.clock(), lease.task_id, lease.worker_id),
+                ).rowcount
+            )
+
+    def release(self, lease: Lease) -> bool:
+        # Se devuelve sin gastar un intento: no falló, se acabó el plazo del trabajador
+        with self._transaction() as connection:
+            return bool(
+                connection.execute(
+                    """UPDATE tasks SET status = 'queued', attempts = MAX(attempts - 1, 0),
+                        lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                    WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                    (self.clock(), lease.task_id, lease.worker_id),
+                ).rowcount
+            )
+
+    def requeue_dead(self) -> int:
+        with self._transaction() as connection:
+            return connection.execute(
+                """UPDATE tasks SET status = 'queued', attempts = 0, updated_at = ?
+                WHERE status = 'dead'""",
+                (self.clock(),),
+            ).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        connection = self._connect()
+        try:
+            return {
+                row["status"]: row["total"]
+                for row in connection.execute(
+                    "SELECT status, COUNT(*) AS total FROM tasks GROUP BY status"
+                )
+            }
+        finally:
+            connection.close()
+
+    def dead_letters(self) -> List[dict]:
+        connection = self._connect()
+        try:
+            return [
+                dict(row)
+                for row in connection.execute("SELECT * FROM tasks WHERE status = 'dead'")
+            ]
+        finally:
+            connection.close()
+
+    def is_drained(self) -> bool:
+        stats = self.stats()
+        return not stats.get("queued") and not stats.get("leased")
+
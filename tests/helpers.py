@@ -0,0 +1,35 @@
+from scrapers.base_scraper import BaseScraper
+
+
+class DummyScraper(BaseScraper):
+    """
+    Scraper mínimo para probar lo que hace BaseScraper por su cuenta: cada
+    combinación guarda `movies` películas y falla si su cine es `fail_on`.
+    """
+
+    def __init__(self, *args, movies: int = 0, fail_on=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.movies = movies
+        self.fail_on = fail_on
+        self.saved = 0
+
+    async def scrape(self, url: str = ""):
+        pass
+
+    async def scrape_target(self, browser, target, format_to_save):
+        if target.cinema == self.fail_on:
+            raise RuntimeError("sin cartelera")
+        for i in range(self.movies):
+            await self.save_movie(format_to_save, "carpeta", {"title": f"{target.cinema} {i}"})
+            self.saved += 1
+            if self.deadline:
+                self.deadline.check()
+
+
+class FakeClock:
+    # Reloj que solo avanza cuando el test cambia `now`
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,141 @@
+from scrapers.analytics import ShowtimeFrameCache, filter_frame, main, REPORTS
+from pathlib import Path
+import pytest, json, os, pandas
+
+
+def write_movie(root: Path, chain: str, cinema: str, title: str, sessions: list, **extra) -> Path:
+    folder = root / "lima" / chain / cinema.lower().replace(" ", "_") / "hoy"
+    folder.mkdir(parents=True, exist_ok=True)
+    file_path = folder / f"{title.lower()}.json"
+    movie_data = {
+        "title": title,
+        "city": "Lima",
+        "cinema": cinema,
+        "day": "Hoy",
+        "showtimes": {cinema: sessions},
+        **extra,
+    }
+    file_path.write_text(json.dumps(movie_data), encoding="utf-8")
+    return file_path
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    write_movie(
+        tmp_path,
+        "cineplanet",
+        "CP Alcazar",
+        "Avatar",
+        [
+            {
+                "dimension": "3D",
+                "format": "Regular",
+                "language": "Doblada",
+                "showtimes": [["6:00 pm", "u1"], ["6:30 pm", "u2"], ["10:45 pm", "u3"]],
+            },
+            {
+                "dimension": "2D",
+                "format": "Regular",
+                "language": "Subtitulada",
+                "showtimes": [["7:15 pm", "u4"]],
+            },
+        ],
+        movie_id="avatar",
+    )
+    write_movie(
+        tmp_path,
+        "cinepolis",
+        "Cinepolis Norte",
+        "Avatar (Doblada)",
+        [{"format": "2D", "language": "Doblada", "showtimes": [["18:10", "u5"]]}],
+        movie_id="avatar",
+    )
+    return tmp_path
+
+
+# Test para comprobar los conteos por cine, hora, formato e idioma
+def test_reports(data_root):
+    frame, changed = ShowtimeFrameCache(data_root).load()
+
+    assert changed == 2
+    assert REPORTS["cines"](frame).values.tolist() == [
+        ["cineplanet", "CP Alcazar", 4],
+        ["cinepolis", "Cinepolis Norte", 1],
+    ]
+    assert REPORTS["horas"](frame).values.tolist() == [[18, 3], [19, 1], [22, 1]]
+    assert REPORTS["idiomas"](frame).values.tolist() == [["Doblada", 4], ["Subtitulada", 1]]
+    assert REPORTS["formatos"](frame).values.tolist() == [
+        ["3D", "Regular", 3],
+        ["2D", "2D", 1],
+        ["2D", "Regular", 1],
+    ]
+
+
+# Test para comprobar que las pantallas por película usan el id común
+def test_screens_per_movie(data_root):
+    frame, _ = ShowtimeFrameCache(data_root).load()
+
+    report = REPORTS["peliculas"](frame)
+
+    assert report.values.tolist() == [["avatar", "Avatar", 2, 2, 5]]
+
+
+# Test para comprobar que la caché solo vuelve a leer los archivos modificados
+def test_cache_reads_only_changed_files(data_root):
+    cache = ShowtimeFrameCache(data_root)
+    cache.load()
+
+    frame, changed = ShowtimeFrameCache(data_root).load()
+    assert changed == 0
+    assert len(frame) == 5
+
+    coco = write_movie(
+        data_root,
+        "cineplanet",
+        "CP Alcazar",
+        "Coco",
+        [{"dimension": "2D", "language": "Doblada", "showtimes": [["3:00 pm", "u6"]]}],
+    )
+    os.remove(data_root / "lima" / "cinepolis" / "cinepolis_norte" / "hoy" / "avatar (doblada).json")
+    frame, changed = cache.load()
+
+    assert changed == 1
+    assert sorted(frame["title"].unique()) == ["Avatar", "Coco"]
+    assert len(frame) == 5
+    assert isinstance(frame["cinema"].dtype, pandas.CategoricalDtype)
+    assert coco.exists()
+
+
+# Test para comprobar los filtros con texto normalizado
+def test_filter_frame(data_root):
+    frame, _ = ShowtimeFrameCache(data_root).load()
+
+    assert len(filter_frame(frame, chain="CINEPOLIS", city="lima")) == 1
+    assert len(filter_frame(frame, day=None)) == 5
+
+
+# Test para comprobar el reporte por consola y en Excel
+def test_main(data_root, capsys):
+    excel = data_root / "reporte.xlsx"
+
+    main(["cines", "peliculas", "--root", str(data_root), "--excel", str(excel)])
+
+    output = capsys.readouterr().out
+    assert "CP Alcazar" in output
+    assert "5 funciones" in output
+    assert pandas.ExcelFile(excel).sheet_names == ["cines", "peliculas"]
+
+
+# Test para comprobar que sin nombres de reporte se muestran todos
+def test_main_defaults_to_all_reports(data_root, capsys):
+    excel = data_root / "reporte.xlsx"
+
+    main(["--root", str(data_root), "--excel", str(excel)])
+
+    assert pandas.ExcelFile(excel).sheet_names == list(REPORTS)
+
+
+# Test para comprobar que un reporte desconocido se rechaza
+def test_main_rejects_unknown_report(data_root):
+    with pytest.raises(SystemExit):
+        main(["butacas", "--root", str(data_root)])
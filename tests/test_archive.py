@@ -0,0 +1,73 @@
+from scrapers.archive import pack, read_archive, extract, folder_size
+import pytest, json, lzma
+
+MOVIE = {
+    "title": "Avatar",
+    "genre": "Ciencia ficción",
+    "running_time": "3h 12min",
+    "age_restriction": "+14",
+    "image_url": "https://example.com/avatar.jpg",
+}
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    root = tmp_path / "data"
+    for cinema in ("cp_alcazar", "cp_primavera", "cp_norte"):
+        for day in ("hoy", "manana"):
+            folder = root / "lima" / "cineplanet" / cinema / day
+            folder.mkdir(parents=True)
+            movie_data = {
+                **MOVIE,
+                "city": "Lima",
+                "day": day,
+                "showtimes": {
+                    cinema: [
+                        {
+                            "dimension": "2D",
+                            "format": "Regular",
+                            "language": "Doblada",
+                            "showtimes": [["19:00", f"https://example.com/{cinema}"]],
+                        }
+                    ]
+                },
+            }
+            with (folder / "avatar.json").open("w", encoding="utf-8") as f:
+                json.dump(movie_data, f, ensure_ascii=False, indent=4)
+    (root / ".cache").mkdir()
+    (root / ".cache" / "catalogue.json").write_text("{}")
+    (root / "posters").mkdir()
+    (root / "posters" / "index.json").write_text('{"u": {"file": "a.jpg"}}')
+    (root / "lima" / "cineplanet" / "cp_norte" / "hoy" / "lista.json").write_text("[]")
+    return root
+
+
+# Test para comprobar que los datos de la película se guardan una sola vez
+def test_pack_stores_metadata_once(data_root, tmp_path):
+    output, files = pack(data_root, tmp_path / "archive.jsonl.xz")
+
+    with lzma.open(output, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+
+    assert files == 6
+    assert [record["type"] for record in records].count("movie") == 1
+    assert all("genre" not in record.get("data", {}) for record in records)
+    assert output.stat().st_size < folder_size(data_root)
+
+
+# Test para comprobar que el lector devuelve los mismos JSON que se archivaron
+def test_read_and_extract_round_trip(data_root, tmp_path):
+    output, _ = pack(data_root, tmp_path / "archive.jsonl.xz")
+
+    records = dict(read_archive(output))
+    assert len(records) == 6
+    original = json.loads(
+        (data_root / "lima/cineplanet/cp_norte/hoy/avatar.json").read_text(encoding="utf-8")
+    )
+    assert records["lima/cineplanet/cp_norte/hoy/avatar.json"] == original
+
+    restored = tmp_path / "restored"
+    assert extract(output, restored) == 6
+    assert json.loads(
+        (restored / "lima/cineplanet/cp_norte/hoy/avatar.json").read_text(encoding="utf-8")
+    ) == original
@@ -0,0 +1,120 @@
+from unittest.mock import MagicMock
+from scrapers.async_writer import AsyncWriter, WriterError
+from scrapers.entity_resolver import MovieResolver
+from tests.helpers import DummyScraper
+import pytest, asyncio, threading, time
+
+
+# Test para comprobar que las escrituras de un mismo archivo se hacen en orden
+@pytest.mark.asyncio
+async def test_same_key_keeps_order():
+    writer = AsyncWriter(lanes=4)
+    written = []
+
+    def write(value):
+        time.sleep(0.001)
+        written.append(value)
+
+    for i in range(20):
+        await writer.submit("data/a.json", write, i)
+    await writer.close()
+
+    assert written == list(range(20))
+
+
+# Test para comprobar que la escritura no ocurre en el hilo del bucle de eventos
+@pytest.mark.asyncio
+async def test_writes_run_off_the_event_loop():
+    writer = AsyncWriter()
+    threads = []
+    await writer.submit("a", lambda: threads.append(threading.get_ident()))
+    await writer.close()
+
+    assert threads and threads[0] != threading.get_ident()
+
+
+# Test para comprobar que la cola acotada frena al productor
+@pytest.mark.asyncio
+async def test_submit_waits_when_lane_is_full():
+    writer = AsyncWriter(lanes=1, max_backlog=1)
+    release = threading.Event()
+
+    await writer.submit("a", release.wait)
+    # Espera a que el consumidor tome la primera escritura
+    await asyncio.sleep(0.05)
+    await writer.submit("a", lambda: None)
+    blocked = asyncio.create_task(writer.submit("a", lambda: None))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    await writer.close()
+
+
+# Test para comprobar que los errores se reportan al cerrar y no se llama on_done
+@pytest.mark.asyncio
+async def test_close_raises_write_errors():
+    writer = AsyncWriter()
+    on_done = MagicMock()
+
+    def fail():
+        raise OSError("disco lleno")
+
+    await writer.submit("a", fail, on_done=on_done)
+    await writer.submit("b", lambda: None, on_done=on_done)
+
+    with pytest.raises(WriterError, match="disco lleno"):
+        await writer.close()
+    assert on_done.call_count == 1
+
+
+# Test para comprobar que save_movie pasa por el escritor y confirma al terminar
+@pytest.mark.asyncio
+async def test_save_movie_uses_writer(tmp_path):
+    scraper = DummyScraper(resolver=MovieResolver(tmp_path / "movies.json"))
+    on_saved = MagicMock()
+    movie_data = {"title": "Avatar"}
+
+    async with scraper.writing():
+        await scraper.save_movie(scraper.save_json, tmp_path, movie_data, on_saved)
+        await scraper.flush_writer()
+        on_saved.assert_called_once()
+
+    assert scraper.writer is None
+    assert (tmp_path / "avatar.json").exists()
+
+
+# Test para comprobar que un on_done que falla no deja el carril sin consumidor
+@pytest.mark.asyncio
+async def test_failing_on_done_keeps_lane_alive():
+    writer = AsyncWriter(lanes=1)
+    written = []
+
+    def broken_on_done():
+        raise KeyError("bitácora")
+
+    await writer.submit("a", written.append, 1, on_done=broken_on_done)
+    await writer.submit("a", written.append, 2)
+    await asyncio.wait_for(writer.flush(), 1)
+
+    assert written == [1, 2]
+    with pytest.raises(WriterError, match="bitácora"):
+        await asyncio.wait_for(writer.close(), 1)
+
+
+# Test para comprobar que el error de la recopilación no queda tapado por el de escritura
+@pytest.mark.asyncio
+async def test_writing_keeps_original_error(tmp_path, capsys):
+    scraper = DummyScraper(resolver=MovieResolver(tmp_path / "movies.json"))
+
+    def fail(output_folder, movie_data):
+        raise OSError("disco lleno")
+
+    with pytest.raises(RuntimeError, match="página caída"):
+        async with scraper.writing():
+            await scraper.save_movie(fail, tmp_path, {"title": "Avatar"})
+            raise RuntimeError("página caída")
+
+    assert "disco lleno" in capsys.readouterr().out
+    assert scraper.writer is None
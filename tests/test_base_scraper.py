@@ -1,15 +1,12 @@
-from scrapers.base_scraper import BaseScraper
 from unittest.mock import MagicMock, AsyncMock, patch
 from scrapers.base_scraper import console
-from playwright.async_api import Locator
+from scrapers.catalogue_cache import CatalogueCache
+from scrapers.browser_profile import BrowserProfile
+from playwright.async_api import BrowserContext, Locator
+from tests.helpers import DummyScraper
 import pytest, asyncio
 
 
-class DummyScraper(BaseScraper):
-    def scrape(self):
-        pass
-
-
 @pytest.fixture
 def scraper():
     return DummyScraper()
@@ -322,18 +319,23 @@ async def test_select_filter(scraper):
     selected_item_mock = AsyncMock()
 
     items_mock.nth = MagicMock(return_value=selected_item_mock)
+    items_mock.all_inner_texts = AsyncMock(return_value=["otro", " test "])
     selected_item_mock.inner_text = AsyncMock(return_value="  test ")
     selected_item_mock.click = AsyncMock()
     page_mock.wait_for_function = AsyncMock()
 
-    with patch.object(scraper, "print_locators") as mock_print, patch.object(
+    with patch.object(
+        scraper, "print_locators", AsyncMock(return_value=["test"])
+    ) as mock_print, patch.object(
         scraper, "ask_user_for_input", AsyncMock(return_value=1)
     ) as mock_ask:
         result = await scraper.select_filter(items_mock, page_mock, filter_mock)
 
         # Verifica llamadas
         mock_print.assert_called_once_with(items_mock)
-        mock_ask.assert_called_once_with(items_mock, filter_mock)
+        mock_ask.assert_called_once_with(["test"], filter_mock)
+        # Se hace clic en la posición que la opción tiene en la página
+        items_mock.nth.assert_called_once_with(1)
         selected_item_mock.inner_text.assert_awaited_once()
         selected_item_mock.click.assert_awaited_once()
         page_mock.wait_for_function.assert_awaited_once()
@@ -342,20 +344,39 @@ async def test_select_filter(scraper):
         assert result == ("test", True)
 
 
+# Test para comprobar que un catálogo desactualizado se descarta y se vuelve a preguntar
+@pytest.mark.asyncio
+async def test_select_filter_with_stale_catalogue(tmp_path):
+    catalogue = CatalogueCache(tmp_path / "catalogue.json")
+    catalogue.put(("dummy", "Lima"), ["CP Cerrado", "CP Alcazar"])
+    scraper = DummyScraper(catalogue)
+    scraper.chain = "dummy"
+    scraper.selected_filters = ["Lima"]
+    items_mock = MagicMock()
+    page_mock = MagicMock()
+    selected_item_mock = AsyncMock()
+    items_mock.all_inner_texts = AsyncMock(return_value=["CP Alcazar", "CP Norte"])
+    items_mock.nth = MagicMock(return_value=selected_item_mock)
+    selected_item_mock.inner_text = AsyncMock(return_value="CP Norte")
+    page_mock.wait_for_function = AsyncMock()
+
+    with patch.object(scraper, "print_list_of_items") as mock_print, patch.object(
+        scraper, "ask_user_for_input", AsyncMock(side_effect=[1, 2])
+    ):
+        result = await scraper.select_filter(items_mock, page_mock, "cine")
+
+    assert mock_print.call_args_list[1].args[0] == ["CP Alcazar", "CP Norte"]
+    items_mock.nth.assert_called_once_with(1)
+    assert catalogue.peek(("dummy", "Lima")) == ["CP Alcazar", "CP Norte"]
+    assert result == ("CP Norte", True)
+
+
 # Test para comprobar la transformación de ElementHandle a str
 @pytest.mark.asyncio
 async def test_print_locators(scraper):
     # Creando mocks
     mock_items = MagicMock()
-    mock_items.count = AsyncMock(return_value=2)
-
-    mock_item_0 = AsyncMock()
-    mock_item_0.inner_text = AsyncMock(return_value=" Hola ")
-
-    mock_item_1 = AsyncMock()
-    mock_item_1.inner_text = AsyncMock(return_value=" Chau   ")
-
-    mock_items.nth = MagicMock(side_effect=[mock_item_0, mock_item_1])
+    mock_items.all_inner_texts = AsyncMock(return_value=[" Hola ", " Chau   "])
 
     # Testeando
     with patch.object(scraper, "print_list_of_items") as mock_print:
@@ -363,12 +384,26 @@ async def test_print_locators(scraper):
 
         # Haciendo comprobaciones
         mock_print.assert_called_once_with(["Hola", "Chau"])
-        mock_items.count.assert_awaited()
-        mock_items.nth.assert_any_call(0)
-        mock_items.nth.assert_any_call(1)
-        assert mock_items.nth.call_count == 2
-        mock_item_0.inner_text.assert_awaited_once()
-        mock_item_1.inner_text.assert_awaited_once()
+        mock_items.all_inner_texts.assert_awaited_once()
+        mock_items.nth.assert_not_called()
+
+
+# Test para comprobar que el catálogo en caché evita leer el DOM
+@pytest.mark.asyncio
+async def test_print_locators_from_catalogue(tmp_path):
+    catalogue = CatalogueCache(tmp_path / "catalogue.json")
+    catalogue.put(("dummy", "Lima"), ["CP Alcazar", "CP Primavera"])
+    scraper = DummyScraper(catalogue)
+    scraper.chain = "dummy"
+    scraper.selected_filters = ["Lima"]
+    mock_items = MagicMock()
+    mock_items.all_inner_texts = AsyncMock()
+
+    with patch.object(scraper, "print_list_of_items") as mock_print:
+        await scraper.print_locators(mock_items)
+
+        mock_print.assert_called_once_with(["CP Alcazar", "CP Primavera"])
+        mock_items.all_inner_texts.assert_not_awaited()
 
 
 # Tests para comprobar que se captura correctamente el input del usuario
@@ -410,3 +445,153 @@ async def test_ask_user_for_input_fail_then_success(scraper, monkeypatch):
     result = await scraper.ask_user_for_input(items_mock, "test")
 
     assert result == 2
+
+
+# Test para comprobar que con perfil persistente se lanza un contexto persistente
+@pytest.mark.asyncio
+async def test_setup_browser_with_persistent_profile(tmp_path):
+    profile = BrowserProfile("dummy", root=tmp_path)
+    scraper = DummyScraper(profile=profile)
+    p_mock = MagicMock()
+    context_mock = MagicMock()
+    p_mock.chromium.launch_persistent_context = AsyncMock(return_value=context_mock)
+
+    result = await scraper.setup_browser(p_mock)
+
+    p_mock.chromium.launch_persistent_context.assert_awaited_once_with(
+        profile.user_data_dir, headless=False
+    )
+    assert result is context_mock
+
+
+# Test para comprobar que se reutiliza el storage_state guardado
+@pytest.mark.asyncio
+async def test_storage_state_profile_round_trip(tmp_path):
+    profile = BrowserProfile("dummy", root=tmp_path, persistent=False)
+    scraper = DummyScraper(profile=profile)
+    page_mock = MagicMock()
+    page_mock.context.storage_state = AsyncMock()
+
+    assert scraper.page_options() == {}
+    await scraper.save_profile(page_mock)
+    page_mock.context.storage_state.assert_awaited_once_with(path=profile.state_path)
+
+    profile.state_path.write_text("{}")
+    assert scraper.page_options() == {"storage_state": profile.state_path}
+
+    profile.reset()
+    assert not profile.folder.exists()
+    assert scraper.page_options() == {}
+
+
+# Test para comprobar que el contexto reciclado lleva las cookies y su página se abre sin opciones
+@pytest.mark.asyncio
+async def test_recycled_context_keeps_storage_state(tmp_path):
+    profile = BrowserProfile("dummy", root=tmp_path, persistent=False)
+    profile.folder.mkdir(parents=True)
+    profile.state_path.write_text("{}")
+    scraper = DummyScraper(profile=profile)
+    browser_mock = MagicMock()
+    context_mock = MagicMock(spec=BrowserContext)
+    page_mock = MagicMock()
+    browser_mock.new_context = AsyncMock(return_value=context_mock)
+    context_mock.new_page = AsyncMock(return_value=page_mock)
+    page_mock.goto = AsyncMock()
+    page_mock.locator.return_value.wait_for = AsyncMock()
+
+    context = await scraper.new_context(browser_mock)
+    page = await scraper.load_page(context, "https://example.com", "body")
+
+    browser_mock.new_context.assert_awaited_once_with(storage_state=profile.state_path)
+    context_mock.new_page.assert_awaited_once_with()
+    assert page is page_mock
+
+
+# Test para comprobar que se aceptan varios formatos a la vez
+@pytest.mark.asyncio
+async def test_ask_user_for_choices(scraper, monkeypatch):
+    inputs = iter(["1,9", "3, 1 3"])
+    monkeypatch.setattr("builtins.input", lambda *args, **kwargs: next(inputs))
+
+    result = await scraper.ask_user_for_choices(["JSON", "Excel", "CSV"], "formato")
+
+    assert result == [3, 1]
+
+
+# Test para comprobar que con un anfitrión activo se usa un contexto nuevo por CDP
+@pytest.mark.asyncio
+async def test_setup_browser_attaches_over_cdp():
+    scraper = DummyScraper(cdp_endpoint="http://127.0.0.1:9222")
+    p_mock = MagicMock()
+    host_mock = MagicMock()
+    context_mock = MagicMock()
+    p_mock.chromium.connect_over_cdp = AsyncMock(return_value=host_mock)
+    p_mock.chromium.launch = AsyncMock()
+    host_mock.new_context = AsyncMock(return_value=context_mock)
+
+    result = await scraper.setup_browser(p_mock)
+
+    assert result is context_mock
+    p_mock.chromium.launch.assert_not_awaited()
+    assert scraper.page_options() == {}
+
+
+# Test para comprobar que si el anfitrión no responde se lanza Chromium localmente
+@pytest.mark.asyncio
+async def test_setup_browser_falls_back_to_launch():
+    scraper = DummyScraper(cdp_endpoint="http://127.0.0.1:9222")
+    p_mock = MagicMock()
+    browser_mock = MagicMock()
+    p_mock.chromium.connect_over_cdp = AsyncMock(side_effect=Exception("rechazada"))
+    p_mock.chromium.launch = AsyncMock(return_value=browser_mock)
+
+    result = await scraper.setup_browser(p_mock)
+
+    assert result is browser_mock
+    assert not scraper.attached
+
+
+# Test para comprobar que el recorrido llena todos los niveles y no relee lo vigente
+@pytest.mark.asyncio
+async def test_crawl_catalogue(tmp_path):
+    catalogue = CatalogueCache(tmp_path / "catalogue.json")
+    catalogue.put(("dummy", "Lima", "CP Alcazar"), ["Hoy"])
+    scraper = DummyScraper(catalogue)
+    scraper.chain = "dummy"
+    tree = {
+        (): ["Lima", "Cusco"],
+        ("Lima",): ["CP Alcazar", "CP Norte"],
+        ("Cusco",): ["CP Cusco"],
+        ("Lima", "CP Norte"): ["Hoy", "Mañana"],
+        ("Cusco", "CP Cusco"): ["Hoy"],
+    }
+    scraper.read_catalogue_level = AsyncMock(side_effect=lambda browser, parents: tree[parents])
+
+    read = await scraper.crawl_catalogue(MagicMock())
+
+    assert read == 5
+    assert list(catalogue.combinations("dummy")) == [
+        ("Lima", "CP Alcazar", "Hoy"),
+        ("Lima", "CP Norte", "Hoy"),
+        ("Lima", "CP Norte", "Mañana"),
+        ("Cusco", "CP Cusco", "Hoy"),
+    ]
+
+
+# Test para comprobar que un nivel que no se pudo leer no detiene el recorrido
+@pytest.mark.asyncio
+async def test_crawl_catalogue_skips_failed_level(tmp_path):
+    catalogue = CatalogueCache(tmp_path / "catalogue.json")
+    scraper = DummyScraper(catalogue)
+    scraper.chain = "dummy"
+
+    async def read_level(browser, parents):
+        if parents == ("Lima",):
+            raise LookupError("No se encontró la opción 'Lima'")
+        return {(): ["Lima", "Cusco"], ("Cusco",): ["CP Cusco"]}.get(parents, ["Hoy"])
+
+    scraper.read_catalogue_level = read_level
+
+    await scraper.crawl_catalogue(MagicMock())
+
+    assert list(catalogue.combinations("dummy")) == [("Cusco", "CP Cusco", "Hoy")]
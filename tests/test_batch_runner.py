@@ -0,0 +1,168 @@
+from pathlib import Path
+from scrapers.batch_runner import (
+    deferred_first,
+    merge_results,
+    plan_targets,
+    refresh_catalogue,
+    run_batch,
+    shard_targets,
+)
+from scrapers.catalogue_cache import CatalogueCache
+from scrapers.entity_resolver import MovieResolver
+from scrapers.models import Target
+from scrapers.run_journal import RunJournal
+from slugify import slugify
+from unittest.mock import MagicMock, AsyncMock, patch
+import pytest, json, os
+
+
+def fake_worker(targets, pages, run_id, journal_path, deadline=None, formats=None):
+    # Reemplaza a Playwright: cada proceso devuelve lo que le tocó
+    return [
+        {"target": target.to_dict(), "status": "done", "pid": os.getpid()}
+        for target in targets
+    ]
+
+
+VARIANTS = ("Avatar: El camino del agua", "Avatar El Caminho del Agua")
+
+
+def variant_worker(targets, pages, run_id, journal_path, deadline=None, formats=None):
+    # Cada proceso asigna ids con su propio registro vacío, como en un lote real
+    results = []
+    for i, target in enumerate(targets):
+        title = VARIANTS[int(target.cinema.split()[-1]) % 2]
+        folder = Path("data") / target.cinema / str(i)
+        folder.mkdir(parents=True)
+        movie_data = {"title": title}
+        MovieResolver(Path(f"registry-{os.getpid()}.json")).assign(movie_data)
+        (folder / f"{slugify(title)}.json").write_text(json.dumps(movie_data), encoding="utf-8")
+        results.append(
+            {
+                "target": target.to_dict(),
+                "status": "done",
+                "output_folder": folder.as_posix(),
+                "movies": [title],
+            }
+        )
+    return results
+
+
+@pytest.fixture
+def targets():
+    return [
+        Target("cineplanet", "Lima", f"CP {i}", day)
+        for i in range(5)
+        for day in ("Hoy", "Mañana")
+    ]
+
+
+# Test para comprobar que las combinaciones se planifican desde el catálogo
+def test_plan_targets(tmp_path):
+    catalogue = CatalogueCache(tmp_path / "catalogue.json")
+    catalogue.put(("cinepolis",), ["Lima, Perú", "Cusco, Perú"])
+    catalogue.put(("cinepolis", "Lima, Perú"), ["Cinépolis Plaza Norte"])
+    catalogue.put(("cinepolis", "Lima, Perú", "Cinépolis Plaza Norte"), ["Hoy"])
+    catalogue.put(("cinepolis", "Cusco, Perú"), ["Cinépolis Cusco"])
+    catalogue.put(("cinepolis", "Cusco, Perú", "Cinépolis Cusco"), ["Hoy"])
+
+    result = plan_targets(catalogue, ["cinepolis"], city="lima")
+
+    assert result == [Target("cinepolis", "Lima, Perú", "Cinépolis Plaza Norte", "Hoy")]
+
+
+# Test para comprobar que cada combinación va a un solo proceso
+def test_shard_targets_without_duplicates(targets):
+    shards = shard_targets(targets + targets[:3], 3)
+
+    flat = [target for shard in shards for target in shard]
+    assert len(shards) == 3
+    assert sorted(flat, key=lambda t: t.key) == sorted(targets, key=lambda t: t.key)
+
+
+# Test para comprobar que al retomar van primero las combinaciones aplazadas que siguen en el catálogo
+def test_deferred_first(targets):
+    gone = Target("cineplanet", "Lima", "CP Cerrado", "Hoy")
+
+    ordered = deferred_first(targets, [targets[3], gone, targets[1]])
+
+    assert ordered[:2] == [targets[1], targets[3]]
+    assert sorted(ordered, key=lambda t: t.key) == sorted(targets, key=lambda t: t.key)
+
+
+# Test para comprobar que al unir resultados prevalece el correcto
+def test_merge_results_prefers_done(targets):
+    target = targets[0].to_dict()
+
+    merged = merge_results(
+        [[{"target": target, "status": "failed"}], [{"target": target, "status": "done"}]]
+    )
+
+    assert merged == [{"target": target, "status": "done"}]
+
+
+# Test para comprobar el reparto real entre procesos y la unión de resultados
+def test_run_batch_uses_processes(tmp_path, monkeypatch, targets):
+    monkeypatch.chdir(tmp_path)
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.finish_target(targets[0])
+
+    results = run_batch(targets, workers=2, journal=journal, worker=fake_worker)
+
+    keys = [Target.from_dict(result["target"]).key for result in results]
+    assert sorted(keys) == sorted(target.key for target in targets[1:])
+    assert all(result["pid"] != os.getpid() for result in results)
+    assert (tmp_path / "data" / ".runs" / f"batch-{journal.run_id}.json").exists()
+    journal.close()
+
+
+# Test para comprobar que el proceso padre unifica los ids de variantes vistas en procesos distintos
+def test_run_batch_reconciles_movie_ids(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    targets = [Target("cineplanet", "Lima", f"CP {i}", "Hoy") for i in range(2)]
+
+    results = run_batch(targets, workers=2, worker=variant_worker)
+
+    ids = set()
+    for result in results:
+        folder = Path(result["output_folder"])
+        movie_data = json.loads((folder / f"{slugify(result['movies'][0])}.json").read_text())
+        ids.add(movie_data["movie_id"])
+    assert len(ids) == 1
+    registry = json.loads((tmp_path / "data" / ".cache" / "movies.json").read_text())
+    assert set(registry["movies"]) == ids
+
+
+# Test para comprobar que antes de planificar se recorre el catálogo de cada cadena
+@pytest.mark.asyncio
+async def test_refresh_catalogue_fills_plan(tmp_path):
+    catalogue = CatalogueCache(tmp_path / "catalogue.json")
+    browser = MagicMock()
+    browser.close = AsyncMock()
+
+    class CrawlingScraper:
+        def __init__(self, catalogue):
+            self.catalogue = catalogue
+
+        async def setup_browser(self, p):
+            return browser
+
+        async def crawl_catalogue(self, browser):
+            self.catalogue.put(("cinepolis",), ["Lima, Perú"])
+            self.catalogue.put(("cinepolis", "Lima, Perú"), ["Cinépolis Plaza Norte"])
+            self.catalogue.put(("cinepolis", "Lima, Perú", "Cinépolis Plaza Norte"), ["Hoy"])
+            return 3
+
+    playwright = MagicMock()
+    playwright.__aenter__ = AsyncMock(return_value=MagicMock())
+    playwright.__aexit__ = AsyncMock(return_value=False)
+    with patch("scrapers.batch_runner.async_playwright", return_value=playwright), patch.dict(
+        "scrapers.batch_runner.CHAINS", {"cinepolis": CrawlingScraper}
+    ):
+        read = await refresh_catalogue(catalogue, ["cinepolis"])
+
+    assert read == 3
+    browser.close.assert_awaited_once()
+    assert plan_targets(catalogue, ["cinepolis"]) == [
+        Target("cinepolis", "Lima, Perú", "Cinépolis Plaza Norte", "Hoy")
+    ]
@@ -0,0 +1,22 @@
+from scrapers.browser_host import read_endpoint, write_endpoint
+import json, subprocess, sys
+
+
+# Test para comprobar que se lee la dirección del anfitrión activo
+def test_read_endpoint(tmp_path):
+    path = tmp_path / "endpoint.json"
+    assert read_endpoint(path) is None
+
+    write_endpoint("http://127.0.0.1:9222", path)
+
+    assert read_endpoint(path) == "http://127.0.0.1:9222"
+
+
+# Test para comprobar que se ignora el archivo de un anfitrión que ya no existe
+def test_read_endpoint_with_dead_host(tmp_path):
+    path = tmp_path / "endpoint.json"
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    path.write_text(json.dumps({"cdp": "http://127.0.0.1:9222", "pid": finished.pid}))
+
+    assert read_endpoint(path) is None
@@ -0,0 +1,101 @@
+from scrapers.catalogue_cache import CatalogueCache
+from unittest.mock import AsyncMock
+from tests.helpers import FakeClock
+import pytest, asyncio
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def catalogue(tmp_path, clock):
+    return CatalogueCache(tmp_path / "catalogue.json", clock=clock)
+
+
+# Test para comprobar que la caché se guarda en disco y se vuelve a leer
+def test_put_persists_entries(tmp_path, catalogue, clock):
+    catalogue.put(("cineplanet",), ["Lima", "Arequipa"])
+
+    reloaded = CatalogueCache(tmp_path / "catalogue.json", clock=clock)
+
+    assert reloaded.get(("cineplanet",)) == ["Lima", "Arequipa"]
+
+
+# Test para comprobar que sin datos se espera la lectura del DOM
+@pytest.mark.asyncio
+async def test_get_or_refresh_missing_awaits_loader(catalogue):
+    loader = AsyncMock(return_value=["Lima"])
+
+    result = await catalogue.get_or_refresh(("cinepolis",), loader)
+
+    assert result == ["Lima"]
+    loader.assert_awaited_once()
+    assert catalogue.is_fresh(("cinepolis",))
+
+
+# Test para comprobar que una entrada vigente no vuelve a leer el DOM
+@pytest.mark.asyncio
+async def test_get_or_refresh_fresh_skips_loader(catalogue):
+    catalogue.put(("cinepolis",), ["Lima"])
+    loader = AsyncMock(return_value=["Cusco"])
+
+    result = await catalogue.get_or_refresh(("cinepolis",), loader)
+
+    assert result == ["Lima"]
+    loader.assert_not_awaited()
+
+
+# Test para comprobar que una entrada caducada se sirve y se refresca en segundo plano
+@pytest.mark.asyncio
+async def test_get_or_refresh_stale_refreshes_in_background(catalogue, clock):
+    path = ("cinepolis", "Lima", "Cinépolis Plaza Norte")
+    catalogue.put(path, ["Hoy"])
+    clock.now += catalogue.ttls[3] + 1
+    loader = AsyncMock(return_value=["Hoy", "Mañana"])
+
+    result = await catalogue.get_or_refresh(path, loader)
+    assert result == ["Hoy"]
+
+    await catalogue.drain()
+    loader.assert_awaited_once()
+    assert catalogue.get(path) == ["Hoy", "Mañana"]
+
+
+# Test para comprobar que invalidar borra también los niveles inferiores
+def test_invalidate_removes_children(catalogue):
+    catalogue.put(("cineplanet", "Lima"), ["CP Alcazar"])
+    catalogue.put(("cineplanet", "Lima", "CP Alcazar"), ["Hoy"])
+    catalogue.put(("cineplanet", "Lima2"), ["CP Otro"])
+
+    catalogue.invalidate(("cineplanet", "Lima"))
+
+    assert catalogue.peek(("cineplanet", "Lima")) is None
+    assert catalogue.peek(("cineplanet", "Lima", "CP Alcazar")) is None
+    assert catalogue.peek(("cineplanet", "Lima2")) == ["CP Otro"]
+
+
+# Test para comprobar que se planifican todas las combinaciones guardadas
+def test_combinations(catalogue):
+    catalogue.put(("cineplanet",), ["Lima"])
+    catalogue.put(("cineplanet", "Lima"), ["CP Alcazar", "CP Primavera"])
+    catalogue.put(("cineplanet", "Lima", "CP Alcazar"), ["Hoy", "Mañana"])
+    catalogue.put(("cineplanet", "Lima", "CP Primavera"), ["Hoy"])
+
+    assert list(catalogue.combinations("cineplanet")) == [
+        ("Lima", "CP Alcazar", "Hoy"),
+        ("Lima", "CP Alcazar", "Mañana"),
+        ("Lima", "CP Primavera", "Hoy"),
+    ]
+
+
+# Test para comprobar que no se planifican fechas ni cines caducados
+def test_combinations_skip_expired(catalogue, clock):
+    catalogue.put(("cineplanet",), ["Lima"])
+    catalogue.put(("cineplanet", "Lima"), ["CP Alcazar", "CP Primavera"])
+    catalogue.put(("cineplanet", "Lima", "CP Primavera"), ["Hoy"])
+    clock.now += catalogue.ttls[3] + 1
+    catalogue.put(("cineplanet", "Lima", "CP Alcazar"), ["Mañana"])
+
+    assert list(catalogue.combinations("cineplanet")) == [("Lima", "CP Alcazar", "Mañana")]
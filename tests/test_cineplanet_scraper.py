@@ -1,4 +1,11 @@
 from scrapers.cineplanet_scraper import CineplanetScraper, console
+from scrapers.run_journal import RunJournal
+from scrapers.models import Target
+from scrapers.browser_profile import BrowserProfile
+from scrapers.sinks import SINKS, MultiSink
+from scrapers.deep_links import DeepLinkCache
+from scrapers.entity_resolver import MovieResolver
+from scrapers.deadline import DeadlineExceeded, RunDeadline
 from playwright.async_api import TimeoutError
 from unittest.mock import MagicMock, AsyncMock, patch
 from slugify import slugify
@@ -7,8 +14,8 @@ import pytest, json, pandas, asyncio
 
 
 @pytest.fixture
-def scraper():
-    return CineplanetScraper()
+def scraper(tmp_path):
+    return CineplanetScraper(resolver=MovieResolver(tmp_path / "movies.json"))
 
 
 # Tests para comprobar que se aceptan las cookies
@@ -164,74 +171,140 @@ async def test_scrape(scraper):
         browser_mock.close.assert_awaited_once()
 
 
-# Test para comprobar que las películas se procesan
+# Test para comprobar que se recopilan las películas abriendo su enlace directo
 @pytest.mark.asyncio
 async def test_process_movies(scraper):
     # Creando mocks
     movies_mock = MagicMock()
-    movie_mock = MagicMock()
     page_mock = MagicMock()
     filters_mock = MagicMock()
+    details_mock = MagicMock()
     format_to_save_mock = MagicMock()
     filters_nth_mock = MagicMock()
 
     def locator_side_effect(selector):
         if selector == ".movies-chips--chip":
             return filters_mock
-        elif selector == ".movies-list--large-item":
-            return movies_mock
-
-    def extract_side_effect(*args, **kwargs):
-        movie_data = args[1]
-        movie_data["title"] = "title-test"
+        elif selector == ".movie-details--info":
+            return details_mock
+        return movies_mock
 
     # Mockenado funciones
-    movies_mock.count = AsyncMock(return_value=1)
-    movies_mock.nth = MagicMock(return_value=movie_mock)
+    movies_mock.evaluate_all = AsyncMock(
+        return_value=[
+            {
+                "title": " title-test ",
+                "extra": "Drama, 2h, +14",
+                "image": "https://example.com/a.jpg",
+                "href": "/pelicula/title-test",
+            }
+        ]
+    )
+    page_mock.url = "https://www.cineplanet.com.pe/peliculas"
     page_mock.locator = MagicMock(side_effect=locator_side_effect)
     filters_mock.count = AsyncMock(return_value=1)
     filters_mock.nth = MagicMock(return_value=filters_nth_mock)
     filters_nth_mock.inner_text = AsyncMock(return_value="  lima ")
+    details_mock.wait_for = AsyncMock()
+    page_mock.goto = AsyncMock()
     page_mock.go_back = AsyncMock()
-    page_mock.wait_for_selector = AsyncMock()
 
     # Testeando
-    with patch.object(
-        scraper, "extract_general_information", side_effect=extract_side_effect
-    ) as extract_mock, patch.object(console, "print") as print_mock, patch.object(
+    with patch.object(console, "print") as print_mock, patch.object(
         scraper, "enter_movie_details_page"
     ) as enter_movie_mock, patch.object(
+        scraper, "load_all_movies"
+    ) as load_all_mock, patch.object(
         scraper, "scrape_showtimes_data"
     ):
         await scraper.process_movies(
             page_mock, movies_mock, "test", format_to_save_mock
         )
 
-        page_mock.wait_for_selector.assert_awaited_with(".movies-list--large-item")
-        assert page_mock.locator.call_count >= 2
-        movies_mock.count.assert_awaited_once()
-        assert print_mock.call_count >= 2
+        movies_mock.evaluate_all.assert_awaited_once()
         print_mock.assert_any_call(
             "\n[cyan]▶️ Recopilando horarios de proyección de [bold]title-test[/bold][/cyan]"
         )
         format_to_save_mock.assert_called_with(
-            "test", {"title": "title-test", "city": "lima"}
+            "test",
+            {
+                "title": "title-test",
+                "genre": "Drama",
+                "running_time": "2h",
+                "age_restriction": "+14",
+                "image_url": "https://example.com/a.jpg",
+                "city": "lima",
+                "movie_id": "title-test",
+            },
         )
-        page_mock.go_back.assert_awaited_once()
-        scraper.enter_movie_details_page.assert_awaited_once_with(
-            movie_mock,
-            page_mock,
-            ".movie-info-details--first-button-wrapper",
-            ".movie-details--info",
+        page_mock.goto.assert_awaited_once_with(
+            "https://www.cineplanet.com.pe/pelicula/title-test"
         )
+        # Ni se regresa ni se vuelve a expandir la cartelera
+        page_mock.go_back.assert_not_awaited()
+        load_all_mock.assert_not_called()
+        enter_movie_mock.assert_not_called()
         scraper.scrape_showtimes_data.assert_awaited_once()
-        page_mock.locator.assert_any_call(".movies-list--large-item")
+
+
+# Test para comprobar que sin enlaces se usa el recorrido con clics
+@pytest.mark.asyncio
+async def test_process_movies_without_links_clicks_and_goes_back(scraper):
+    movies_mock = MagicMock()
+    movie_mock = MagicMock()
+    page_mock = MagicMock()
+    filters_mock = MagicMock()
+    format_to_save_mock = MagicMock()
+
+    def locator_side_effect(selector):
+        if selector == ".movies-chips--chip":
+            return filters_mock
+        return movies_mock
+
+    movies_mock.evaluate_all = AsyncMock(
+        return_value=[
+            {"title": "A", "extra": "", "image": None, "href": None},
+            {"title": "B", "extra": "", "image": None, "href": "/pelicula/b"},
+        ]
+    )
+    movies_mock.nth = MagicMock(return_value=movie_mock)
+    page_mock.url = "https://www.cineplanet.com.pe/peliculas"
+    page_mock.locator = MagicMock(side_effect=locator_side_effect)
+    filters_mock.count = AsyncMock(return_value=0)
+    page_mock.goto = AsyncMock()
+    page_mock.go_back = AsyncMock()
+    page_mock.wait_for_selector = AsyncMock()
+
+    with patch.object(console, "print"), patch.object(
+        scraper, "enter_movie_details_page"
+    ) as enter_movie_mock, patch.object(
+        scraper, "load_all_movies"
+    ) as load_all_mock, patch.object(
+        scraper, "scrape_showtimes_data"
+    ):
+        await scraper.process_movies(
+            page_mock, movies_mock, "test", format_to_save_mock
+        )
+
+    page_mock.goto.assert_not_awaited()
+    assert enter_movie_mock.await_count == 2
+    enter_movie_mock.assert_any_await(
+        movie_mock,
+        page_mock,
+        ".movie-info-details--first-button-wrapper",
+        ".movie-details--info",
+    )
+    assert page_mock.go_back.await_count == 2
+    page_mock.wait_for_selector.assert_awaited_with(".movies-list--large-item")
+    assert load_all_mock.await_count == 2
+    assert format_to_save_mock.call_count == 2
 
 
 # Test para comprobar que el scrapping está bien preparado
 @pytest.mark.asyncio
 async def test_prepare_scrapping(scraper):
     page_mock = MagicMock()
+    page_mock.url = scraper.url
     movies_mock = MagicMock()
     browser_mock = MagicMock()
     page_mock.locator = MagicMock(return_value=movies_mock)
@@ -492,6 +565,34 @@ async def test_click_extract_then_go_back(scraper):
     page_mock.go_back.assert_awaited_once()
 
 
+# Test para comprobar que la ida a la compra y la vuelta pasan por el limitador
+@pytest.mark.asyncio
+async def test_click_extract_then_go_back_uses_rate_limiter(scraper):
+    page_mock = MagicMock()
+    clickable_element_mock = MagicMock()
+    clickable_element_mock.click = AsyncMock()
+    page_mock.locator.return_value.is_visible = AsyncMock(return_value=False)
+    page_mock.locator.return_value.wait_for = AsyncMock()
+    page_mock.wait_for_url = AsyncMock()
+    page_mock.go_back = AsyncMock(return_value=MagicMock(status=429, headers={}))
+    page_mock.url = "https://www.cineplanet.com.pe/compra/1/asientos"
+    requested = []
+    request = scraper.rate_limiter.request
+
+    def spy(url):
+        requested.append(url)
+        return request(url)
+
+    with patch.object(scraper.rate_limiter, "request", side_effect=spy):
+        await scraper._click_extract_then_go_back(
+            page_mock, clickable_element_mock, "**/asientos", "nuevo", "vuelta"
+        )
+
+    assert requested == [scraper.url, scraper.url]
+    # La respuesta 429 al volver pausa las siguientes peticiones al sitio
+    assert scraper.rate_limiter.for_url(scraper.url).paused_until > 0
+
+
 # Test para comprobar que cargan todas las películas
 @pytest.mark.asyncio
 async def test_load_all_movies(scraper):
@@ -532,21 +633,17 @@ async def test_load_all_movies_no_button(scraper):
     button_mock.click.assert_not_called()
 
 
-# Test para comprobar la elección del usuario al escoger el formato
+# Test para comprobar la elección del usuario al escoger los formatos
 @pytest.mark.asyncio
 async def test_ask_format_to_save(scraper):
 
-    with patch.object(
-        scraper, "save_json", MagicMock()
-    ) as mock_save_json, patch.object(
-        scraper, "save_excel", MagicMock()
-    ) as mock_save_excel, patch.object(
-        scraper, "print_list_of_items"
-    ) as mock_print, patch.object(
-        scraper, "ask_user_for_input", AsyncMock(return_value=1)
+    with patch.object(scraper, "print_list_of_items") as mock_print, patch.object(
+        scraper, "ask_user_for_choices", AsyncMock(return_value=[1, 2])
     ):
         result = await scraper.ask_format_to_save()
-        assert result == mock_save_json
+        assert isinstance(result, MultiSink)
+        assert result.labels == ["JSON", "Excel"]
+        mock_print.assert_called_once_with(list(SINKS))
 
 
 # Test para comrpobar que se crea la carpeta
@@ -614,3 +711,337 @@ def test_save_excel(tmp_path, scraper):
     assert expected_file.exists()
     assert len(df) == 1
     assert df.loc[0, "Título"] == movie_data["title"]
+
+
+# Test para comprobar que solo se expanden los cines cerrados
+@pytest.mark.asyncio
+async def test_expand_all_cinemas(scraper):
+    page_mock = MagicMock()
+    cinema_elements_mock = MagicMock()
+    closed_cine_mock = MagicMock()
+    closed_cine_mock.click = AsyncMock()
+
+    page_mock.locator = MagicMock(return_value=cinema_elements_mock)
+    page_mock.wait_for_function = AsyncMock()
+    cinema_elements_mock.evaluate_all = AsyncMock(return_value=[True, False])
+    cinema_elements_mock.nth = MagicMock(return_value=closed_cine_mock)
+
+    await scraper.expand_all_cinemas(page_mock)
+
+    cinema_elements_mock.nth.assert_called_once_with(1)
+    closed_cine_mock.click.assert_awaited_once()
+    page_mock.wait_for_function.assert_awaited_once()
+
+
+# Test para comprobar que la página de detalle se extrae de una sola evaluación
+@pytest.mark.asyncio
+async def test_scrape_showtimes_data_expand_all():
+    scraper = CineplanetScraper(expand_all=True)
+    page_mock = MagicMock()
+    cinema_elements_mock = MagicMock()
+    movie_data = {}
+
+    page_mock.url = "https://www.cineplanet.com.pe/pelicula/test"
+    page_mock.locator = MagicMock(return_value=cinema_elements_mock)
+    cinema_elements_mock.evaluate_all = AsyncMock(
+        return_value=[
+            {
+                "name": "CP Alcazar",
+                "containers": [
+                    {
+                        "dimension": "2D",
+                        "theather": "Regular",
+                        "language": "Doblada",
+                        "sessions": [
+                            {"text": "7:30 pm", "disabled": False, "href": "/compra/1"},
+                            {"text": "8:00 pm", "disabled": True, "href": "/compra/2"},
+                            {"text": "9:00 pm", "disabled": False, "href": None},
+                        ],
+                    }
+                ],
+            }
+        ]
+    )
+
+    with patch.object(scraper, "expand_all_cinemas", AsyncMock()) as expand_mock, patch.object(
+        scraper,
+        "_capture_url_by_click",
+        AsyncMock(return_value=["9:00 pm", "https://www.cineplanet.com.pe/compra/3"]),
+    ) as click_mock:
+        await scraper.scrape_showtimes_data(page_mock, movie_data)
+
+    expand_mock.assert_awaited_once_with(page_mock)
+    click_mock.assert_awaited_once_with(page_mock, 0, 0, 2)
+    assert movie_data["showtimes"] == {
+        "CP Alcazar": [
+            {
+                "dimension": "2D",
+                "format": "Regular",
+                "language": "Doblada",
+                "showtimes": [
+                    ["7:30 pm", "https://www.cineplanet.com.pe/compra/1"],
+                    ["9:00 pm", "https://www.cineplanet.com.pe/compra/3"],
+                ],
+            }
+        ]
+    }
+
+
+# Test para comprobar que al retomar se saltan las películas ya guardadas
+@pytest.mark.asyncio
+async def test_process_movies_skips_journaled_movies(tmp_path):
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    scraper = CineplanetScraper(journal=journal)
+    target = Target("cineplanet", "lima", "", "")
+    journal.record_movie(target, 0, "title-test")
+
+    page_mock = MagicMock()
+    movies_mock = MagicMock()
+    filters_mock = MagicMock()
+    format_to_save_mock = MagicMock()
+    page_mock.locator = MagicMock(return_value=filters_mock)
+    filters_mock.count = AsyncMock(return_value=1)
+    filters_mock.nth.return_value.inner_text = AsyncMock(return_value=" lima ")
+    movies_mock.evaluate_all = AsyncMock(
+        return_value=[{"title": "title-test", "extra": "", "image": None, "href": "/x"}]
+    )
+    page_mock.url = "https://www.cineplanet.com.pe/peliculas"
+    page_mock.goto = AsyncMock()
+
+    with patch.object(scraper, "enter_movie_details_page") as enter_mock, patch.object(
+        console, "print"
+    ):
+        await scraper.process_movies(page_mock, movies_mock, "test", format_to_save_mock)
+
+    enter_mock.assert_not_called()
+    page_mock.goto.assert_not_awaited()
+    format_to_save_mock.assert_not_called()
+    assert journal.is_target_done(target)
+    journal.close()
+
+
+# Test para comprobar que con un perfil guardado no se espera el aviso de cookies
+@pytest.mark.asyncio
+async def test_accept_cookies_with_warm_profile(tmp_path):
+    profile = BrowserProfile("cineplanet", root=tmp_path, persistent=False)
+    profile.folder.mkdir(parents=True)
+    profile.state_path.write_text("{}")
+    scraper = CineplanetScraper(
+        profile=BrowserProfile("cineplanet", root=tmp_path, persistent=False)
+    )
+    page_mock = MagicMock()
+    button_mock = MagicMock()
+    page_mock.locator = MagicMock(return_value=button_mock)
+    button_mock.is_visible = AsyncMock(return_value=False)
+    button_mock.wait_for = AsyncMock()
+
+    await scraper.accept_cookies(page_mock)
+
+    button_mock.wait_for.assert_not_called()
+    button_mock.click.assert_not_called()
+    assert scraper.listing_ready_selector() == ".movies-filter--filter-category-accordion"
+
+
+# Test para comprobar que un enlace directo guardado evita aplicar los filtros
+@pytest.mark.asyncio
+async def test_open_filtered_listing_uses_deep_link(tmp_path):
+    deep_links = DeepLinkCache(tmp_path / "deep_links.json")
+    target = Target("cineplanet", "Lima", "CP Alcazar", "Hoy")
+    deep_links.put(target, "https://www.cineplanet.com.pe/peliculas?cine=alcazar")
+    scraper = CineplanetScraper(deep_links=deep_links)
+    page_mock = MagicMock()
+    page_mock.wait_for_function = AsyncMock()
+
+    with patch.object(
+        scraper, "load_page", AsyncMock(return_value=page_mock)
+    ) as load_page_mock, patch.object(scraper, "accept_cookies"), patch.object(
+        scraper, "apply_cineplanet_filters", AsyncMock()
+    ) as apply_mock:
+        page, filters = await scraper.open_filtered_listing(MagicMock(), target)
+
+    assert page is page_mock
+    assert filters == ["Lima", "CP Alcazar", "Hoy"]
+    assert load_page_mock.await_args.args[1].endswith("?cine=alcazar")
+    apply_mock.assert_not_awaited()
+
+
+# Test para comprobar que si el enlace ya no filtra se vuelve a los clics
+@pytest.mark.asyncio
+async def test_open_filtered_listing_falls_back_to_clicks(tmp_path):
+    deep_links = DeepLinkCache(tmp_path / "deep_links.json")
+    target = Target("cineplanet", "Lima", "CP Alcazar", "Hoy")
+    stale_url = "https://www.cineplanet.com.pe/peliculas?cine=viejo"
+    deep_links.put(target, stale_url)
+    scraper = CineplanetScraper(deep_links=deep_links)
+
+    stale_page = MagicMock()
+    stale_page.wait_for_function = AsyncMock(side_effect=TimeoutError("sin chips"))
+    stale_page.close = AsyncMock()
+    fresh_page = MagicMock()
+    fresh_page.url = stale_url
+
+    with patch.object(
+        scraper, "load_page", AsyncMock(side_effect=[stale_page, fresh_page])
+    ), patch.object(scraper, "accept_cookies"), patch.object(
+        scraper,
+        "apply_cineplanet_filters",
+        AsyncMock(return_value=["Lima", "CP Alcazar", "Hoy"]),
+    ) as apply_mock:
+        page, filters = await scraper.open_filtered_listing(MagicMock(), target)
+
+    assert page is fresh_page
+    apply_mock.assert_awaited_once()
+    stale_page.close.assert_awaited_once()
+    # El enlace que falló no se vuelve a guardar
+    assert deep_links.get(target) is None
+
+
+# Test para comprobar que la siguiente película carga mientras se recopila la actual
+@pytest.mark.asyncio
+async def test_process_movies_prefetches_next_details(tmp_path):
+    scraper = CineplanetScraper(prefetch=1, resolver=MovieResolver(tmp_path / "movies.json"))
+    page_mock = MagicMock()
+    movies_mock = MagicMock()
+    filters_mock = MagicMock()
+    format_to_save_mock = MagicMock()
+    events = []
+    detail_pages = []
+
+    def new_page():
+        details_page = MagicMock()
+        details_page.close = AsyncMock()
+
+        async def goto(href):
+            events.append(f"carga {href}")
+
+        details_page.goto = AsyncMock(side_effect=goto)
+        details_page.locator.return_value.wait_for = AsyncMock()
+        detail_pages.append(details_page)
+        return details_page
+
+    async def scrape_side_effect(page, movie_data):
+        await asyncio.sleep(0)
+        events.append(f"recopila {movie_data['title']}")
+
+    page_mock.url = "https://www.cineplanet.com.pe/peliculas"
+    page_mock.locator = MagicMock(
+        side_effect=lambda selector: filters_mock
+        if selector == ".movies-chips--chip"
+        else movies_mock
+    )
+    page_mock.context.new_page = AsyncMock(side_effect=new_page)
+    filters_mock.count = AsyncMock(return_value=0)
+    movies_mock.evaluate_all = AsyncMock(
+        return_value=[
+            {"title": title, "extra": "", "image": None, "href": f"/{title}"}
+            for title in ("a", "b", "c")
+        ]
+    )
+
+    with patch.object(console, "print"), patch.object(
+        scraper, "scrape_showtimes_data", side_effect=scrape_side_effect
+    ):
+        await scraper.process_movies(page_mock, movies_mock, "test", format_to_save_mock)
+
+    assert events.index("carga https://www.cineplanet.com.pe/b") < events.index(
+        "recopila a"
+    )
+    assert format_to_save_mock.call_count == 3
+    assert len(detail_pages) == 3
+    for details_page in detail_pages:
+        details_page.close.assert_awaited()
+
+
+# Test para comprobar que al vencer el plazo la combinación queda aplazada sin abrir más películas
+@pytest.mark.asyncio
+async def test_process_movies_defers_target_after_deadline(tmp_path):
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    scraper = CineplanetScraper(
+        journal=journal,
+        deadline=RunDeadline(ends_at=0),
+        resolver=MovieResolver(tmp_path / "movies.json"),
+    )
+    page_mock = MagicMock()
+    movies_mock = MagicMock()
+    filters_mock = MagicMock()
+    page_mock.locator = MagicMock(return_value=filters_mock)
+    filters_mock.count = AsyncMock(return_value=1)
+    filters_mock.nth.return_value.inner_text = AsyncMock(return_value=" lima ")
+    movies_mock.evaluate_all = AsyncMock(
+        return_value=[{"title": "title-test", "extra": "", "image": None, "href": "/x"}]
+    )
+    page_mock.url = "https://www.cineplanet.com.pe/peliculas"
+    page_mock.goto = AsyncMock()
+
+    with patch.object(console, "print"), pytest.raises(DeadlineExceeded):
+        await scraper.process_movies(page_mock, movies_mock, "test", MagicMock())
+
+    page_mock.goto.assert_not_awaited()
+    assert journal.deferred_targets() == [Target("cineplanet", "lima", "", "")]
+    assert not journal.is_target_done(Target("cineplanet", "lima", "", ""))
+    journal.close()
+
+
+
+# Test para comprobar que los estrenos se recopilan antes sin cambiar su índice en la bitácora
+@pytest.mark.asyncio
+async def test_process_movies_new_releases_first(tmp_path):
+    resolver = MovieResolver(tmp_path / "movies.json")
+    resolver.resolve("Avatar")
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    scraper = CineplanetScraper(journal=journal, resolver=resolver)
+    page_mock = MagicMock()
+    movies_mock = MagicMock()
+    filters_mock = MagicMock()
+    format_to_save_mock = MagicMock()
+
+    page_mock.url = "https://www.cineplanet.com.pe/peliculas"
+    page_mock.goto = AsyncMock()
+    page_mock.locator = MagicMock(
+        side_effect=lambda selector: filters_mock
+        if selector == ".movies-chips--chip"
+        else movies_mock
+    )
+    movies_mock.wait_for = AsyncMock()
+    filters_mock.count = AsyncMock(return_value=0)
+    movies_mock.evaluate_all = AsyncMock(
+        return_value=[
+            {"title": title, "extra": "", "image": None, "href": f"/{title}"}
+            for title in ("Avatar", "Coco", "Wicked")
+        ]
+    )
+
+    with patch.object(console, "print"), patch.object(scraper, "scrape_showtimes_data"):
+        await scraper.process_movies(page_mock, movies_mock, "test", format_to_save_mock)
+    journal.close()
+
+    saved = [call.args[1]["title"] for call in format_to_save_mock.call_args_list]
+    assert saved == ["Coco", "Wicked", "Avatar"]
+    events = [
+        json.loads(line)
+        for line in (tmp_path / "journal.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    indexes = {event["title"]: event["index"] for event in events if event.get("title")}
+    assert indexes == {"Avatar": 0, "Coco": 1, "Wicked": 2}
+
+
+# Test para comprobar que para leer los cines se aplica solo la ciudad y se cierra la página
+@pytest.mark.asyncio
+async def test_read_catalogue_level(scraper):
+    page = MagicMock()
+    page.close = AsyncMock()
+    items = MagicMock()
+    items.all_inner_texts = AsyncMock(return_value=[" CP Alcazar ", "CP Norte"])
+
+    with patch.object(scraper, "load_page", AsyncMock(return_value=page)), patch.object(
+        scraper, "accept_cookies"
+    ), patch.object(scraper, "apply_cineplanet_filters", AsyncMock()) as apply_mock, patch.object(
+        scraper, "open_filter", AsyncMock(return_value=items)
+    ) as open_mock:
+        options = await scraper.read_catalogue_level(MagicMock(), ("Lima",))
+
+    assert options == ["CP Alcazar", "CP Norte"]
+    apply_mock.assert_awaited_once_with(page, ["Ciudad"])
+    assert open_mock.await_args.args[:2] == (page, "Cine")
+    assert scraper.preset_filters is None
+    page.close.assert_awaited_once()
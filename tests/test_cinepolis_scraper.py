@@ -0,0 +1,58 @@
+from scrapers.cinepolis_scraper import CinepolisScraper
+from scrapers.catalogue_cache import CatalogueCache
+from scrapers.entity_resolver import MovieResolver
+from unittest.mock import MagicMock, AsyncMock, patch
+import pytest
+
+OPTIONS = ["Selecciona un cine", "Cinépolis Plaza Norte", "Cinépolis Santa Anita"]
+
+
+@pytest.fixture
+def scraper(tmp_path):
+    return CinepolisScraper(
+        catalogue=CatalogueCache(tmp_path / "catalogue.json"),
+        resolver=MovieResolver(tmp_path / "movies.json"),
+    )
+
+
+# Test para comprobar que el texto de relleno del combo no llega al catálogo
+@pytest.mark.asyncio
+async def test_extract_filters_skips_placeholder(scraper):
+    with patch.object(scraper, "read_options", AsyncMock(return_value=OPTIONS)):
+        filters = await scraper.extract_filters(
+            MagicMock(), "#cmbComplejos", "cine", ("Lima, Perú",)
+        )
+
+    assert filters == OPTIONS[1:]
+    assert scraper.catalogue.get(("cinepolis", "Lima, Perú")) == OPTIONS[1:]
+
+
+# Test para comprobar que una opción preseleccionada nunca coincide con el relleno
+@pytest.mark.asyncio
+async def test_select_preset_ignores_placeholder(scraper):
+    page = MagicMock()
+    page.wait_for_function = AsyncMock()
+    page.select_option = AsyncMock()
+
+    with patch.object(scraper, "read_options", AsyncMock(return_value=OPTIONS)):
+        with pytest.raises(LookupError):
+            await scraper.select_preset_cinepolis(page, "#cmbComplejos", "Selecciona un")
+
+    page.select_option.assert_not_awaited()
+
+
+# Test para comprobar que se eligen los combos anteriores y se leen las opciones del siguiente
+@pytest.mark.asyncio
+async def test_read_catalogue_level(scraper):
+    page = MagicMock()
+    page.wait_for_function = AsyncMock()
+    page.close = AsyncMock()
+
+    with patch.object(scraper, "load_page", AsyncMock(return_value=page)), patch.object(
+        scraper, "select_preset_cinepolis", AsyncMock()
+    ) as preset_mock, patch.object(scraper, "read_options", AsyncMock(return_value=OPTIONS)):
+        options = await scraper.read_catalogue_level(MagicMock(), ("Lima, Perú",))
+
+    assert options == OPTIONS[1:]
+    preset_mock.assert_awaited_once_with(page, "#cmbCiudades", "Lima, Perú")
+    page.close.assert_awaited_once()
@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock
+from scrapers.deadline import DeadlineExceeded, RunDeadline
+from scrapers.entity_resolver import MovieResolver
+from scrapers.models import Target
+from scrapers.run_journal import RunJournal
+from tests.helpers import DummyScraper, FakeClock
+import pytest, asyncio, time
+
+TARGET = Target("dummy", "Lima", "CP Alcazar", "Hoy")
+
+
+class DelayScraper(DummyScraper):
+    # Cada película tarda lo que indica `delays`
+    async def process_movies(self, output_folder, format_to_save, delays):
+        # Igual que los scrapers: cada película con su presupuesto y, al vencer, se aplaza
+        try:
+            for i, delay in enumerate(delays):
+                title = f"Película {i}"
+                if await self.within_budget(asyncio.sleep(delay), TARGET, i, title):
+                    await self.save_movie(format_to_save, output_folder, {"title": title})
+        except DeadlineExceeded:
+            await self.defer_target(TARGET)
+            raise
+        await self.flush_writer()
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    yield journal
+    journal.close()
+
+
+def scraper_with(tmp_path, journal, deadline):
+    return DelayScraper(
+        journal=journal, deadline=deadline, resolver=MovieResolver(tmp_path / "movies.json")
+    )
+
+
+# Test para comprobar el tiempo restante y el límite por película
+def test_run_deadline_limits():
+    clock = FakeClock()
+    deadline = RunDeadline.after(1, movie_budget=20, clock=clock)
+
+    assert deadline.movie_timeout() == 20
+    clock.now += 50
+    assert deadline.remaining() == 10
+    assert deadline.movie_timeout() == 10
+    clock.now += 10
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+    assert RunDeadline().movie_timeout() is None
+
+
+# Test para comprobar que una película lenta se salta y queda en la bitácora
+@pytest.mark.asyncio
+async def test_slow_movie_is_skipped(tmp_path, journal):
+    scraper = scraper_with(tmp_path, journal, RunDeadline(movie_budget=0.05))
+    format_to_save = MagicMock()
+
+    assert await scraper.run_until_deadline(
+        scraper.process_movies_writing(tmp_path, format_to_save, [0, 5, 0])
+    )
+
+    saved = [call.args[1]["title"] for call in format_to_save.call_args_list]
+    assert saved == ["Película 0", "Película 2"]
+    assert not journal.is_movie_done(TARGET, "Película 1")
+    assert '"status": "timeout"' in journal.path.read_text(encoding="utf-8")
+
+
+# Test para comprobar que al vencer el plazo se guarda lo recopilado y se aplaza la combinación
+@pytest.mark.asyncio
+async def test_deadline_flushes_and_defers(tmp_path, journal):
+    scraper = scraper_with(tmp_path, journal, RunDeadline(time.time() + 0.1))
+    written = []
+
+    def slow_save(output_folder, movie_data):
+        time.sleep(0.02)
+        written.append(movie_data["title"])
+
+    finished = await scraper.run_until_deadline(
+        scraper.process_movies_writing(tmp_path, slow_save, [0, 0, 5, 0])
+    )
+
+    assert not finished
+    assert written == ["Película 0", "Película 1"]
+    assert journal.deferred_targets() == [TARGET]
+    assert scraper.writer is None
+
+
+# Test para comprobar que la red de seguridad corta etapas que no son películas
+@pytest.mark.asyncio
+async def test_scope_cancels_other_stages(tmp_path, journal):
+    scraper = scraper_with(tmp_path, journal, RunDeadline(time.time() + 0.05, grace=0.05))
+
+    assert not await scraper.run_until_deadline(asyncio.sleep(5))
+
+
+# Test para comprobar que sin plazo no se corta nada y otros errores se propagan
+@pytest.mark.asyncio
+async def test_without_deadline(tmp_path, journal):
+    scraper = scraper_with(tmp_path, journal, None)
+
+    async def fail():
+        raise TimeoutError("del sitio")
+
+    limited = scraper_with(tmp_path, journal, RunDeadline(time.time() + 10))
+
+    assert await scraper.run_until_deadline(asyncio.sleep(0))
+    with pytest.raises(TimeoutError, match="del sitio"):
+        await limited.run_until_deadline(fail())
+
+
+# Test para comprobar que con el plazo vencido una tarea ya creada se cancela en vez de fallar
+@pytest.mark.asyncio
+async def test_expired_deadline_cancels_task(tmp_path, journal):
+    clock = FakeClock()
+    scraper = scraper_with(tmp_path, journal, RunDeadline(ends_at=clock.now, clock=clock))
+    work = asyncio.create_task(asyncio.sleep(5))
+
+    with pytest.raises(DeadlineExceeded):
+        await scraper.within_budget(work, TARGET, 0, "Película 0")
+
+    await asyncio.sleep(0)
+    assert work.cancelled()
@@ -0,0 +1,100 @@
+from scrapers.entity_resolver import (
+    MovieResolver,
+    backfill,
+    normalize_title,
+    parse_running_time,
+)
+import pytest, json, time
+
+
+# Test para comprobar que se quitan tildes, puntuación y la versión del título
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("Avatar: Fuego y Ceniza (Doblada)", "avatar fuego y ceniza"),
+        ("AVATAR FUEGO Y CENIZA - SUBTITULADA 3D", "avatar fuego y ceniza"),
+        ("Preventa: Zootopia 2 [DOB]", "zootopia 2"),
+        ("El Niño y la Garza", "el nino y la garza"),
+        ("Five Nights at Freddy's 2", "five nights at freddy s 2"),
+        ("(500) Días con ella", "500 dias con ella"),
+    ],
+)
+def test_normalize_title(title, expected):
+    assert normalize_title(title) == expected
+
+
+# Test para comprobar los formatos de duración de cada cadena
+@pytest.mark.parametrize(
+    "text, minutes",
+    [("3h 12min", 192), ("192 min", 192), ("2h", 120), ("1:55", 115), ("95", 95), ("", None)],
+)
+def test_parse_running_time(text, minutes):
+    assert parse_running_time(text) == minutes
+
+
+# Test para comprobar que la misma película recibe el mismo id en ambas cadenas
+def test_resolve_matches_across_chains(tmp_path):
+    resolver = MovieResolver(tmp_path / "movies.json")
+    cineplanet = {"title": "Avatar: Fuego y Ceniza (Doblada)", "running_time": "3h 12min"}
+    cinepolis = {"title": "Avatar Fuego y Cenizas", "running_time": "192 min"}
+
+    assert resolver.assign(cineplanet) == "avatar-fuego-y-ceniza"
+    assert resolver.assign(cinepolis) == "avatar-fuego-y-ceniza"
+    assert cinepolis["movie_id"] == "avatar-fuego-y-ceniza"
+
+
+# Test para comprobar que la duración o el número de secuela separan películas
+def test_resolve_keeps_different_movies_apart(tmp_path):
+    resolver = MovieResolver(tmp_path / "movies.json")
+
+    assert resolver.resolve("Toy Story 4", "100 min") != resolver.resolve("Toy Story 3", "103 min")
+    first = resolver.resolve("Drácula", "2h 5min")
+    remake = resolver.resolve("Dracula", "92 min")
+    assert first == "dracula"
+    assert remake == "dracula-92"
+    assert resolver.resolve("Dracula (Subtitulada)", "125 min") == first
+
+
+# Test para comprobar que los ids se conservan entre ejecuciones y procesos
+def test_save_merges_registry(tmp_path):
+    path = tmp_path / "movies.json"
+    first = MovieResolver(path)
+    second = MovieResolver(path)
+    first.resolve("Wicked: Por Siempre", "2h 17min")
+    second.resolve("Zootopia 2", "1h 48min")
+    first.save()
+    second.save()
+
+    resolver = MovieResolver(path)
+    assert resolver.resolve("WICKED POR SIEMPRE (DOB)", "137 min") == "wicked-por-siempre"
+    assert resolver.resolve("Zootopia 2 - Doblada") == "zootopia-2"
+    assert json.loads(path.read_text(encoding="utf-8"))["version"] == 1
+    assert not resolver.dirty
+
+
+# Test para comprobar que se agrega movie_id a los JSON ya guardados
+def test_backfill(tmp_path):
+    folder = tmp_path / "lima" / "cinepolis" / "cp" / "hoy"
+    folder.mkdir(parents=True)
+    (folder / "avatar.json").write_text(json.dumps({"title": "Avatar (Doblada)"}))
+    resolver = MovieResolver(tmp_path / ".cache" / "movies.json")
+
+    assert backfill(tmp_path, resolver) == (1, 1)
+    assert backfill(tmp_path, resolver) == (1, 0)
+    saved = json.loads((folder / "avatar.json").read_text(encoding="utf-8"))
+    assert saved["movie_id"] == "avatar"
+
+
+# Test para comprobar que miles de títulos se resuelven rápido
+def test_resolve_many_titles_is_fast(tmp_path):
+    resolver = MovieResolver(tmp_path / "movies.json")
+    titles = [f"Película número {i} de la saga" for i in range(3000)]
+
+    start = time.perf_counter()
+    for day in range(5):
+        for title in titles:
+            resolver.resolve(f"{title} (Doblada)" if day % 2 else title, "2h")
+    elapsed = time.perf_counter() - start
+
+    assert len(resolver.movies) == 3000
+    assert elapsed < 5
@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock
+from scrapers.base_scraper import profiled
+from scrapers.entity_resolver import MovieResolver
+from scrapers.memory_profiler import MemoryProfiler, MB
+from scrapers.run_journal import RunJournal
+from tests.helpers import DummyScraper
+import pytest, json, asyncio, tracemalloc
+
+
+class ProfiledScraper(DummyScraper):
+    @profiled("scrape_showtimes_data")
+    async def scrape_showtimes_data(self, movie_data: dict):
+        # Reserva memoria que sigue viva al terminar la etapa
+        movie_data["showtimes"] = [bytearray(1024) for _ in range(2000)]
+
+
+def fake_rss(values):
+    values = iter(values)
+    last = [0]
+
+    def rss():
+        last[0] = next(values, last[0])
+        return last[0]
+
+    return rss
+
+
+# Test para comprobar que los picos se atribuyen a la etapa activa
+@pytest.mark.asyncio
+async def test_stage_attributes_peaks(tmp_path):
+    profiler = MemoryProfiler(
+        interval=60, rss=fake_rss([900 * MB, 200 * MB, 100 * MB]), python_rss=lambda: 50 * MB
+    )
+    await profiler.start()
+    with profiler.stage("load_all_movies"):
+        pass
+    with profiler.stage("save"):
+        pass
+    await profiler.stop()
+
+    summary = profiler.summary()
+    assert summary["stages"]["load_all_movies"]["calls"] == 1
+    assert summary["stages"]["load_all_movies"]["rss_peak_mb"] == 900
+    assert summary["stages"]["load_all_movies"]["browser_peak_mb"] == 850
+    assert summary["stages"]["save"]["rss_peak_mb"] == 200
+    assert summary["rss_peak_mb"] == 900
+    assert summary["rss_peak_stages"] == ["load_all_movies"]
+    assert not tracemalloc.is_tracing()
+
+
+# Test para comprobar que el scraper mide sus etapas y los guardados, y escribe el resumen en la carpeta de ejecuciones
+@pytest.mark.asyncio
+async def test_scraper_writes_summary(tmp_path):
+    profiler = MemoryProfiler(interval=60, rss=lambda: 300 * MB, python_rss=lambda: 100 * MB)
+    journal = RunJournal(tmp_path / "journal.jsonl", run_id="abc123")
+    scraper = ProfiledScraper(
+        profiler=profiler, resolver=MovieResolver(tmp_path / "movies.json"), journal=journal
+    )
+    format_to_save = MagicMock()
+    movie_data = {"title": "Avatar"}
+
+    await scraper.start_profiler()
+    await scraper.scrape_showtimes_data(movie_data)
+    await scraper.save_movie(format_to_save, tmp_path, movie_data)
+    await scraper.stop_profiler(tmp_path / ".runs")
+
+    format_to_save.assert_called_once_with(tmp_path, movie_data)
+    # Fuera de la carpeta del día, donde se tomaría por una película
+    assert not (tmp_path / "memory_profile.json").exists()
+    # Un resumen por ejecución: no se pisan entre sí
+    summary = json.loads(
+        (tmp_path / ".runs" / "memory_profile-abc123.json").read_text(encoding="utf-8")
+    )
+    stage = summary["stages"]["scrape_showtimes_data"]
+    assert stage["heap_growth_mb"] >= 1.5
+    assert stage["top_allocators"][0]["where"].endswith("test_memory_profiler.py:14")
+    assert summary["stages"]["save"]["calls"] == 1
+    assert summary["browser_peak_mb"] == 200
+    journal.close()
+
+
+# Test para comprobar que sin profiler las etapas no hacen nada
+@pytest.mark.asyncio
+async def test_stage_without_profiler(tmp_path):
+    scraper = ProfiledScraper(resolver=MovieResolver(tmp_path / "movies.json"))
+    movie_data = {}
+
+    await scraper.scrape_showtimes_data(movie_data)
+    await scraper.stop_profiler(tmp_path)
+
+    assert len(movie_data["showtimes"]) == 2000
+    assert not list(tmp_path.glob("memory_profile*"))
+
+
+# Test para comprobar que el muestreo periódico corre en segundo plano
+@pytest.mark.asyncio
+async def test_sampler_runs_periodically():
+    profiler = MemoryProfiler(interval=0.01, rss=lambda: 10 * MB, python_rss=lambda: 5 * MB)
+    await profiler.start()
+    with profiler.stage("scrape_showtimes_data"):
+        await asyncio.sleep(0.1)
+    await profiler.stop()
+
+    assert len(profiler.timeline) >= 3
+    assert profiler.summary()["stages"]["scrape_showtimes_data"]["rss_peak_mb"] == 10
@@ -0,0 +1,136 @@
+from scrapers.models import Movie, Showtime, chain_from_path, parse_time
+from pathlib import Path
+import pytest, copy
+
+
+@pytest.fixture
+def cineplanet_data():
+    return {
+        "title": "Mi Película",
+        "genre": "Drama",
+        "running_time": "2h 0min",
+        "age_restriction": "+14",
+        "image_url": "https://cdn.test/poster.jpg",
+        "city": "Lima",
+        "cinema": "CP Alcazar",
+        "day": "Hoy",
+        "showtimes": {
+            "CP Alcazar": [
+                {
+                    "dimension": "2D",
+                    "format": "Regular",
+                    "language": "Doblada",
+                    "showtimes": [["7:30 pm", "https://test/1"], ["10:00 pm", "Error"]],
+                }
+            ]
+        },
+    }
+
+
+# Test para comprobar que se interpretan distintos formatos de hora
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("19:30", 19 * 60 + 30),
+        ("7:30 pm", 19 * 60 + 30),
+        ("12:15 a. m.", 15),
+        ("12:00 p.m.", 12 * 60),
+        ("sin hora", None),
+    ],
+)
+def test_parse_time(text, expected):
+    assert parse_time(text) == expected
+
+
+# Test para comprobar que la serialización conserva la forma del JSON
+def test_movie_round_trip_keeps_json_shape(cineplanet_data):
+    original = copy.deepcopy(cineplanet_data)
+
+    assert Movie.from_dict(cineplanet_data).to_dict() == original
+
+
+# Test para comprobar la forma de lista que usa Cinépolis
+def test_movie_round_trip_flat_showtimes():
+    movie_data = {
+        "city": "Lima, Perú",
+        "cinema": "Cinépolis Plaza Norte",
+        "day": "Hoy",
+        "title": "Mi Película",
+        "age_restriction": "B",
+        "running_time": "120 min",
+        "showtimes": [
+            {"language": "ESP", "format": "2D", "showtimes": [["19:00", "/compra/1"]]}
+        ],
+    }
+
+    movie = Movie.from_dict(movie_data)
+
+    assert movie.schedules[0].cinema == "Cinépolis Plaza Norte"
+    assert movie.to_dict() == movie_data
+
+
+# Test para comprobar que los textos repetidos se comparten en memoria
+def test_repeated_strings_are_interned(cineplanet_data):
+    first = Movie.from_dict(copy.deepcopy(cineplanet_data))
+    second = Movie.from_dict(
+        {**copy.deepcopy(cineplanet_data), "cinema": "".join(["CP ", "Alcazar"])}
+    )
+
+    assert first.cinema is second.cinema
+    assert first.schedules[0].formats[0].language is second.schedules[0].formats[0].language
+
+
+# Test para comprobar que las funciones tienen la hora interpretada
+def test_rows_and_parsed_times(cineplanet_data):
+    movie = Movie.from_dict(cineplanet_data)
+
+    rows = movie.rows()
+
+    assert len(rows) == 2
+    assert rows[0]["Cine"] == "CP Alcazar"
+    assert rows[1]["URL"] == "Error"
+    assert [showtime.minutes for _, _, showtime in movie.iter_showtimes()] == [
+        19 * 60 + 30,
+        22 * 60,
+    ]
+
+
+# Test para comprobar que los modelos no tienen __dict__
+def test_models_are_slotted():
+    assert not hasattr(Showtime("19:00", None), "__dict__")
+
+
+# Test para comprobar las filas planas de funciones y que Cinépolis usa el formato como dimensión
+def test_showtime_rows():
+    movie = Movie.from_dict(
+        {
+            "title": "Mi Película",
+            "city": "Lima, Perú",
+            "day": "Hoy",
+            "cinema": "Cinépolis Plaza Norte",
+            "showtimes": [{"language": "ESP", "format": "2D", "showtimes": [["19:00", None]]}],
+        }
+    )
+
+    assert list(movie.showtime_rows()) == [
+        {
+            "city": "Lima, Perú",
+            "cinema": "Cinépolis Plaza Norte",
+            "day": "Hoy",
+            "title": "Mi Película",
+            "dimension": "2D",
+            "format": "2D",
+            "language": "ESP",
+            "time": "19:00",
+            "minutes": 19 * 60,
+            "url": None,
+        }
+    ]
+
+
+# Test para comprobar que la cadena sale de la ruta solo a la profundidad de las películas
+def test_chain_from_path():
+    root = Path("data")
+
+    assert chain_from_path(root, root / "lima/cineplanet/cp_alcazar/hoy/avatar.json") == "cineplanet"
+    assert chain_from_path(root, root / ".cache/movies.json") == ""
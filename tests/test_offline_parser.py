@@ -0,0 +1,128 @@
+from scrapers.html_dom import parse_html
+from scrapers.html_snapshots import SnapshotStore
+from scrapers.models import Target
+from scrapers.offline_parser import reparse, parse_cinepolis_listing, main
+import pytest, json
+
+CINEPLANET = Target("cineplanet", "Lima", "CP Alcazar", "Hoy")
+CINEPOLIS = Target("cinepolis", "Lima, Perú", "Cinépolis Plaza Norte", "Hoy")
+
+LISTING_HTML = """
+<div class="movies-chips"><span class="movies-chips--chip">Lima</span>
+<span class="movies-chips--chip">CP Alcazar</span><span class="movies-chips--chip">Hoy</span></div>
+<div class="movies-list--large-item">
+  <img class="image-loader--image_loaded" src="https://example.com/avatar.jpg">
+  <h2 class="movies-list--large-movie-description-title"> Avatar </h2>
+  <p class="movies-list--large-movie-description-extra">Ciencia ficción, 3h 12min, +14</p>
+  <div class="movie-info-details--first-button-wrapper"><a href="/pelicula/avatar">Comprar</a></div>
+</div>
+"""
+
+DETAIL_HTML = """
+<div class="film-detail-showtimes--accordion accordion_expanded">
+  <span class="cinema-showcases--summary-name">CP Alcazar</span>
+  <div class="cinema-showcases--sessions-details">
+    <div class="sessions-details--formats">
+      <span class="sessions-details--formats-dimension">2D</span>
+      <span class="sessions-details--formats-theather">Regular</span>
+      <span class="sessions-details--formats-language">Doblado</span>
+    </div>
+    <div class="sessions-details--session-item">
+      <a class="showtime-selector--link" href="/compra/1/asientos">19:00</a>
+    </div>
+    <div class="sessions-details--session-item showtime-selector_disable">
+      <a class="showtime-selector--link">21:00</a>
+    </div>
+  </div>
+</div>
+"""
+
+CINEPOLIS_HTML = """
+<div class="divFecha"><article>
+  <h2 class="datalayer-movie">Avatar</h2>
+  <span class="clasificacion" data-description="+14"></span><span class="duracion">192 min</span>
+  <div class="horarioExp">
+    <div class="col3"><span>2D</span><span>Digital</span><span>Español</span></div>
+    <div class="col9"><div class="btnhorario"><a href="https://cinepolis.com.pe/compra/1">18:30</a></div></div>
+  </div>
+</article></div>
+"""
+
+
+# Test para comprobar el motor de selectores sobre el HTML guardado
+def test_select_supports_scraper_selectors():
+    root = parse_html(CINEPOLIS_HTML)
+
+    children = root.select(".horarioExp .col3 > *")
+    assert [child.text() for child in children] == ["2D", "Digital", "Español"]
+    assert root.select_one(".clasificacion").get("data-description") == "+14"
+    assert root.select_one("article .btnhorario a[href]").text() == "18:30"
+
+
+# Test para comprobar que Cinépolis se re-extrae con la misma forma que en vivo
+def test_parse_cinepolis_listing():
+    (movie_data,) = parse_cinepolis_listing(CINEPOLIS_HTML, CINEPOLIS)
+
+    assert movie_data["title"] == "Avatar"
+    assert movie_data["age_restriction"] == "+14"
+    assert movie_data["showtimes"] == [
+        {
+            "language": "Español",
+            "format": "Digital",
+            "showtimes": [["18:30", "https://cinepolis.com.pe/compra/1"]],
+        }
+    ]
+
+
+# Test para comprobar que se reconstruye la película a partir de cartelera y detalle
+def test_reparse_cineplanet_snapshots(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots", run_id="run-1")
+    store.record(CINEPLANET, "listing", "https://www.cineplanet.com.pe/peliculas", LISTING_HTML)
+    store.record(
+        CINEPLANET,
+        "detail",
+        "https://www.cineplanet.com.pe/pelicula/avatar",
+        DETAIL_HTML,
+        index=0,
+        href="https://www.cineplanet.com.pe/pelicula/avatar",
+    )
+    # El mismo HTML no se guarda dos veces
+    store.record(CINEPLANET, "listing", "https://www.cineplanet.com.pe/peliculas", LISTING_HTML)
+    assert len(list((tmp_path / "snapshots" / "blobs").rglob("*.html.gz"))) == 2
+
+    ((target, movie_data),) = list(reparse(store))
+
+    assert target == CINEPLANET
+    assert movie_data == {
+        "title": "Avatar",
+        "genre": "Ciencia ficción",
+        "running_time": "3h 12min",
+        "age_restriction": "+14",
+        "image_url": "https://example.com/avatar.jpg",
+        "city": "Lima",
+        "cinema": "CP Alcazar",
+        "day": "Hoy",
+        "showtimes": {
+            "CP Alcazar": [
+                {
+                    "dimension": "2D",
+                    "format": "Regular",
+                    "language": "Doblado",
+                    "showtimes": [
+                        ["19:00", "https://www.cineplanet.com.pe/compra/1/asientos"]
+                    ],
+                }
+            ]
+        },
+    }
+
+
+# Test para comprobar que la línea de comandos escribe los JSON re-extraídos
+def test_main_writes_json(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots", run_id="run-1")
+    store.record(CINEPOLIS, "listing", "https://cinepolis.com.pe/", CINEPOLIS_HTML)
+
+    main(["--snapshots", str(tmp_path / "snapshots"), "--output", str(tmp_path / "out")])
+
+    saved = tmp_path / "out/run-1/lima/cinepolis/cinepolis_plaza_norte/hoy/avatar.json"
+    assert json.loads(saved.read_text(encoding="utf-8"))["running_time"] == "192 min"
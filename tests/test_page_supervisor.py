@@ -0,0 +1,113 @@
+from scrapers.page_supervisor import PageSupervisor, process_tree_rss
+from playwright.async_api import Error as PlaywrightError
+from unittest.mock import MagicMock, AsyncMock
+import pytest, asyncio
+
+
+def make_browser(page):
+    browser = MagicMock()
+    browser.is_connected = MagicMock(return_value=True)
+    browser.close = AsyncMock()
+    context = MagicMock()
+    context.close = AsyncMock()
+    browser.new_context = AsyncMock(return_value=context)
+    page.context = context
+    return browser
+
+
+@pytest.fixture
+def pages():
+    return [MagicMock(name="page-0"), MagicMock(name="page-1"), MagicMock(name="page-2")]
+
+
+@pytest.fixture
+def supervisor(pages):
+    new_browser = make_browser(pages[1])
+    supervisor = PageSupervisor(
+        launch=AsyncMock(return_value=new_browser),
+        open_page=AsyncMock(side_effect=pages[1:]),
+        max_navigations=2,
+        max_rss_mb=None,
+        watchdog_seconds=0.2,
+    )
+    supervisor.adopt(make_browser(pages[0]), pages[0])
+    return supervisor
+
+
+# Test para comprobar que se recicla la página después de N navegaciones
+@pytest.mark.asyncio
+async def test_checkpoint_recycles_after_max_navigations(supervisor, pages):
+    assert await supervisor.checkpoint() is pages[0]
+
+    supervisor.note_navigation(2)
+    page = await supervisor.checkpoint()
+
+    assert page is pages[1]
+    assert supervisor.navigations == 0
+    pages[0].context.close.assert_awaited_once()
+    supervisor.launch.assert_not_awaited()
+
+
+# Test para comprobar que se recicla al superar el umbral de memoria
+@pytest.mark.asyncio
+async def test_checkpoint_recycles_on_rss(supervisor, pages):
+    supervisor.max_rss_mb = 100
+    supervisor.rss = lambda: 200 * 1024 * 1024
+
+    assert await supervisor.checkpoint() is pages[1]
+
+
+# Test para comprobar que una página colgada se relanza y se reintenta
+@pytest.mark.asyncio
+async def test_run_recovers_from_hung_page(supervisor, pages):
+    calls = []
+
+    async def operation(page):
+        calls.append(page)
+        if page is pages[0]:
+            await asyncio.sleep(10)
+        return "ok"
+
+    assert await supervisor.run(operation) == "ok"
+    assert calls == [pages[0], pages[1]]
+
+
+# Test para comprobar que tras una caída se lanza un navegador nuevo
+@pytest.mark.asyncio
+async def test_run_relaunches_after_crash(supervisor, pages):
+    async def operation(page):
+        if page is pages[0]:
+            supervisor._mark_crashed()
+            raise PlaywrightError("Target crashed")
+        return "ok"
+
+    assert await supervisor.run(operation) == "ok"
+    supervisor.launch.assert_awaited_once()
+
+
+# Test para comprobar que los errores normales no se ocultan
+@pytest.mark.asyncio
+async def test_run_reraises_regular_errors(supervisor):
+    async def operation(page):
+        raise PlaywrightError("selector not found")
+
+    with pytest.raises(PlaywrightError):
+        await supervisor.run(operation)
+    supervisor.open_page.assert_not_awaited()
+
+
+# Test para comprobar que se mide la memoria del propio proceso
+def test_process_tree_rss_counts_self():
+    assert process_tree_rss() > 0
+
+
+# Test para comprobar que el contexto reciclado se crea con la función del scraper
+@pytest.mark.asyncio
+async def test_recycle_uses_new_context(supervisor, pages):
+    context = MagicMock()
+    supervisor.new_context = AsyncMock(return_value=context)
+
+    await supervisor.recycle()
+
+    supervisor.new_context.assert_awaited_once_with(supervisor.browser)
+    supervisor.open_page.assert_awaited_once_with(context)
@@ -0,0 +1,82 @@
+from scrapers.poster_cache import PosterCache
+from unittest.mock import MagicMock
+import pytest, hashlib
+
+
+def fake_response(status_code=200, content=b"", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.get.return_value = fake_response(
+        content=b"poster-bytes",
+        headers={"Content-Type": "image/jpeg", "ETag": '"v1"'},
+    )
+    return session
+
+
+# Test para comprobar que el póster se guarda con el hash de su contenido
+@pytest.mark.asyncio
+async def test_fetch_stores_content_addressed_file(tmp_path, session):
+    cache = PosterCache(tmp_path, session=session)
+    digest = hashlib.sha256(b"poster-bytes").hexdigest()
+
+    result = await cache.fetch("https://cdn.test/poster.jpg")
+    cache.close()
+
+    assert result == tmp_path / digest[:2] / f"{digest}.jpg"
+    assert result.read_bytes() == b"poster-bytes"
+    assert cache.index["https://cdn.test/poster.jpg"]["sha256"] == digest
+
+
+# Test para comprobar que una misma url se descarga una sola vez por ejecución
+@pytest.mark.asyncio
+async def test_fetch_same_url_downloads_once(tmp_path, session):
+    cache = PosterCache(tmp_path, session=session)
+
+    first = await cache.fetch("https://cdn.test/poster.jpg")
+    second = await cache.fetch("https://cdn.test/poster.jpg")
+    cache.close()
+
+    assert first == second
+    session.get.assert_called_once()
+
+
+# Test para comprobar que en otra ejecución se usa una petición condicional
+@pytest.mark.asyncio
+async def test_fetch_uses_conditional_request_on_rerun(tmp_path, session):
+    cache = PosterCache(tmp_path, session=session)
+    first = await cache.fetch("https://cdn.test/poster.jpg")
+    cache.close()
+
+    session.get.reset_mock()
+    session.get.return_value = fake_response(status_code=304)
+    cache = PosterCache(tmp_path, session=session)
+    second = await cache.fetch("https://cdn.test/poster.jpg")
+    cache.close()
+
+    assert second == first
+    _, kwargs = session.get.call_args
+    assert kwargs["headers"]["If-None-Match"] == '"v1"'
+
+
+# Test para comprobar que una descarga fallida se reintenta en la siguiente llamada
+@pytest.mark.asyncio
+async def test_fetch_retries_after_failure(tmp_path, session):
+    ok = session.get.return_value
+    session.get.side_effect = [ConnectionError("timeout"), ok]
+    cache = PosterCache(tmp_path, session=session)
+
+    with pytest.raises(ConnectionError):
+        await cache.fetch("https://cdn.test/poster.jpg")
+    result = await cache.fetch("https://cdn.test/poster.jpg")
+    cache.close()
+
+    assert result.read_bytes() == b"poster-bytes"
+    assert session.get.call_count == 2
@@ -0,0 +1,113 @@
+from scrapers.prioritizer import Prioritizer, days_ahead, order_movies
+from scrapers.entity_resolver import MovieResolver
+from scrapers.models import Target, output_folder
+from datetime import date
+import pytest, json, os
+
+# Domingo
+TODAY = date(2026, 10, 18)
+
+
+def target(cinema: str, day: str = "Hoy") -> Target:
+    return Target("cineplanet", "Lima", cinema, day)
+
+
+def write_movie(root, target: Target, sessions: int, mtime: float):
+    folder = output_folder(root, target)
+    folder.mkdir(parents=True, exist_ok=True)
+    file_path = folder / "avatar.json"
+    movie_data = {
+        "title": "Avatar",
+        "city": target.city,
+        "cinema": target.cinema,
+        "day": target.day,
+        "showtimes": {
+            target.cinema: [
+                {
+                    "format": "2D",
+                    "language": "Doblada",
+                    "showtimes": [[f"{hour}:00", None] for hour in range(12, 12 + sessions)],
+                }
+            ]
+        },
+    }
+    file_path.write_text(json.dumps(movie_data), encoding="utf-8")
+    os.utime(file_path, (mtime, mtime))
+
+
+# Test para comprobar cuántos días faltan según el texto del filtro
+@pytest.mark.parametrize(
+    "day, expected",
+    [
+        ("Hoy", 0),
+        ("Hoy Domingo", 0),
+        ("Mañana", 1),
+        ("Martes 20 Oct", 2),
+        ("Miércoles", 3),
+        ("sábado, 24 de octubre", 6),
+        ("25/10", 7),
+        ("2 ene", 76),
+        ("Próximamente", 7),
+        ("", 7),
+    ],
+)
+def test_days_ahead(day, expected):
+    assert days_ahead(day, TODAY) == expected
+
+
+# Test para comprobar que el día cercano manda y el cine con más funciones y los datos viejos desempatan
+def test_order_targets(tmp_path):
+    now = 1_000_000.0
+    busy, quiet, fresh = target("CP Alcazar"), target("CP Norte"), target("CP Sur")
+    write_movie(tmp_path, busy, 8, now - 3600)
+    write_movie(tmp_path, quiet, 2, now - 3600)
+    write_movie(tmp_path, fresh, 2, now)
+    never = target("CP Nuevo")
+    tomorrow = target("CP Alcazar", "Mañana")
+    prioritizer = Prioritizer(tmp_path, today=TODAY, clock=lambda: now)
+
+    ordered = prioritizer.order([tomorrow, fresh, quiet, never, busy])
+
+    assert ordered == [busy, never, quiet, fresh, tomorrow]
+    scores = prioritizer.scores([busy, tomorrow])
+    assert scores[busy.key] == pytest.approx(100 + 0.4 + 0.4 / 24, abs=1e-3)
+    assert scores[tomorrow.key] == pytest.approx(99 + 0.4 + 0.4)
+    # Solo se leen los JSON: no queda ninguna caché en la carpeta de datos
+    assert not (tmp_path / ".cache").exists()
+
+
+# Test para comprobar que ni el cine más concurrido ni los datos más viejos adelantan un día
+def test_day_outranks_tie_breakers(tmp_path):
+    near = target("CP Norte", "Jueves 22 oct")
+    far = target("CP Alcazar", "Viernes 23 oct")
+    now = 1_000_000.0
+    write_movie(tmp_path, near, 1, now)
+    # El otro cine es el más concurrido y nunca se recopiló
+    prioritizer = Prioritizer(
+        tmp_path, traffic={"lima/cineplanet/cp_alcazar": 1.0}, today=TODAY, clock=lambda: now
+    )
+
+    assert prioritizer.order([far, near]) == [near, far]
+
+
+# Test para comprobar que sin datos guardados se respeta el orden del catálogo dentro del día
+def test_order_without_history(tmp_path):
+    targets = [target("CP B", "Mañana"), target("CP A"), target("CP C")]
+
+    ordered = Prioritizer(tmp_path, today=TODAY).order(targets)
+
+    assert ordered == [targets[1], targets[2], targets[0]]
+
+
+# Test para comprobar que los estrenos van primero y se conservan los índices de la cartelera
+def test_order_movies(tmp_path):
+    resolver = MovieResolver(tmp_path / "movies.json")
+    resolver.resolve("Avatar: El Camino del Agua")
+    listing = [
+        {"title": "Avatar: El camino del agua (Doblada)"},
+        {"title": "Coco"},
+        {"title": " "},
+        {"title": "Wicked"},
+    ]
+
+    assert order_movies(listing, resolver) == [1, 3, 0, 2]
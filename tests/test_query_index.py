@@ -0,0 +1,135 @@
+from scrapers.query_index import ScheduleIndex, main
+from pathlib import Path
+import pytest, json, os
+
+
+def write_movie(root: Path, chain: str, cinema: str, title: str, sessions: list) -> Path:
+    folder = root / "lima" / chain / cinema.lower().replace(" ", "_") / "hoy"
+    folder.mkdir(parents=True, exist_ok=True)
+    file_path = folder / f"{title.lower()}.json"
+    movie_data = {
+        "title": title,
+        "city": "Lima",
+        "cinema": cinema,
+        "day": "Hoy",
+        "showtimes": {cinema: sessions},
+    }
+    file_path.write_text(json.dumps(movie_data), encoding="utf-8")
+    return file_path
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    write_movie(
+        tmp_path,
+        "cineplanet",
+        "CP Alcazar",
+        "Avatar",
+        [
+            {
+                "dimension": "3D",
+                "format": "Regular",
+                "language": "Doblada",
+                "showtimes": [["6:00 pm", "u1"], ["8:30 pm", "u2"], ["10:45 pm", "u3"]],
+            },
+            {
+                "dimension": "2D",
+                "format": "Regular",
+                "language": "Subtitulada",
+                "showtimes": [["7:15 pm", "u4"]],
+            },
+        ],
+    )
+    write_movie(
+        tmp_path,
+        "cineplanet",
+        "CP Primavera",
+        "Coco",
+        [
+            {
+                "dimension": "3D",
+                "format": "Prime",
+                "language": "Doblada",
+                "showtimes": [["8:00 pm", "u5"]],
+            }
+        ],
+    )
+    return tmp_path
+
+
+# Test para comprobar que solo se indexan los JSON de películas
+def test_refresh_skips_other_json(data_root):
+    (data_root / "posters").mkdir()
+    (data_root / "posters" / "index.json").write_text('{"u": {"file": "a.jpg"}}')
+    (data_root / "lima" / "cineplanet" / "cp_alcazar" / "hoy" / "extra").mkdir()
+    (data_root / "lima" / "cineplanet" / "cp_alcazar" / "hoy" / "extra" / "x.json").write_text("[]")
+    index = ScheduleIndex(data_root)
+
+    assert index.refresh() == 2
+    assert len(index) == 5
+
+
+# Test para comprobar la consulta combinada por ciudad, horario, dimensión e idioma
+def test_query_by_city_time_dimension_language(data_root):
+    index = ScheduleIndex(data_root)
+    index.refresh()
+
+    results = index.query(
+        "19:00", "21:00", city="Lima", dimension="3D", language="Doblada"
+    )
+
+    assert [(entry.title, entry.time) for entry in results] == [
+        ("Coco", "8:00 pm"),
+        ("Avatar", "8:30 pm"),
+    ]
+    assert results[0].chain == "cineplanet"
+
+
+# Test para comprobar que sin filtros se devuelven todas las funciones
+def test_query_without_filters(data_root):
+    index = ScheduleIndex(data_root)
+    index.refresh()
+
+    assert len(index.query()) == 5
+    assert index.query(cinema="cp primavera")[0].title == "Coco"
+
+
+# Test para comprobar que solo se reindexan los archivos modificados o borrados
+def test_refresh_is_incremental(data_root):
+    index = ScheduleIndex(data_root)
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    coco = write_movie(
+        data_root,
+        "cineplanet",
+        "CP Primavera",
+        "Coco",
+        [{"dimension": "2D", "language": "Doblada", "showtimes": [["9:00 pm", "u6"]]}],
+    )
+    stat = coco.stat()
+    os.utime(coco, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert index.refresh() == 1
+    assert [entry.time for entry in index.query(title="Coco")] == ["9:00 pm"]
+
+    coco.unlink()
+    assert index.refresh() == 1
+    assert index.query(title="Coco") == []
+    assert len(index) == 4
+
+
+# Test para comprobar que se rechazan filtros desconocidos
+def test_query_unknown_filter(data_root):
+    index = ScheduleIndex(data_root)
+
+    with pytest.raises(ValueError):
+        index.query(theatre="sala 1")
+
+
+# Test para comprobar la salida de la línea de comandos
+def test_main_prints_results(data_root, capsys):
+    main(["--root", str(data_root), "--title", "Coco"])
+
+    out, _ = capsys.readouterr()
+    assert "Coco" in out
+    assert "1 funciones encontradas" in out
@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock
+from scrapers.rate_limiter import DomainLimiter, RateLimiter
+from tests.helpers import FakeClock
+import pytest, asyncio
+
+
+# Test para comprobar que la concurrencia sube con respuestas rápidas y baja con errores
+@pytest.mark.asyncio
+async def test_aimd_increases_and_backs_off():
+    clock = FakeClock(0.0)
+    limiter = RateLimiter(rate=100, burst=100, initial_concurrency=2, clock=clock)
+
+    for _ in range(10):
+        async with limiter.request("https://www.cineplanet.com.pe/peliculas"):
+            clock.now += 0.1
+    domain = limiter.for_url("https://cineplanet.com.pe/")
+    grown = domain.limit
+    assert grown > 4
+
+    with pytest.raises(TimeoutError):
+        async with limiter.request("https://www.cineplanet.com.pe/peliculas"):
+            raise TimeoutError("sin respuesta")
+    assert domain.limit == pytest.approx(grown / 2)
+    assert domain.in_flight == 0
+
+
+# Test para comprobar que un 429 pausa el sitio el tiempo indicado
+@pytest.mark.asyncio
+async def test_throttled_response_pauses_domain():
+    clock = FakeClock(0.0)
+    limiter = RateLimiter(clock=clock)
+    response = MagicMock(status=429, headers={"retry-after": "30"})
+
+    async with limiter.request("https://cinepolis.com.pe/") as slot:
+        slot.check(response)
+
+    domain = limiter.for_url("https://cinepolis.com.pe/")
+    assert domain.paused_until == 30
+    assert domain.limit == 1
+    # Otro sitio no se ve afectado
+    assert limiter.for_url("https://www.cineplanet.com.pe/").paused_until == 0
+
+
+# Test para comprobar que no se supera la concurrencia permitida
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    limiter = DomainLimiter(rate=1000, burst=1000, initial_concurrency=2, max_concurrency=2)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        await limiter.acquire()
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        await limiter.release("ok", 0.01)
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert peak == 2
+
+
+# Test para comprobar que el balde de fichas espacia las peticiones
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests():
+    limiter = DomainLimiter(rate=50, burst=1, initial_concurrency=8, max_concurrency=8)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    for _ in range(4):
+        await limiter.acquire()
+        await limiter.release("ok", 0)
+
+    # La primera es inmediata y las otras tres esperan 1/50 s cada una
+    assert loop.time() - start >= 0.05
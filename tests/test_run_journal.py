@@ -0,0 +1,92 @@
+from scrapers.run_journal import RunJournal
+from scrapers.models import Target
+import pytest, json
+
+TARGET = Target("cineplanet", "Lima", "CP Alcazar", "Hoy")
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return tmp_path / "journal.jsonl"
+
+
+# Test para comprobar que cada evento queda escrito de inmediato
+def test_record_movie_appends_line(journal_path):
+    journal = RunJournal(journal_path)
+    journal.start_run()
+    journal.start_target(TARGET)
+    journal.record_movie(TARGET, 0, "Avatar")
+
+    lines = journal_path.read_text(encoding="utf-8").splitlines()
+    events = [json.loads(line) for line in lines]
+
+    assert [event["event"] for event in events] == ["run_start", "target_start", "movie"]
+    assert events[2]["title"] == "Avatar"
+    assert events[2]["target"] == TARGET.key
+    journal.close()
+
+
+# Test para comprobar que se retoma la ejecución interrumpida
+def test_resume_skips_completed_movies_and_targets(journal_path):
+    journal = RunJournal(journal_path)
+    journal.start_run()
+    other = Target("cineplanet", "Lima", "CP Primavera", "Hoy")
+    journal.start_target(other)
+    journal.record_movie(other, 0, "Coco")
+    journal.finish_target(other)
+    journal.start_target(TARGET)
+    journal.record_movie(TARGET, 0, "Avatar")
+    journal.close()  # Simula la caída del proceso
+
+    resumed = RunJournal.open(journal_path, resume=True)
+
+    assert resumed.run_id == journal.run_id
+    assert resumed.is_target_done(other)
+    assert not resumed.is_target_done(TARGET)
+    assert resumed.is_movie_done(TARGET, "Avatar")
+    assert not resumed.is_movie_done(TARGET, "Coco")
+
+
+# Test para comprobar que una ejecución terminada no se retoma
+def test_resume_after_finished_run_starts_new(journal_path):
+    journal = RunJournal(journal_path)
+    journal.start_run()
+    journal.record_movie(TARGET, 0, "Avatar")
+    journal.finish_run()
+
+    resumed = RunJournal.open(journal_path, resume=True)
+
+    assert resumed.run_id != journal.run_id
+    assert not resumed.is_movie_done(TARGET, "Avatar")
+
+
+# Test para comprobar que se ignora una última línea a medio escribir
+def test_truncated_line_is_ignored(journal_path):
+    journal = RunJournal(journal_path)
+    journal.start_run()
+    journal.record_movie(TARGET, 0, "Avatar")
+    journal.close()
+    with journal_path.open("a", encoding="utf-8") as f:
+        f.write('{"event": "movie", "run_id"')
+
+    resumed = RunJournal.open(journal_path, resume=True)
+
+    assert resumed.is_movie_done(TARGET, "Avatar")
+
+
+# Test para comprobar que las combinaciones aplazadas quedan para la próxima ejecución
+def test_deferred_targets(journal_path):
+    journal = RunJournal(journal_path)
+    journal.start_run()
+    other = Target("cineplanet", "Lima", "CP Primavera", "Hoy")
+    journal.defer_target(TARGET)
+    journal.defer_target(TARGET)
+    journal.defer_target(other)
+    journal.finish_target(other)
+    journal.close()
+
+    resumed = RunJournal.open(journal_path, resume=True)
+
+    assert resumed.deferred_targets() == [TARGET]
+    events = [json.loads(line) for line in journal_path.read_text(encoding="utf-8").splitlines()]
+    assert [event["event"] for event in events].count("target_deferred") == 2
@@ -0,0 +1,93 @@
+from unittest.mock import patch
+from scrapers.sinks import MultiSink, SINKS
+from scrapers.models import Movie
+import pytest, json, sqlite3, csv
+
+MOVIE_DATA = {
+    "title": "Mi Película",
+    "genre": "Drama",
+    "city": "Lima",
+    "day": "Hoy",
+    "showtimes": {
+        "CP Alcazar": [
+            {
+                "dimension": "2D",
+                "format": "Regular",
+                "language": "Doblada",
+                "showtimes": [("19:00", "https://example.com/1"), ("21:30", None)],
+            }
+        ]
+    },
+}
+
+
+@pytest.fixture
+def output_folder(tmp_path):
+    folder = tmp_path / "lima/cineplanet/cp_alcazar/hoy"
+    folder.mkdir(parents=True)
+    return folder
+
+
+# Test para comprobar que todos los formatos salen de una sola pasada
+def test_multi_sink_writes_every_format(tmp_path, output_folder):
+    sink = MultiSink.from_labels(list(SINKS), sqlite_path=tmp_path / "movies.sqlite")
+
+    sink(output_folder, MOVIE_DATA)
+
+    names = sorted(path.name for path in output_folder.iterdir())
+    assert names == [
+        "mi-pelicula.csv",
+        "mi-pelicula.json",
+        "mi-pelicula.xlsx",
+        "movies.jsonl",
+    ]
+    saved = json.loads((output_folder / "mi-pelicula.json").read_text(encoding="utf-8"))
+    assert saved["title"] == "Mi Película"
+    with (output_folder / "mi-pelicula.csv").open(encoding="utf-8") as f:
+        assert [row["Hora"] for row in csv.DictReader(f)] == ["19:00", "21:30"]
+    line = (output_folder / "movies.jsonl").read_text(encoding="utf-8").splitlines()
+    assert json.loads(line[0])["genre"] == "Drama"
+
+
+# Test para comprobar que la película se convierte una sola vez
+def test_multi_sink_serializes_once(output_folder):
+    sink = MultiSink.from_labels(["Excel", "CSV", "SQLite"])
+    sink.sinks[-1].path = output_folder / "movies.sqlite"
+    movie = Movie.from_dict(MOVIE_DATA)
+
+    with patch("scrapers.sinks.Movie.from_dict", return_value=movie) as from_dict:
+        sink(output_folder, MOVIE_DATA)
+
+    from_dict.assert_called_once_with(MOVIE_DATA)
+
+
+# Test para comprobar que volver a guardar reemplaza las funciones en SQLite
+def test_sqlite_sink_replaces_movie(tmp_path, output_folder):
+    path = tmp_path / "movies.sqlite"
+    sink = MultiSink.from_labels(["SQLite"], sqlite_path=path)
+
+    sink(output_folder, MOVIE_DATA)
+    sink(output_folder, MOVIE_DATA)
+
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("SELECT COUNT(*) FROM movies").fetchone()[0] == 1
+        times = connection.execute("SELECT time FROM showtimes ORDER BY time").fetchall()
+        assert times == [("19:00",), ("21:30",)]
+    finally:
+        connection.close()
+
+
+# Test para comprobar que volver a guardar una película reemplaza su línea en JSONL
+def test_jsonl_sink_replaces_movie(output_folder):
+    sink = MultiSink.from_labels(["JSONL"])
+    other = {**MOVIE_DATA, "title": "Coco"}
+
+    sink(output_folder, MOVIE_DATA)
+    sink(output_folder, other)
+    sink(output_folder, {**MOVIE_DATA, "genre": "Comedia"})
+
+    lines = (output_folder / "movies.jsonl").read_text(encoding="utf-8").splitlines()
+    saved = [json.loads(line) for line in lines]
+    assert [movie["title"] for movie in saved] == ["Coco", "Mi Película"]
+    assert saved[1]["genre"] == "Comedia"
@@ -0,0 +1,106 @@
+from unittest.mock import MagicMock, AsyncMock, patch
+from scrapers.deadline import RunDeadline
+from scrapers.entity_resolver import MovieResolver
+from scrapers.models import Target
+from scrapers.run_journal import RunJournal
+from tests.helpers import DummyScraper
+import pytest, asyncio
+
+TARGETS = [
+    Target("dummy", "Lima", "CP Alcazar", "Hoy"),
+    Target("dummy", "Lima", "CP Norte", "Hoy"),
+]
+
+
+@pytest.fixture
+def playwright_mock():
+    p_mock = MagicMock()
+    context_mock = MagicMock()
+    context_mock.__aenter__ = AsyncMock(return_value=p_mock)
+    context_mock.__aexit__ = AsyncMock(return_value=False)
+    with patch("scrapers.base_scraper.async_playwright", return_value=context_mock):
+        yield p_mock
+
+
+async def collect(scraper, **kwargs):
+    return [event async for event in scraper.stream(TARGETS, **kwargs)]
+
+
+# Test para comprobar que se entregan las películas y el progreso en orden
+@pytest.mark.asyncio
+async def test_stream_yields_movies_and_progress(playwright_mock):
+    scraper = DummyScraper(movies=2, fail_on="CP Norte")
+    browser_mock = MagicMock()
+    browser_mock.close = AsyncMock()
+
+    with patch.object(scraper, "setup_browser", AsyncMock(return_value=browser_mock)):
+        events = await collect(scraper)
+
+    assert [event.kind for event in events] == [
+        "target_start",
+        "movie",
+        "movie",
+        "target_done",
+        "target_start",
+        "target_failed",
+    ]
+    assert events[1].movie_data == {"title": "CP Alcazar 0", "movie_id": "cp-alcazar-0"}
+    assert events[1].target == TARGETS[0]
+    assert events[-1].error == "sin cartelera"
+    browser_mock.close.assert_awaited_once()
+    assert scraper.listener is None
+
+
+# Test para comprobar que un consumidor lento frena la recopilación
+@pytest.mark.asyncio
+async def test_stream_applies_backpressure(playwright_mock):
+    scraper = DummyScraper(movies=50)
+    browser_mock = MagicMock()
+    browser_mock.close = AsyncMock()
+
+    with patch.object(scraper, "setup_browser", AsyncMock(return_value=browser_mock)):
+        stream = scraper.stream(TARGETS, max_buffer=2)
+        await stream.__anext__()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        # La cola acotada detiene al productor: no hay películas de más en memoria
+        assert scraper.saved <= 3
+        await stream.aclose()
+
+    browser_mock.close.assert_awaited_once()
+    assert scraper.listener is None
+
+
+# Test para comprobar que al vencer el plazo se aplazan la actual y las que faltan, y no se sigue
+@pytest.mark.asyncio
+async def test_stream_defers_remaining_after_deadline(playwright_mock, tmp_path):
+    targets = TARGETS + [Target("dummy", "Lima", "CP Sur", "Hoy")]
+    now = [0.0]
+
+    def clock():
+        # Cada consulta avanza el reloj: vence durante la primera combinación
+        now[0] += 1
+        return now[0]
+
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    scraper = DummyScraper(
+        movies=5,
+        deadline=RunDeadline(ends_at=3, clock=clock),
+        journal=journal,
+        resolver=MovieResolver(tmp_path / "movies.json"),
+    )
+    browser_mock = MagicMock()
+    browser_mock.close = AsyncMock()
+
+    with patch.object(scraper, "setup_browser", AsyncMock(return_value=browser_mock)):
+        events = [event async for event in scraper.stream(targets)]
+
+    kinds = [event.kind for event in events]
+    assert "target_failed" not in kinds
+    assert kinds[-3:] == ["target_deferred"] * 3
+    assert [event.target for event in events[-3:]] == targets
+    assert scraper.saved < 5
+    assert [target.key for target in journal.deferred_targets()] == [
+        target.key for target in targets
+    ]
+    journal.close()
@@ -0,0 +1,247 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from scrapers import batch_runner
+from scrapers.batch_runner import consume_queue
+from scrapers.work_queue import WorkQueue
+from scrapers.models import Target
+from pathlib import Path
+from tests.helpers import FakeClock
+import pytest, asyncio, json, multiprocessing, os, time
+
+
+def record_target(log_path: str, target: Target):
+    # Escritura con O_APPEND: cada línea llega completa aunque haya varios procesos
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(f"{os.getpid()}\t{target.key}\n")
+
+
+class FakeScraper:
+    # Reemplaza a Playwright dentro de consume_queue
+    output: Path = Path()
+    log_path: str = ""
+    delay: float = 0.01
+
+    def __init__(self, **options):
+        pass
+
+    async def setup_browser(self, p):
+        browser = MagicMock()
+        browser.close = AsyncMock()
+        return browser
+
+    async def run_until_deadline(self, work) -> bool:
+        await work
+        return True
+
+    async def scrape_target(self, browser, target: Target, format_to_save) -> Path:
+        await asyncio.sleep(self.delay)
+        folder = self.output / target.cinema
+        folder.mkdir(parents=True, exist_ok=True)
+        format_to_save(folder, {"title": target.cinema, "pid": os.getpid()})
+        if self.log_path:
+            record_target(self.log_path, target)
+        return folder
+
+
+@asynccontextmanager
+async def fake_playwright():
+    yield MagicMock()
+
+
+def use_fake_scraper(output: Path, log_path: str = "", delay: float = 0.01):
+    batch_runner.CHAINS = {"cineplanet": FakeScraper}
+    batch_runner.CineplanetScraper = FakeScraper
+    batch_runner.async_playwright = fake_playwright
+    FakeScraper.output = output
+    FakeScraper.log_path = log_path
+    FakeScraper.delay = delay
+
+
+def worker_process(queue_path: str, output: str, log_path: str, lease_seconds: float):
+    # Con spawn el proceso importa todo de nuevo: el reemplazo se hace aquí
+    use_fake_scraper(Path(output), log_path)
+    queue = WorkQueue(Path(queue_path), lease_seconds=lease_seconds)
+    asyncio.run(consume_queue(queue, f"worker-{os.getpid()}", pages=2, poll_seconds=0.1))
+
+
+def hung_worker_process(queue_path: str, lease_seconds: float, leased):
+    # Toma una combinación y se queda colgado hasta que lo maten
+    queue = WorkQueue(Path(queue_path), lease_seconds=lease_seconds)
+    queue.lease("hung-worker")
+    leased.set()
+    time.sleep(60)
+
+
+def targets(total: int):
+    return [Target("cineplanet", "Lima", f"CP {i}", "Hoy") for i in range(total)]
+
+
+# Test para comprobar que una combinación no se presta dos veces
+def test_lease_is_exclusive(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+    queue.enqueue(targets(1))
+
+    first = queue.lease("a")
+
+    assert first is not None
+    assert queue.lease("b") is None
+    assert queue.complete(first)
+    assert queue.is_drained()
+
+
+# Test para comprobar que encolar dos veces no duplica combinaciones
+def test_enqueue_ignores_duplicates(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+
+    assert queue.enqueue(targets(3)) == 3
+    assert queue.enqueue(targets(4)) == 1
+    assert queue.stats() == {"queued": 4}
+
+
+# Test para comprobar reintentos y lista de muertos
+def test_fail_retries_then_dead_letters(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db", max_attempts=2)
+    queue.enqueue(targets(1))
+
+    queue.fail(queue.lease("a"), "timeout")
+    assert queue.stats() == {"queued": 1}
+    queue.fail(queue.lease("a"), "timeout")
+
+    assert queue.stats() == {"dead": 1}
+    assert queue.dead_letters()[0]["last_error"] == "timeout"
+    assert queue.requeue_dead() == 1
+
+
+# Test para comprobar que un préstamo vencido vuelve a la cola
+def test_expired_lease_is_requeued(tmp_path):
+    clock = FakeClock()
+    queue = WorkQueue(tmp_path / "queue.db", lease_seconds=10, clock=clock)
+    queue.enqueue(targets(1))
+    stale = queue.lease("a")
+
+    clock.now += 11
+    fresh = queue.lease("b")
+
+    assert fresh.target == stale.target
+    assert fresh.attempts == 2
+    assert not queue.complete(stale)
+    assert queue.complete(fresh)
+
+
+# Test para comprobar que devolver un préstamo no gasta un intento
+def test_release_returns_without_attempt(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db", max_attempts=1)
+    queue.enqueue(targets(1))
+
+    assert queue.release(queue.lease("a"))
+    assert queue.stats() == {"queued": 1}
+    assert queue.lease("b").attempts == 1
+
+
+# Test para comprobar el límite de combinaciones simultáneas por cadena
+def test_chain_caps(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db", chain_caps={"cineplanet": 1})
+    queue.enqueue(targets(2) + [Target("cinepolis", "Lima", "Plaza Norte", "Hoy")])
+
+    first = queue.lease("a")
+    second = queue.lease("b")
+
+    assert first.target.chain == "cineplanet"
+    assert second.target.chain == "cinepolis"
+    assert queue.lease("c") is None
+
+
+# Test para comprobar que se presta primero la combinación con más prioridad
+def test_lease_by_priority(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+    low, high, medium = targets(3)
+    queue.enqueue([low, high, medium], {high.key: 100, medium.key: 50})
+
+    assert [queue.lease("a").target for _ in range(3)] == [high, medium, low]
+
+
+# Test para comprobar que volver a encolar actualiza la prioridad de lo pendiente
+def test_enqueue_updates_priority(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+    first, second = targets(2)
+    queue.enqueue([first, second], {first.key: 10})
+
+    assert queue.enqueue([first, second], {second.key: 20}) == 0
+    assert queue.lease("a").target == second
+
+
+# Test para comprobar que consume_queue guarda cada combinación en los formatos pedidos
+@pytest.mark.asyncio
+async def test_consume_queue_uses_formats(tmp_path, monkeypatch):
+    for name in ("CHAINS", "CineplanetScraper", "async_playwright"):
+        monkeypatch.setattr(batch_runner, name, getattr(batch_runner, name))
+    monkeypatch.chdir(tmp_path)
+    use_fake_scraper(tmp_path / "out")
+    queue = WorkQueue(tmp_path / "queue.db")
+    queue.enqueue(targets(3))
+
+    processed = await consume_queue(
+        queue, "node", pages=2, poll_seconds=0.01, formats=["JSON", "JSONL"]
+    )
+
+    assert processed == 3
+    assert queue.stats() == {"done": 3}
+    assert (tmp_path / "out" / "CP 0" / "cp-0.json").exists()
+    assert (tmp_path / "out" / "CP 2" / "movies.jsonl").exists()
+
+
+# Test para comprobar que al perder el préstamo se corta la recopilación y no se marca hecha
+@pytest.mark.asyncio
+async def test_consume_queue_stops_on_lost_lease(tmp_path, monkeypatch):
+    for name in ("CHAINS", "CineplanetScraper", "async_playwright"):
+        monkeypatch.setattr(batch_runner, name, getattr(batch_runner, name))
+    use_fake_scraper(tmp_path / "out", delay=5)
+    queue = WorkQueue(tmp_path / "queue.db", lease_seconds=0.03, max_attempts=1)
+    queue.enqueue(targets(1))
+    monkeypatch.setattr(queue, "renew", lambda lease: False)
+
+    start = time.perf_counter()
+    processed = await consume_queue(queue, "node", pages=1, poll_seconds=0.01)
+
+    assert processed == 0
+    assert time.perf_counter() - start < 2
+    assert not (tmp_path / "out").exists()
+    assert queue.stats() == {"dead": 1}
+
+
+# Test con varios procesos: nada se recopila dos veces y el préstamo de un proceso muerto se recupera
+def test_multiprocess_workers(tmp_path):
+    queue_path = tmp_path / "queue.db"
+    log_path = tmp_path / "scraped.log"
+    lease_seconds = 1.0
+    queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+    queue.enqueue(targets(30))
+
+    context = multiprocessing.get_context("spawn")
+    leased = context.Event()
+    hung = context.Process(
+        target=hung_worker_process, args=(str(queue_path), lease_seconds, leased)
+    )
+    hung.start()
+    assert leased.wait(30)
+    hung.kill()
+    hung.join()
+
+    workers = [
+        context.Process(
+            target=worker_process,
+            args=(str(queue_path), str(tmp_path / "out"), str(log_path), lease_seconds),
+        )
+        for _ in range(3)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    scraped = [line.split("\t")[1] for line in log_path.read_text().splitlines()]
+    assert sorted(scraped) == sorted(target.key for target in targets(30))
+    assert queue.stats() == {"done": 30}
+    saved = json.loads((tmp_path / "out" / "CP 7" / "cp-7.json").read_text(encoding="utf-8"))
+    assert saved["title"] == "CP 7"